@@ -26,6 +26,24 @@ class Settings(BaseSettings):
     render_js: bool = False
     render_timeout: int = 20  # seconds
     render_post_wait_seconds: int = 3  # extra wait after DOMContentLoaded
+    render_budget: bool = True  # abort browser renders past the watcher's learned budget as "heavy"
+    render_engine: str = "sync"  # "sync" (thread per check) or "async" (asyncio event loop)
+    render_concurrency: int = 8  # max concurrent renders for the async engine
+    scheduler_workers: int = 4  # render threads (and max concurrent renders) for the sync engine
+    render_isolation: str = "thread"  # "thread" (render in-process) or "process" (pooled child processes, sync engine)
+    render_process_max_checks: int = 50  # renders per child process before it is replaced
+    render_process_memory_mb: int = 1536  # resident memory ceiling for a child and its browser (0 disables)
+    render_process_timeout_seconds: int = 300  # hard wall-clock limit per render in a child
+    domain_concurrency: int = 2  # max concurrent checks per domain
+    domain_concurrency_limits: dict[str, int] = Field(default_factory=lambda: {"agoda.com": 2})  # per-domain overrides
+    schedule_spread: bool = True  # give each watcher a stable phase inside its interval
+    schedule_jitter_seconds: int = 0  # random extra delay (0..N s) added to every run
+    coalesce_renders: bool = True  # due watchers of the same URL share one render
+    priority_slots: int = 1  # extra render slots only manual/API checks may use
+    job_queue: bool = False  # enqueue due checks in the database for `python -m app.worker` processes
+    job_lease_seconds: int = 300  # a worker's claim on a job expires unless renewed
+    job_max_attempts: int = 3  # claims per job before an abandoned job is marked failed
+    worker_poll_seconds: float = 2.0  # how often an idle worker looks for due jobs
     # Debug/diagnostics options
     debug_dump_artifacts: bool = False  # when true, save fetched HTML and screenshots
     debug_artifacts_dir: str = "./data/artifacts"  # where to save debug files
@@ -68,23 +68,48 @@ class StealthConfig:
     enable_plugin_masking: bool = True
     enable_language_masking: bool = True
     enable_chrome_runtime: bool = True
-    request_throttling: float = 0.0  # seconds between requests
+    request_throttling: float = 0.0  # seconds between requests (legacy; used as the domain rate when unset)
+    domain_rate_per_minute: float = 0.0  # checks started per domain per minute (0 = unlimited)
+    domain_burst: int = 1  # checks a domain may start back to back before the rate applies
+    domain_rate_overrides: Dict[str, Dict[str, float]] = None  # keyed by domain: rate_per_minute, burst
     randomize_viewport: bool = True
     viewport_width_range: tuple = (1200, 1920)
     viewport_height_range: tuple = (700, 1080)
 
+    def __post_init__(self):
+        if self.domain_rate_overrides is None:
+            self.domain_rate_overrides = {}
+
 @dataclass
 class RenderingConfig:
     """Configuration for smart rendering and interaction."""
     max_timeout: float = 90.0  # seconds (must be < 90s)
     poll_interval: float = 5.0  # seconds
     scroll_increment: int = 500  # pixels
-    scroll_delay_range: tuple = (0.5, 2.0)  # seconds
-    max_scrolls: int = 3
+    scroll_delay_range: tuple = (0.5, 2.0)  # seconds: (quiet window, max wait) per scroll
+    max_scrolls: int = 30
     hover_selectors: List[str] = None
     click_selectors: List[str] = None
     load_more_button_selectors: List[str] = None
     validate_visibility: bool = True
+    early_exit: bool = True  # stop the render as soon as the phrase is visible
+    match_in_page: bool = True  # match in the browser instead of pulling page text over CDP
+    render_profiles: bool = True  # replay only the interactions a page turned out to need
+    render_profile_ttl_hours: int = 72  # re-learn the full routine after this long
+    render_profile_scroll_margin: int = 1  # extra scrolls past the learned productive count
+    classify_pages: bool = True  # end renders of blocked/challenge/error pages right after navigation
+    challenge_grace_seconds: float = 5.0  # time a challenge interstitial gets to solve itself
+    static_first: bool = True  # try a plain HTTP fetch before launching the browser
+    static_timeout: float = 10.0  # seconds
+    static_confirmations: int = 3  # browser/static agreements before static verdicts are trusted
+    static_decision_ttl_hours: int = 24  # re-learn the tier decision after this long
+    browser_only_domains: List[str] = None
+    block_resources: bool = True  # abort unwanted requests during renders
+    blocked_resource_types: List[str] = None
+    blocked_domains: List[str] = None  # third-party trackers/ads
+    allowed_domains: List[str] = None  # never blocked, wins over the lists above
+    blocking_overrides: Dict[str, Dict[str, Any]] = None  # keyed by domain or "watcher:<id>"
+    response_rules: Dict[str, List[Dict[str, Any]]] = None  # XHR/JSON matching, keyed like blocking_overrides
 
     def __post_init__(self):
         if self.hover_selectors is None:
@@ -103,6 +128,32 @@ class RenderingConfig:
                 ".show-more-button",
                 "[data-click-load]"
             ]
+        if self.browser_only_domains is None:
+            self.browser_only_domains = ["agoda.com"]
+        if self.blocked_resource_types is None:
+            self.blocked_resource_types = ["image", "media", "font"]
+        if self.blocked_domains is None:
+            self.blocked_domains = [
+                "google-analytics.com",
+                "googletagmanager.com",
+                "doubleclick.net",
+                "googlesyndication.com",
+                "facebook.net",
+                "hotjar.com",
+                "criteo.com",
+                "criteo.net",
+                "scorecardresearch.com",
+                "newrelic.com",
+                "nr-data.net",
+                "segment.io",
+                "bat.bing.com"
+            ]
+        if self.allowed_domains is None:
+            self.allowed_domains = []
+        if self.blocking_overrides is None:
+            self.blocking_overrides = {}
+        if self.response_rules is None:
+            self.response_rules = {}
         if self.load_more_button_selectors is None:
             self.load_more_button_selectors = [
                 "button:has-text('Load More')",
@@ -120,6 +171,17 @@ class SessionConfig:
     cookie_expiration_days: int = 30
     session_ttl_seconds: int = 3600  # 1 hour
     max_sessions_per_domain: int = 5
+    reuse_contexts: bool = True  # keep a warm BrowserContext per domain in each pooled browser
+    max_warm_contexts_per_browser: int = 8  # least recently used contexts are closed beyond this
+
+@dataclass
+class BrowserPoolConfig:
+    """Configuration for the warm Chromium pool shared across checks."""
+    enabled: bool = True
+    size: int = 4  # warm browsers kept alive (one per worker thread)
+    max_pages_per_browser: int = 50  # recycle after this many checks
+    max_rss_mb: int = 1024  # recycle when the browser's process tree exceeds this
+    max_age_seconds: int = 3600  # recycle browsers older than this
 
 @dataclass
 class ResilienceConfig:
@@ -141,6 +203,7 @@ class MonitoringConfig:
     stealth: StealthConfig = field(default_factory=StealthConfig)
     rendering: RenderingConfig = field(default_factory=RenderingConfig)
     session: SessionConfig = field(default_factory=SessionConfig)
+    browser_pool: BrowserPoolConfig = field(default_factory=BrowserPoolConfig)
     resilience: ResilienceConfig = field(default_factory=ResilienceConfig)
     debug_mode: bool = False
     log_level: str = "INFO"
@@ -188,6 +251,12 @@ def parse_config_data(config_data: Dict[str, Any]) -> MonitoringConfig:
         config.stealth.enable_language_masking = stealth_data.get('enable_language_masking', config.stealth.enable_language_masking)
         config.stealth.enable_chrome_runtime = stealth_data.get('enable_chrome_runtime', config.stealth.enable_chrome_runtime)
         config.stealth.request_throttling = stealth_data.get('request_throttling', config.stealth.request_throttling)
+        config.stealth.domain_rate_per_minute = stealth_data.get('domain_rate_per_minute', config.stealth.domain_rate_per_minute)
+        config.stealth.domain_burst = stealth_data.get('domain_burst', config.stealth.domain_burst)
+        if 'domain_rate_overrides' in stealth_data:
+            config.stealth.domain_rate_overrides = {
+                str(key): value for key, value in (stealth_data['domain_rate_overrides'] or {}).items()
+            }
         config.stealth.randomize_viewport = stealth_data.get('randomize_viewport', config.stealth.randomize_viewport)
 
     # Parse rendering configuration
@@ -197,7 +266,36 @@ def parse_config_data(config_data: Dict[str, Any]) -> MonitoringConfig:
         config.rendering.poll_interval = rendering_data.get('poll_interval', config.rendering.poll_interval)
         config.rendering.scroll_increment = rendering_data.get('scroll_increment', config.rendering.scroll_increment)
         config.rendering.max_scrolls = rendering_data.get('max_scrolls', config.rendering.max_scrolls)
+        config.rendering.scroll_delay_range = tuple(rendering_data.get('scroll_delay_range', config.rendering.scroll_delay_range))
         config.rendering.validate_visibility = rendering_data.get('validate_visibility', config.rendering.validate_visibility)
+        config.rendering.early_exit = rendering_data.get('early_exit', config.rendering.early_exit)
+        config.rendering.match_in_page = rendering_data.get('match_in_page', config.rendering.match_in_page)
+        config.rendering.render_profiles = rendering_data.get('render_profiles', config.rendering.render_profiles)
+        config.rendering.render_profile_ttl_hours = rendering_data.get('render_profile_ttl_hours', config.rendering.render_profile_ttl_hours)
+        config.rendering.render_profile_scroll_margin = rendering_data.get('render_profile_scroll_margin', config.rendering.render_profile_scroll_margin)
+        config.rendering.classify_pages = rendering_data.get('classify_pages', config.rendering.classify_pages)
+        config.rendering.challenge_grace_seconds = rendering_data.get('challenge_grace_seconds', config.rendering.challenge_grace_seconds)
+        config.rendering.static_first = rendering_data.get('static_first', config.rendering.static_first)
+        config.rendering.static_timeout = rendering_data.get('static_timeout', config.rendering.static_timeout)
+        config.rendering.static_confirmations = rendering_data.get('static_confirmations', config.rendering.static_confirmations)
+        config.rendering.static_decision_ttl_hours = rendering_data.get('static_decision_ttl_hours', config.rendering.static_decision_ttl_hours)
+        if 'browser_only_domains' in rendering_data:
+            config.rendering.browser_only_domains = rendering_data['browser_only_domains']
+        config.rendering.block_resources = rendering_data.get('block_resources', config.rendering.block_resources)
+        if 'blocked_resource_types' in rendering_data:
+            config.rendering.blocked_resource_types = rendering_data['blocked_resource_types']
+        if 'blocked_domains' in rendering_data:
+            config.rendering.blocked_domains = rendering_data['blocked_domains']
+        if 'allowed_domains' in rendering_data:
+            config.rendering.allowed_domains = rendering_data['allowed_domains']
+        if 'blocking_overrides' in rendering_data:
+            config.rendering.blocking_overrides = {
+                str(key): value for key, value in (rendering_data['blocking_overrides'] or {}).items()
+            }
+        if 'response_rules' in rendering_data:
+            config.rendering.response_rules = {
+                str(key): value or [] for key, value in (rendering_data['response_rules'] or {}).items()
+            }
 
         # Parse selector lists
         if 'hover_selectors' in rendering_data:
@@ -215,6 +313,17 @@ def parse_config_data(config_data: Dict[str, Any]) -> MonitoringConfig:
         config.session.cookie_expiration_days = session_data.get('cookie_expiration_days', config.session.cookie_expiration_days)
         config.session.session_ttl_seconds = session_data.get('session_ttl_seconds', config.session.session_ttl_seconds)
         config.session.max_sessions_per_domain = session_data.get('max_sessions_per_domain', config.session.max_sessions_per_domain)
+        config.session.reuse_contexts = session_data.get('reuse_contexts', config.session.reuse_contexts)
+        config.session.max_warm_contexts_per_browser = session_data.get('max_warm_contexts_per_browser', config.session.max_warm_contexts_per_browser)
+
+    # Parse browser pool configuration
+    if 'browser_pool' in config_data:
+        pool_data = config_data['browser_pool']
+        config.browser_pool.enabled = pool_data.get('enabled', config.browser_pool.enabled)
+        config.browser_pool.size = pool_data.get('size', config.browser_pool.size)
+        config.browser_pool.max_pages_per_browser = pool_data.get('max_pages_per_browser', config.browser_pool.max_pages_per_browser)
+        config.browser_pool.max_rss_mb = pool_data.get('max_rss_mb', config.browser_pool.max_rss_mb)
+        config.browser_pool.max_age_seconds = pool_data.get('max_age_seconds', config.browser_pool.max_age_seconds)
 
     # Parse resilience configuration
     if 'resilience' in config_data:
@@ -281,6 +390,9 @@ def create_default_config_file(output_path: str = "app/core/monitoring_config.ya
             "enable_language_masking": config.stealth.enable_language_masking,
             "enable_chrome_runtime": config.stealth.enable_chrome_runtime,
             "request_throttling": config.stealth.request_throttling,
+            "domain_rate_per_minute": config.stealth.domain_rate_per_minute,
+            "domain_burst": config.stealth.domain_burst,
+            "domain_rate_overrides": config.stealth.domain_rate_overrides,
             "randomize_viewport": config.stealth.randomize_viewport
         },
         "rendering": {
@@ -288,17 +400,45 @@ def create_default_config_file(output_path: str = "app/core/monitoring_config.ya
             "poll_interval": config.rendering.poll_interval,
             "scroll_increment": config.rendering.scroll_increment,
             "max_scrolls": config.rendering.max_scrolls,
+            "scroll_delay_range": list(config.rendering.scroll_delay_range),
             "hover_selectors": config.rendering.hover_selectors,
             "click_selectors": config.rendering.click_selectors,
             "load_more_button_selectors": config.rendering.load_more_button_selectors,
-            "validate_visibility": config.rendering.validate_visibility
+            "validate_visibility": config.rendering.validate_visibility,
+            "early_exit": config.rendering.early_exit,
+            "match_in_page": config.rendering.match_in_page,
+            "render_profiles": config.rendering.render_profiles,
+            "render_profile_ttl_hours": config.rendering.render_profile_ttl_hours,
+            "render_profile_scroll_margin": config.rendering.render_profile_scroll_margin,
+            "classify_pages": config.rendering.classify_pages,
+            "challenge_grace_seconds": config.rendering.challenge_grace_seconds,
+            "static_first": config.rendering.static_first,
+            "static_timeout": config.rendering.static_timeout,
+            "static_confirmations": config.rendering.static_confirmations,
+            "static_decision_ttl_hours": config.rendering.static_decision_ttl_hours,
+            "browser_only_domains": config.rendering.browser_only_domains,
+            "block_resources": config.rendering.block_resources,
+            "blocked_resource_types": config.rendering.blocked_resource_types,
+            "blocked_domains": config.rendering.blocked_domains,
+            "allowed_domains": config.rendering.allowed_domains,
+            "blocking_overrides": config.rendering.blocking_overrides,
+            "response_rules": config.rendering.response_rules
         },
         "session": {
             "enable_cookie_storage": config.session.enable_cookie_storage,
             "cookie_storage_path": config.session.cookie_storage_path,
             "cookie_expiration_days": config.session.cookie_expiration_days,
             "session_ttl_seconds": config.session.session_ttl_seconds,
-            "max_sessions_per_domain": config.session.max_sessions_per_domain
+            "max_sessions_per_domain": config.session.max_sessions_per_domain,
+            "reuse_contexts": config.session.reuse_contexts,
+            "max_warm_contexts_per_browser": config.session.max_warm_contexts_per_browser
+        },
+        "browser_pool": {
+            "enabled": config.browser_pool.enabled,
+            "size": config.browser_pool.size,
+            "max_pages_per_browser": config.browser_pool.max_pages_per_browser,
+            "max_rss_mb": config.browser_pool.max_rss_mb,
+            "max_age_seconds": config.browser_pool.max_age_seconds
         },
         "resilience": {
             "max_retries": config.resilience.max_retries,
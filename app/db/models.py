@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Index, Float
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -11,6 +11,12 @@ class StatusEnum(str, enum.Enum):
     not_found = "not_found"
     error = "error"
     heavy = "heavy"
+    blocked = "blocked"
+
+
+class WatcherKind(str, enum.Enum):
+    page = "page"  # render the URL and search its text
+    json = "json"  # fetch a JSON endpoint and evaluate it, no browser
 
 
 class Watcher(Base):
@@ -20,7 +26,17 @@ class Watcher(Base):
     name = Column(String(255), nullable=False)
     url = Column(String(500), nullable=False)
     phrase = Column(String(255), nullable=False)
+    kind = Column(String(16), nullable=False, default=WatcherKind.page.value, server_default=WatcherKind.page.value)
+    json_condition = Column(Text, nullable=True)  # JSON watchers: JSONPath condition, see json_condition
     interval_minutes = Column(Integer, nullable=False, default=5)
+    adaptive_interval = Column(Boolean, nullable=False, default=False)
+    min_interval_minutes = Column(Integer, nullable=True)
+    max_interval_minutes = Column(Integer, nullable=True)
+    effective_interval_minutes = Column(Integer, nullable=True)
+    content_fingerprint = Column(String(64), nullable=True)
+    change_history = Column(Text, nullable=True)  # JSON list of recent checks: at, status, fp, changed
+    render_budget_seconds = Column(Float, nullable=True)  # learned browser render deadline
+    render_durations = Column(Text, nullable=True)  # JSON list of recent browser render durations (s)
     emails = Column(Text, nullable=False)
     enabled = Column(Boolean, default=True)
     last_check_at = Column(DateTime, nullable=True)
@@ -42,5 +58,28 @@ class CheckLog(Base):
     error_message = Column(Text, nullable=True)
     email_sent = Column(Boolean, default=False, nullable=False)
     email_error = Column(Text, nullable=True)
+    attempt = Column(Integer, default=1, server_default="1", nullable=False)  # 1 = first try, n = (n-1)th retry
+    retry_of_id = Column(Integer, nullable=True)  # log id of the attempt this one retried
+    content_length = Column(Integer, nullable=True)  # page text length the verdict was based on
+
+    watcher = relationship("Watcher", back_populates="logs")
 
-    watcher = relationship("Watcher", back_populates="logs")
\ No newline at end of file
+class CheckJob(Base):
+    """A due check waiting in (or claimed from) the database job queue."""
+    __tablename__ = "check_jobs"
+    __table_args__ = (Index("ix_check_jobs_status_run_after", "status", "run_after"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    watcher_id = Column(Integer, ForeignKey("watchers.id", ondelete="CASCADE"), nullable=False, index=True)
+    force = Column(Boolean, default=False, nullable=False)
+    status = Column(String(16), default="queued", nullable=False)  # queued, running, done, failed
+    enqueued_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
+    check_attempt = Column(Integer, default=1, server_default="1", nullable=False)  # retry lineage, see CheckLog.attempt
+    retry_of_log_id = Column(Integer, nullable=True)
@@ -9,6 +9,8 @@ from app.db import models
 from app import schemas
 from app.services.watcher_service import scheduler
 from app.routes.auth import get_current_user
+from app.services.adaptive_interval import effective_interval
+from app.services.json_condition import ConditionError, watcher_condition
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -24,6 +26,29 @@ def format_datetime(value):
 
 
 templates.env.filters['format_datetime'] = format_datetime
+templates.env.filters['current_interval'] = effective_interval
+
+
+def _optional_minutes(value: str) -> int | None:
+    """Blank form fields mean "no bound"."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        minutes = int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Interval bound must be a whole number of minutes: {value!r}")
+    return max(1, min(minutes, 1440))
+
+
+def _watcher_target(kind: str, phrase: str, json_condition: str) -> tuple[str, str | None]:
+    """Validate the form's kind/phrase/condition; returns the kind and the condition to store."""
+    if kind not in {k.value for k in models.WatcherKind}:
+        raise HTTPException(status_code=400, detail=f"Unknown watcher kind: {kind}")
+    try:
+        return kind, watcher_condition(kind, phrase, json_condition)
+    except ConditionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 def _ensure_user(request: Request):
@@ -52,21 +77,32 @@ def create_watcher(
     request: Request,
     name: str = Form("Watcher"),
     url: str = Form(...),
-    phrase: str = Form(...),
+    phrase: str = Form(""),
+    kind: str = Form(models.WatcherKind.page.value),
+    json_condition: str = Form(""),
     interval_minutes: int = Form(...),
     emails: str = Form(""),
     enabled: bool = Form(False),
+    adaptive_interval: bool = Form(False),
+    min_interval_minutes: str = Form(""),
+    max_interval_minutes: str = Form(""),
     db: Session = Depends(get_db),
 ):
     if not get_current_user(request):
         return RedirectResponse(url="/login", status_code=303)
+    kind, condition = _watcher_target(kind, phrase, json_condition)
     watcher = models.Watcher(
         name=name.strip() if name.strip() else "Watcher",
         url=url.strip(),
         phrase=phrase.strip(),
+        kind=kind,
+        json_condition=condition,
         interval_minutes=max(1, interval_minutes),
         emails=emails,
         enabled=enabled,
+        adaptive_interval=adaptive_interval,
+        min_interval_minutes=_optional_minutes(min_interval_minutes),
+        max_interval_minutes=_optional_minutes(max_interval_minutes),
     )
     db.add(watcher)
     db.commit()
@@ -91,10 +127,15 @@ def update_watcher(
     request: Request,
     name: str = Form(...),
     url: str = Form(...),
-    phrase: str = Form(...),
+    phrase: str = Form(""),
+    kind: str = Form(models.WatcherKind.page.value),
+    json_condition: str = Form(""),
     interval_minutes: int = Form(...),
     emails: str = Form(""),
     enabled: bool = Form(False),
+    adaptive_interval: bool = Form(False),
+    min_interval_minutes: str = Form(""),
+    max_interval_minutes: str = Form(""),
     db: Session = Depends(get_db),
 ):
     if not get_current_user(request):
@@ -102,12 +143,18 @@ def update_watcher(
     watcher = db.get(models.Watcher, watcher_id)
     if not watcher:
         raise HTTPException(status_code=404, detail="Watcher not found")
+    kind, condition = _watcher_target(kind, phrase, json_condition)
     watcher.name = name.strip()
     watcher.url = url.strip()
     watcher.phrase = phrase.strip()
+    watcher.kind = kind
+    watcher.json_condition = condition
     watcher.interval_minutes = max(1, interval_minutes)
     watcher.emails = emails
     watcher.enabled = enabled
+    watcher.adaptive_interval = adaptive_interval
+    watcher.min_interval_minutes = _optional_minutes(min_interval_minutes)
+    watcher.max_interval_minutes = _optional_minutes(max_interval_minutes)
     db.commit()
     db.refresh(watcher)
     scheduler.reschedule(watcher)
@@ -146,7 +193,13 @@ def run_now(watcher_id: int, request: Request):
         return RedirectResponse(url="/login", status_code=303)
     queued = scheduler.manual_check(watcher_id)
     if queued:
-        return RedirectResponse(url=f"/watchers/{watcher_id}/logs-view?queued=1", status_code=303)
+        position = scheduler.check_position(watcher_id) or {}
+        query = "queued=1"
+        if position.get('state') == 'queued':
+            query += f"&position={position['position']}"
+            if position.get('estimated_wait_seconds') is not None:
+                query += f"&eta={position['estimated_wait_seconds']}"
+        return RedirectResponse(url=f"/watchers/{watcher_id}/logs-view?{query}", status_code=303)
     else:
         return RedirectResponse(url=f"/watchers/{watcher_id}/logs-view?busy=1", status_code=303)
 
@@ -200,7 +253,8 @@ def get_logs_api(watcher_id: int, request: Request, offset: int = 0, limit: int
             "status": log.status.value,
             "email_sent": log.email_sent,
             "email_error": log.email_error,
-            "error_message": log.error_message
+            "error_message": log.error_message,
+            "attempt": log.attempt,
         }
         for log in logs
     ])
@@ -217,7 +271,7 @@ def list_watchers(request: Request, db: Session = Depends(get_db)):
 @router.post("/watchers", response_model=schemas.WatcherOut)
 def api_create_watcher(request: Request, data: schemas.WatcherCreate, db: Session = Depends(get_db)):
     _ensure_user(request)
-    watcher = models.Watcher(**data.model_dump())
+    watcher = models.Watcher(**data.model_dump(mode="json"))
     db.add(watcher)
     db.commit()
     db.refresh(watcher)
@@ -240,8 +294,12 @@ def api_update_watcher(watcher_id: int, request: Request, updated: schemas.Watch
     watcher = db.get(models.Watcher, watcher_id)
     if not watcher:
         raise HTTPException(status_code=404, detail="Watcher not found")
-    for field in ["url", "phrase", "interval_minutes", "emails", "enabled"]:
-        setattr(watcher, field, getattr(updated, field))
+    for field in [
+        "url", "phrase", "kind", "json_condition", "interval_minutes", "emails", "enabled",
+        "adaptive_interval", "min_interval_minutes", "max_interval_minutes",
+    ]:
+        value = getattr(updated, field)
+        setattr(watcher, field, value.value if isinstance(value, models.WatcherKind) else value)
     db.commit()
     db.refresh(watcher)
     scheduler.reschedule(watcher)
@@ -264,7 +322,15 @@ def api_delete_watcher(watcher_id: int, request: Request, db: Session = Depends(
 def api_run_check(watcher_id: int, request: Request):
     _ensure_user(request)
     queued = scheduler.manual_check(watcher_id)
-    return {"status": "queued" if queued else "already_running"}
+    if not queued:
+        return {"status": "already_running"}
+    return {"status": "queued", **(scheduler.check_position(watcher_id) or {})}
+
+
+@router.get("/scheduler/load")
+def api_scheduler_load(request: Request, window_minutes: int = 60):
+    _ensure_user(request)
+    return scheduler.load_report(max(1, min(window_minutes, 720)))
 
 
 @router.get("/watchers/{watcher_id}/logs", response_model=list[schemas.LogOut])
@@ -1,23 +1,37 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict
-from app.db.models import StatusEnum
+from pydantic import BaseModel, Field, ConfigDict, computed_field, model_validator
+from app.db.models import StatusEnum, WatcherKind
+from app.services.adaptive_interval import effective_interval
+from app.services.json_condition import watcher_condition
 
 
 class WatcherBase(BaseModel):
     name: str = Field(max_length=255)
     url: str
-    phrase: str
+    phrase: str = ""
+    kind: WatcherKind = WatcherKind.page
+    json_condition: Optional[str] = None
     interval_minutes: int = Field(ge=1, le=1440)
     emails: str = ""
     enabled: bool = True
+    adaptive_interval: bool = False
+    min_interval_minutes: Optional[int] = Field(default=None, ge=1, le=1440)
+    max_interval_minutes: Optional[int] = Field(default=None, ge=1, le=1440)
 
 
-class WatcherCreate(WatcherBase):
+class WatcherIn(WatcherBase):
+    @model_validator(mode="after")
+    def check_target(self):
+        self.json_condition = watcher_condition(self.kind, self.phrase, self.json_condition)
+        return self
+
+
+class WatcherCreate(WatcherIn):
     pass
 
 
-class WatcherUpdate(WatcherBase):
+class WatcherUpdate(WatcherIn):
     pass
 
 
@@ -26,11 +40,19 @@ class WatcherOut(WatcherBase):
     last_check_at: Optional[datetime] = None
     last_status: Optional[StatusEnum] = None
     last_error: Optional[str] = None
+    effective_interval_minutes: Optional[int] = Field(default=None, exclude=True)
+    render_budget_seconds: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def current_interval_minutes(self) -> int:
+        """Interval the scheduler is using: the adaptive one when enabled, else ``interval_minutes``."""
+        return effective_interval(self)
+
 
 class LogOut(BaseModel):
     id: int
@@ -40,5 +62,8 @@ class LogOut(BaseModel):
     error_message: Optional[str] = None
     email_sent: bool = False
     email_error: Optional[str] = None
+    attempt: int = 1
+    retry_of_id: Optional[int] = None
+    content_length: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import json
+import math
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+HISTORY_SIZE = 20
+# Stable checks needed before the interval grows, and how much it grows each time
+STABLE_CHECKS_TO_GROW = 2
+GROWTH_FACTOR = 1.5
+# Upper bound when the user sets none: this many times the base interval
+DEFAULT_MAX_FACTOR = 8
+MAX_INTERVAL_MINUTES = 1440
+
+
+def interval_bounds(watcher) -> Tuple[int, int]:
+    """(min, max) effective interval in minutes; the base interval is the default floor."""
+    low = watcher.min_interval_minutes or watcher.interval_minutes
+    high = watcher.max_interval_minutes or min(MAX_INTERVAL_MINUTES, watcher.interval_minutes * DEFAULT_MAX_FACTOR)
+    low = max(1, min(low, MAX_INTERVAL_MINUTES))
+    return low, max(low, min(high, MAX_INTERVAL_MINUTES))
+
+
+def effective_interval(watcher) -> int:
+    """Interval the scheduler should use for a watcher right now."""
+    if not watcher.adaptive_interval:
+        return watcher.interval_minutes
+    low, high = interval_bounds(watcher)
+    current = watcher.effective_interval_minutes or watcher.interval_minutes
+    return max(low, min(current, high))
+
+
+def load_history(raw: Optional[str]) -> List[Dict[str, Any]]:
+    try:
+        history = json.loads(raw) if raw else []
+    except ValueError:
+        return []
+    return history if isinstance(history, list) else []
+
+
+def _source(fingerprint: Optional[str]) -> Optional[str]:
+    return fingerprint.split(":", 1)[0] if fingerprint else None
+
+
+def observe(
+    history: List[Dict[str, Any]],
+    checked_at: datetime,
+    status: str,
+    fingerprint: Optional[str],
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Append a check to the fingerprint history and say whether the page changed.
+
+    A change is a different status, or a different fingerprint than the last one
+    taken from the same kind of text (static HTML, in-page text, extracted text),
+    so switching tiers alone is not a change. The first observation is not a change.
+    """
+    changed = False
+    if history:
+        changed = history[-1]['status'] != status
+        source = _source(fingerprint)
+        if fingerprint and not changed:
+            previous = next((h['fp'] for h in reversed(history) if _source(h.get('fp')) == source), None)
+            changed = previous is not None and previous != fingerprint
+    entry = {'at': checked_at.isoformat(timespec='seconds'), 'status': status, 'fp': fingerprint, 'changed': changed}
+    return (history + [entry])[-HISTORY_SIZE:], changed
+
+
+def stable_streak(history: List[Dict[str, Any]]) -> int:
+    streak = 0
+    for entry in reversed(history):
+        if entry.get('changed'):
+            break
+        streak += 1
+    return streak
+
+
+def next_interval(watcher, history: List[Dict[str, Any]], changed: bool) -> int:
+    """
+    New effective interval: any change snaps back to the minimum so fast-moving
+    pages are caught, and every ``STABLE_CHECKS_TO_GROW`` unchanged checks stretch
+    the interval by ``GROWTH_FACTOR`` up to the maximum.
+    """
+    low, high = interval_bounds(watcher)
+    current = effective_interval(watcher)
+    if changed:
+        return low
+    streak = stable_streak(history)
+    if streak and streak % STABLE_CHECKS_TO_GROW == 0:
+        return min(high, math.ceil(current * GROWTH_FACTOR))
+    return current
+
+
+def change_rate(history: List[Dict[str, Any]]) -> Optional[float]:
+    """Share of recorded checks that saw a change (None until there are two checks)."""
+    if len(history) < 2:
+        return None
+    return sum(1 for entry in history[1:] if entry.get('changed')) / (len(history) - 1)
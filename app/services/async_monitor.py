@@ -0,0 +1,449 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Tuple, List, Dict, Any
+from urllib.parse import urlparse
+
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+from app.core.stealth_config import MonitoringConfig
+from app.services.browser_pool import AsyncBrowserPool
+from app.services.enhanced_monitor import (
+    EnhancedMonitor, AGODA_AVAILABILITY_JS, EXCLUDED_TEXT_JS, REMOVE_ELEMENTS_JS, TITLE_CHANGED_JS
+)
+from app.services.page_classifier import PageVerdict, PAGE_SNAPSHOT_JS, classify_page
+from app.services.phrase_watch import PhraseWatch, PHRASE_MATCH_JS
+from app.services.render_budget import RenderTooHeavyError
+from app.services.render_profile import RenderProfile
+from app.services.response_watch import ResponseWatch
+from app.services.scroll_engine import SCROLL_HEIGHT_JS
+from app.services.session_contexts import WarmContext
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEnhancedMonitor(EnhancedMonitor):
+    """
+    Asyncio rendering engine built on ``playwright.async_api``.
+
+    Takes the same inputs and returns the same (found, message, metrics) tuple as
+    ``EnhancedMonitor.monitor_url``, but many checks share one event loop and one
+    browser pool. ``max_concurrency`` caps the number of pages rendering at once.
+    """
+
+    def __init__(self, config: Optional[MonitoringConfig] = None, max_concurrency: int = 8):
+        super().__init__(config)
+        self.browser_pool = AsyncBrowserPool(self.config.browser_pool)
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the loop that actually runs the checks
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def open_session_context(
+        self, pooled, domain: str, stored_cookies: Optional[List[Dict]]
+    ) -> Tuple[Any, Optional[WarmContext], Dict[str, Any]]:
+        """Async mirror of ``EnhancedMonitor.open_session_context``."""
+        warm, reason, stale = self.session_contexts.checkout(pooled, domain)
+        for old in stale:
+            try:
+                await old.context.close()
+            except Exception as e:
+                logger.debug(f"Error closing expired context: {e}")
+        if warm is not None:
+            return warm.context, warm, self.warm_session_info(warm, domain)
+
+        session_id, state = await asyncio.to_thread(self.resolve_session, domain)
+        context = await pooled.browser.new_context(**self.session_context_options(state))
+        stealth_script = self.build_stealth_script()
+        if stealth_script:
+            await context.add_init_script(stealth_script)
+        if stored_cookies:
+            await context.add_cookies(stored_cookies)
+            logger.info(f"Added {len(stored_cookies)} stored cookies")
+        warm, info = self.register_session_context(pooled, domain, reason, session_id, state, context)
+        return context, warm, info
+
+    async def close_session_context(
+        self, pooled, context, warm: Optional[WarmContext], session_id: Optional[str], failed: bool = False
+    ):
+        """Async mirror of ``EnhancedMonitor.close_session_context``."""
+        try:
+            if session_id and not failed:
+                state = await context.storage_state()
+                await asyncio.to_thread(self.save_session_state, session_id, state)
+        except Exception as e:
+            logger.debug(f"Could not save session state: {e}")
+
+        if self.keep_context_warm(pooled, warm, failed):
+            for page in list(context.pages):
+                try:
+                    await page.close()
+                except Exception as e:
+                    logger.debug(f"Error closing page: {e}")
+            self.session_contexts.checkin(warm)
+            return
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Error closing context: {e}")
+
+    async def perform_smart_interactions(
+        self,
+        page,
+        url: str,
+        watch: Optional[PhraseWatch] = None,
+        profile: Optional[RenderProfile] = None,
+        responses: Optional[ResponseWatch] = None,
+        metrics: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Async mirror of ``EnhancedMonitor.perform_smart_interactions``."""
+        engine = self.interaction_engine(url, profile, metrics)
+        should_stop = self.stop_condition(watch, responses)
+        interaction_stats = self.interaction_stats(await engine.scroll_async(page, should_stop=should_stop), profile)
+        if should_stop and should_stop():
+            return {**interaction_stats, 'early_exit': True}
+
+        planner = self.interaction_planner(profile)
+        if not planner.selectors():
+            return interaction_stats
+        try:
+            plan = await planner.plan_async(page)
+        except Exception as e:
+            logger.debug(f"Error planning interactions: {e}")
+            return interaction_stats
+        interaction_stats.update(plan.as_metrics())
+
+        # Hover over potential trigger elements
+        for selector, index in plan.hovers:
+            self.check_render_budget(metrics or {})
+            try:
+                await page.locator(selector).nth(index).hover()
+                if selector not in interaction_stats['hover_hits']:
+                    interaction_stats['hover_hits'].append(selector)
+            except Exception as e:
+                logger.debug(f"Error hovering over {selector}: {e}")
+        if interaction_stats['hover_hits']:
+            await engine.wait_for_growth_async(page, await page.evaluate(SCROLL_HEIGHT_JS), timeout_ms=engine.quiet_ms)
+
+        # Click the first visible load-more button of each selector group
+        for selector, index in plan.clicks:
+            self.check_render_budget(metrics or {})
+            try:
+                logger.info(f"Clicking load more button: {selector}")
+                height = await page.evaluate(SCROLL_HEIGHT_JS)
+                await page.locator(selector).nth(index).click()
+                interaction_stats['click_hits'].append(selector)
+                await engine.wait_for_growth_async(page, height)  # Wait for content to load
+            except Exception as e:
+                logger.debug(f"Error clicking {selector}: {e}")
+
+        return interaction_stats
+
+    async def extract_page_text(self, page, exclude_selector: Optional[str], metrics: Dict[str, Any]) -> Tuple[str, str]:
+        """Async mirror of ``EnhancedMonitor.extract_page_text``."""
+        step_start = time.time()
+        full_content = await page.content()
+        excluded_content = ""
+        if exclude_selector:
+            try:
+                count = await page.locator(exclude_selector).count()
+                logger.info(f"Found {count} elements matching exclude selector")
+                excluded_content = await page.locator(exclude_selector).evaluate_all(EXCLUDED_TEXT_JS)
+                logger.info(f"Captured excluded content using evaluate_all")
+            except Exception as e:
+                logger.warning(f"Failed to capture excluded content: {e}")
+        self.add_step(
+            metrics, 'content_capture', step_start,
+            full_content_length=len(full_content), excluded_content_length=len(excluded_content)
+        )
+
+        if exclude_selector:
+            step_start = time.time()
+            try:
+                logger.info(f"Removing elements matching: {exclude_selector}")
+                removed_count = await page.locator(exclude_selector).count()
+                await page.locator(exclude_selector).evaluate_all(REMOVE_ELEMENTS_JS)
+                self.excluded_removed(metrics, step_start, exclude_selector, removed_count)
+            except Exception as e:
+                self.exclusion_failed(metrics, step_start, e)
+
+        step_start = time.time()
+        content = await page.locator('body').inner_text()
+        self.add_step(metrics, 'content_extraction', step_start, content_length=len(content))
+        return content, excluded_content
+
+    async def match_phrase_in_page(self, page, target_phrase: str, exclude_selector: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Async mirror of ``EnhancedMonitor.match_phrase_in_page``."""
+        try:
+            return await page.evaluate(PHRASE_MATCH_JS, {'phrase': target_phrase, 'exclude': exclude_selector})
+        except Exception as e:
+            logger.warning(f"In-page phrase match failed, falling back to text extraction: {e}")
+            return None
+
+    async def save_response_cookies(self, context, domain: str) -> int:
+        cookies = await context.cookies()
+        if cookies:
+            await asyncio.to_thread(self.save_cookies_for_domain, domain, cookies)
+        return len(cookies) if cookies else 0
+
+    async def save_screenshot(self, page, screenshot_path: str, metrics: Dict[str, Any]):
+        step_start = time.time()
+        try:
+            await page.screenshot(path=screenshot_path)
+            logger.info(f"Saved screenshot to {screenshot_path}")
+        except Exception as e:
+            logger.warning(f"Failed to save screenshot: {e}")
+        self.add_step(metrics, 'screenshot', step_start, path=screenshot_path)
+
+    async def page_snapshot(self, page) -> Optional[Dict[str, Any]]:
+        try:
+            return await page.evaluate(PAGE_SNAPSHOT_JS)
+        except Exception as e:
+            logger.debug(f"Could not snapshot page for classification: {e}")
+            return None
+
+    async def classify_loaded_page(self, page, response, metrics: Dict[str, Any]) -> Optional[PageVerdict]:
+        """Async mirror of ``EnhancedMonitor.classify_loaded_page``."""
+        if not self.config.rendering.classify_pages:
+            return None
+        step_start = time.time()
+        http_status = response.status if response is not None else None
+        snapshot = await self.page_snapshot(page)
+        verdict = classify_page(http_status, snapshot)
+        grace_ms = self.challenge_grace_ms(verdict, metrics)
+        if grace_ms is not None:
+            try:
+                await page.wait_for_function(TITLE_CHANGED_JS, arg=snapshot.get('title', ''), timeout=grace_ms)
+                await page.wait_for_load_state("domcontentloaded", timeout=grace_ms)
+            except Exception:
+                pass  # still challenged, or navigating away
+            verdict = self.reclassify_after_grace(http_status, snapshot, await self.page_snapshot(page))
+        self.record_page_classification(metrics, step_start, http_status, snapshot, verdict)
+        return verdict
+
+    async def check_agoda_availability(self, page, target_phrase: str) -> bool:
+        """Async mirror of ``EnhancedMonitor.check_agoda_availability``."""
+        logger.info(f"Running Agoda-specific availability check for phrase: '{target_phrase}'")
+        try:
+            return self.agoda_available(await page.evaluate(AGODA_AVAILABILITY_JS, target_phrase))
+        except Exception as e:
+            logger.error(f"Error in Agoda availability check: {e}")
+            return False
+
+    async def monitor_url(
+        self,
+        url: str,
+        target_phrase: str,
+        selector: Optional[str] = None,
+        exclude_selector: Optional[str] = None,
+        screenshot_path: Optional[str] = None,
+        html_dump_path: Optional[str] = None,
+        watcher_id: Optional[int] = None,
+        extra_phrases: Optional[List[str]] = None,
+        render_budget: Optional[float] = None
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Async URL monitoring: static tier first, then a browser render gated by the
+        engine semaphore.
+
+        Returns:
+            Tuple of (found: bool, message: str, metrics: Dict)
+        """
+        metrics = self.new_metrics(url, target_phrase)
+
+        # Plain HTTP work is blocking (requests); keep it off the event loop
+        static_verdict = await asyncio.to_thread(
+            self.try_static_tier, url, target_phrase, selector, exclude_selector, metrics, extra_phrases
+        )
+        if static_verdict is not None:
+            return static_verdict
+
+        queued_at = time.time()
+        async with self.semaphore:
+            metrics['steps'].append({
+                'step': 'concurrency_wait',
+                'timestamp': time.time(),
+                'duration': time.time() - queued_at
+            })
+            self.start_render_budget(metrics, render_budget)
+            found, message, metrics = await self.render_in_browser(
+                url, target_phrase, selector, exclude_selector, screenshot_path, html_dump_path, metrics,
+                watcher_id=watcher_id, extra_phrases=extra_phrases
+            )
+            self.finish_render_budget(metrics)
+        await asyncio.to_thread(self.learn_render_tier, url, metrics, found)
+        if not extra_phrases:
+            await asyncio.to_thread(self.learn_render_profile, self.profile_key(url, watcher_id), metrics, found)
+        return found, message, metrics
+
+    async def render_in_browser(
+        self,
+        url: str,
+        target_phrase: str,
+        selector: Optional[str],
+        exclude_selector: Optional[str],
+        screenshot_path: Optional[str],
+        html_dump_path: Optional[str],
+        metrics: Dict[str, Any],
+        watcher_id: Optional[int] = None,
+        extra_phrases: Optional[List[str]] = None
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        """Async mirror of ``EnhancedMonitor.render_in_browser``; only the Playwright calls differ."""
+        domain = urlparse(url).netloc
+        metrics['tier'] = 'browser'
+
+        # Cookie/session storage is SQLite; keep it off the event loop
+        stored_cookies = await asyncio.to_thread(self.prepare_session, domain)
+        profile = await asyncio.to_thread(self.render_profile_for, url, watcher_id, extra_phrases)
+
+        attempt = 0
+        last_length = None
+
+        while attempt <= self.config.resilience.max_retries:
+            attempt += 1
+            metrics['attempts'] = attempt
+            attempt_start = time.time()
+
+            try:
+                self.check_render_budget(metrics)
+                step_start = time.time()
+
+                pooled, pool_info = await self.browser_pool.acquire()
+                context = None
+                warm = None
+                blocker = None
+                failed = False
+                session_info = {}
+                try:
+                    context, warm, session_info = await self.open_session_context(pooled, domain, stored_cookies)
+                    blocker, watch, responses = self.attempt_watchers(
+                        url, target_phrase, exclude_selector, screenshot_path, html_dump_path, watcher_id, extra_phrases
+                    )
+                    await blocker.attach_async(context)
+
+                    page = await context.new_page()
+                    page.set_default_timeout(self.page_timeout_ms(metrics, self.config.rendering.max_timeout))
+                    if watch:
+                        await watch.attach_async(page)
+                    if responses:
+                        responses.attach_async(page)
+                    self.add_step(metrics, 'browser_launch', step_start, **pool_info, **session_info)
+
+                    step_start = time.time()
+                    logger.info(f"Attempt {attempt}: Navigating to {url}")
+                    response = None
+                    try:
+                        response = await page.goto(
+                            url,
+                            wait_until="domcontentloaded",
+                            timeout=self.page_timeout_ms(metrics, self.config.rendering.max_timeout)
+                        )
+                    except PlaywrightTimeout:
+                        logger.warning(f"DOM content load timeout, continuing with partial content")
+                    self.add_step(metrics, 'navigation', step_start)
+                    self.check_render_budget(metrics)
+
+                    verdict = await self.classify_loaded_page(page, response, metrics)
+                    if verdict is not None:
+                        failed = True
+                        return self.classified_result(url, metrics, verdict)
+
+                    if responses and responses.decided:
+                        await self.save_response_cookies(context, domain)
+                        return self.response_result(responses, url, target_phrase, metrics)
+
+                    step_start = time.time()
+                    interaction_stats = await self.perform_smart_interactions(
+                        page, url, watch, profile if attempt == 1 else None, responses, metrics
+                    )
+                    self.add_step(metrics, 'smart_interactions', step_start, **interaction_stats)
+
+                    if watch and watch.found:
+                        await self.save_response_cookies(context, domain)
+                        return self.early_exit_result(watch, url, target_phrase, metrics)
+                    if responses and responses.decided:
+                        await self.save_response_cookies(context, domain)
+                        return self.response_result(responses, url, target_phrase, metrics)
+                    self.check_render_budget(metrics)
+
+                    if selector:
+                        step_start = time.time()
+                        try:
+                            await page.wait_for_selector(
+                                selector,
+                                timeout=self.page_timeout_ms(metrics, self.config.rendering.poll_interval)
+                            )
+                            logger.info(f"Selector '{selector}' found")
+                        except Exception as e:
+                            logger.warning(f"Selector '{selector}' not found: {e}")
+                        self.add_step(
+                            metrics, 'selector_wait', step_start,
+                            selector=selector, found=await page.locator(selector).count() > 0
+                        )
+
+                    if responses and responses.decided:
+                        await self.save_response_cookies(context, domain)
+                        return self.response_result(responses, url, target_phrase, metrics)
+
+                    if "agoda.com" in url:
+                        step_start = time.time()
+                        found = await self.check_agoda_availability(page, target_phrase)
+                        extra_found = {
+                            phrase: await self.check_agoda_availability(page, phrase) for phrase in extra_phrases or []
+                        }
+                        result = self.agoda_result(url, target_phrase, metrics, step_start, found, extra_found)
+                        if result is None:
+                            continue
+                        await self.save_response_cookies(context, domain)
+                        return result
+
+                    match = None
+                    if self.matches_in_page(html_dump_path, extra_phrases):
+                        step_start = time.time()
+                        match = await self.match_phrase_in_page(page, target_phrase, exclude_selector)
+                        self.record_in_page_match(metrics, step_start, match)
+                    if match is None:
+                        content, excluded_content = await self.extract_page_text(page, exclude_selector, metrics)
+                        match = self.match_extracted_text(
+                            url, target_phrase, content, excluded_content, metrics, extra_phrases
+                        )
+
+                    if screenshot_path:
+                        await self.save_screenshot(page, screenshot_path, metrics)
+                    if html_dump_path:
+                        self.write_html_dump(html_dump_path, content, metrics)
+
+                    step_start = time.time()
+                    stored = await self.save_response_cookies(context, domain)
+                    self.add_step(metrics, 'cookie_storage', step_start, cookies_stored=stored)
+
+                    result = self.match_result(url, target_phrase, match, metrics)
+                    if result is not None:
+                        return result
+                    last_length = self.next_length(match['text_length'], last_length)
+
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    if blocker is not None:
+                        metrics['steps'].append(blocker.metrics_step())
+                        if context is not None:
+                            await blocker.detach_async(context)
+                    if context is not None:
+                        await self.close_session_context(pooled, context, warm, session_info.get('session_id'), failed)
+                    await self.browser_pool.release(pooled)
+
+            except RenderTooHeavyError as e:
+                return self.heavy_result(url, metrics, e)
+            except Exception as e:
+                result = self.attempt_failed(metrics, attempt, attempt_start, e)
+                if result is not None:
+                    return result
+
+        return self.exhausted_result(target_phrase, attempt, metrics)
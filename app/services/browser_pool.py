@@ -0,0 +1,365 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple
+
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright
+from app.core.stealth_config import BrowserPoolConfig
+
+
+logger = logging.getLogger(__name__)
+
+BROWSER_LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--disable-infobars",
+    "--disable-notifications",
+    "--disable-geolocation",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--no-sandbox",
+    "--disable-setuid-sandbox"
+]
+
+
+def read_process_rss_mb(pids: List[int]) -> Optional[float]:
+    """Sum the resident set size of the given processes (Linux only)."""
+    total_kb = 0
+    seen = False
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status", 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        seen = True
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024 if seen else None
+
+
+@dataclass(eq=False)
+class PooledBrowser:
+    """A Chromium process plus the bookkeeping used to decide when to recycle it."""
+    browser: Any
+    slot: Optional[int] = None  # None for ephemeral (non-pooled) browsers
+    launched_at: float = field(default_factory=time.time)
+    pages_served: int = 0
+    last_rss_mb: Optional[float] = None
+    contexts: Dict[str, Any] = field(default_factory=dict)  # warm contexts by domain
+    closed: bool = False
+
+    @property
+    def ephemeral(self) -> bool:
+        return self.slot is None
+
+    def is_healthy(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+    def measure_rss_mb(self) -> Optional[float]:
+        """Measure RSS of the browser's process tree via the CDP process list."""
+        try:
+            session = self.browser.new_browser_cdp_session()
+            try:
+                info = session.send("SystemInfo.getProcessInfo")
+            finally:
+                session.detach()
+        except Exception as e:
+            logger.debug(f"Could not read browser process info: {e}")
+            return None
+        pids = [proc['id'] for proc in info.get('processInfo', []) if 'id' in proc]
+        self.last_rss_mb = read_process_rss_mb(pids)
+        return self.last_rss_mb
+
+    def close(self):
+        self.closed = True
+        self.contexts.clear()
+        try:
+            self.browser.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser: {e}")
+
+    async def close_async(self):
+        self.closed = True
+        self.contexts.clear()
+        try:
+            await self.browser.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser: {e}")
+
+
+def recycle_reason(config: BrowserPoolConfig, pooled: PooledBrowser) -> Optional[str]:
+    """Return why a warm browser must be replaced, or None if it can be reused."""
+    if not pooled.is_healthy():
+        return "unhealthy"
+    if pooled.pages_served >= config.max_pages_per_browser:
+        return "max_pages"
+    if time.time() - pooled.launched_at >= config.max_age_seconds:
+        return "max_age"
+    if config.max_rss_mb and pooled.last_rss_mb and pooled.last_rss_mb >= config.max_rss_mb:
+        return "max_rss"
+    return None
+
+
+class BrowserPool:
+    """
+    Keeps warm Chromium processes alive across checks.
+
+    Playwright's sync API is bound to the thread that started it, so each worker
+    thread owns its own driver and (at most) one warm browser. The pool caps the
+    number of warm browsers at ``config.size``; threads beyond that cap get an
+    ephemeral browser that is closed after the check, which is the legacy
+    behaviour. Contexts are created by the caller, either per check or kept warm
+    per domain in ``PooledBrowser.contexts``.
+    """
+
+    def __init__(self, config: BrowserPoolConfig):
+        self.config = config
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._free_slots: List[int] = []
+        self._next_slot = 0
+        self._hits = 0
+        self._misses = 0
+        self._recycled = 0
+
+    def _playwright(self):
+        playwright = getattr(self._local, 'playwright', None)
+        if playwright is None:
+            playwright = sync_playwright().start()
+            self._local.playwright = playwright
+        return playwright
+
+    def _launch(self):
+        return self._playwright().chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+
+    def _claim_slot(self) -> Optional[int]:
+        with self._lock:
+            if self._free_slots:
+                return self._free_slots.pop()
+            if self._next_slot < self.config.size:
+                self._next_slot += 1
+                return self._next_slot - 1
+            return None
+
+    def _release_slot(self, slot: int):
+        with self._lock:
+            self._free_slots.append(slot)
+
+    def _recycle_reason(self, pooled: PooledBrowser) -> Optional[str]:
+        return recycle_reason(self.config, pooled)
+
+    def _retire(self, pooled: PooledBrowser, reason: str):
+        logger.info(
+            f"Recycling pooled browser slot {pooled.slot} ({reason}) after "
+            f"{pooled.pages_served} pages, rss={pooled.last_rss_mb}"
+        )
+        pooled.close()
+        self._local.pooled = None
+        self._local.retired_reason = reason
+        self._release_slot(pooled.slot)
+        with self._lock:
+            self._recycled += 1
+
+    def acquire(self) -> Tuple[PooledBrowser, Dict[str, Any]]:
+        """
+        Get a browser for the calling thread.
+
+        Returns:
+            Tuple of (pooled browser, pool info for the ``browser_launch`` metrics step)
+        """
+        pooled = getattr(self._local, 'pooled', None)
+        miss_reason = getattr(self._local, 'retired_reason', None) or "cold"
+        self._local.retired_reason = None
+
+        if pooled is not None:
+            reason = self._recycle_reason(pooled)
+            if reason is None:
+                with self._lock:
+                    self._hits += 1
+                return pooled, {'pool': 'hit', 'slot': pooled.slot, 'pages_served': pooled.pages_served}
+            self._retire(pooled, reason)
+            miss_reason = reason
+
+        slot = self._claim_slot() if self.config.enabled else None
+        if slot is None:
+            miss_reason = "pool_full" if self.config.enabled else "disabled"
+        try:
+            pooled = PooledBrowser(browser=self._launch(), slot=slot)
+        except Exception:
+            if slot is not None:
+                self._release_slot(slot)
+            raise
+
+        if slot is not None:
+            self._local.pooled = pooled
+        with self._lock:
+            self._misses += 1
+        return pooled, {'pool': 'miss', 'reason': miss_reason, 'slot': slot, 'pages_served': 0}
+
+    def release(self, pooled: PooledBrowser):
+        """Return a browser after a check, recycling it if it is over its limits."""
+        pooled.pages_served += 1
+        if pooled.ephemeral:
+            pooled.close()
+            return
+        if self.config.max_rss_mb:
+            pooled.measure_rss_mb()
+        reason = self._recycle_reason(pooled)
+        if reason is not None:
+            self._retire(pooled, reason)
+
+    @contextmanager
+    def browser(self):
+        """Context manager yielding (pooled browser, pool_info) for one check."""
+        pooled, info = self.acquire()
+        try:
+            yield pooled, info
+        finally:
+            self.release(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': self.config.size,
+                'warm': self._next_slot - len(self._free_slots),
+                'hits': self._hits,
+                'misses': self._misses,
+                'recycled': self._recycled,
+            }
+
+    def shutdown(self):
+        """
+        Close the calling thread's browser and driver.
+
+        Browsers owned by other worker threads cannot be closed from here (the sync
+        API is thread-bound); their drivers exit together with the process.
+        """
+        pooled = getattr(self._local, 'pooled', None)
+        if pooled is not None:
+            self._retire(pooled, "shutdown")
+        playwright = getattr(self._local, 'playwright', None)
+        if playwright is not None:
+            try:
+                playwright.stop()
+            except Exception as e:
+                logger.debug(f"Error stopping Playwright driver: {e}")
+            self._local.playwright = None
+
+
+class AsyncBrowserPool:
+    """
+    Event-loop counterpart of ``BrowserPool`` for the async rendering engine.
+
+    All checks share one Playwright driver, so up to ``config.size`` browsers are
+    spread across concurrent checks (each browser hosts several contexts at once).
+    Browsers over their limits stop receiving work and are closed once drained.
+    """
+
+    def __init__(self, config: BrowserPoolConfig):
+        self.config = config
+        self._playwright = None
+        self._browsers: List[PooledBrowser] = []
+        self._active: Dict[int, int] = {}
+        self._draining: List[PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._recycled = 0
+
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS)
+
+    async def _close_if_drained(self, pooled: PooledBrowser):
+        if pooled in self._draining and self._active.get(id(pooled), 0) == 0:
+            self._draining.remove(pooled)
+            self._active.pop(id(pooled), None)
+            await pooled.close_async()
+
+    async def _measure_rss_mb(self, pooled: PooledBrowser) -> Optional[float]:
+        try:
+            session = await pooled.browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception as e:
+            logger.debug(f"Could not read browser process info: {e}")
+            return None
+        pids = [proc['id'] for proc in info.get('processInfo', []) if 'id' in proc]
+        pooled.last_rss_mb = read_process_rss_mb(pids)
+        return pooled.last_rss_mb
+
+    async def acquire(self) -> Tuple[PooledBrowser, Dict[str, Any]]:
+        async with self._lock:
+            miss_reason = "cold"
+            for pooled in list(self._browsers):
+                reason = recycle_reason(self.config, pooled)
+                if reason is not None:
+                    logger.info(f"Draining pooled browser ({reason}) after {pooled.pages_served} pages")
+                    self._browsers.remove(pooled)
+                    self._draining.append(pooled)
+                    self._recycled += 1
+                    miss_reason = reason
+                    await self._close_if_drained(pooled)
+
+            if not self.config.enabled:
+                pooled = PooledBrowser(browser=await self._launch())
+                self._misses += 1
+                return pooled, {'pool': 'miss', 'reason': 'disabled', 'slot': None, 'pages_served': 0}
+
+            if len(self._browsers) < self.config.size and (
+                not self._browsers or min(self._active.get(id(b), 0) for b in self._browsers) > 0
+            ):
+                pooled = PooledBrowser(browser=await self._launch(), slot=len(self._browsers))
+                self._browsers.append(pooled)
+                self._active[id(pooled)] = 1
+                self._misses += 1
+                return pooled, {'pool': 'miss', 'reason': miss_reason, 'slot': pooled.slot, 'pages_served': 0}
+
+            pooled = min(self._browsers, key=lambda b: self._active.get(id(b), 0))
+            self._active[id(pooled)] = self._active.get(id(pooled), 0) + 1
+            self._hits += 1
+            return pooled, {'pool': 'hit', 'slot': pooled.slot, 'pages_served': pooled.pages_served}
+
+    async def release(self, pooled: PooledBrowser):
+        pooled.pages_served += 1
+        if pooled.ephemeral:
+            await pooled.close_async()
+            return
+        async with self._lock:
+            self._active[id(pooled)] = max(0, self._active.get(id(pooled), 1) - 1)
+            if self.config.max_rss_mb and self._active[id(pooled)] == 0:
+                await self._measure_rss_mb(pooled)
+            await self._close_if_drained(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'size': self.config.size,
+            'warm': len(self._browsers),
+            'draining': len(self._draining),
+            'hits': self._hits,
+            'misses': self._misses,
+            'recycled': self._recycled,
+        }
+
+    async def shutdown(self):
+        async with self._lock:
+            for pooled in self._browsers + self._draining:
+                await pooled.close_async()
+            self._browsers = []
+            self._draining = []
+            self._active = {}
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
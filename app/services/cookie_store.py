@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple
+
+from app.core.stealth_config import SessionConfig
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS cookies (
+        domain TEXT PRIMARY KEY,
+        cookies TEXT,
+        last_updated TIMESTAMP,
+        expires TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        domain TEXT,
+        created_at TIMESTAMP,
+        expires_at TIMESTAMP,
+        context_data TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS render_profiles (
+        profile_key TEXT PRIMARY KEY,
+        profile TEXT,
+        updated_at TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS render_tiers (
+        page_key TEXT PRIMARY KEY,
+        needs_js INTEGER,
+        static_agreements INTEGER,
+        reason TEXT,
+        updated_at TIMESTAMP
+    )
+    ''',
+]
+
+
+class CookieStore:
+    """
+    Cookie/session storage shared by every check of an ``EnhancedMonitor``.
+
+    One WAL-mode connection is kept open and serialized with a lock, instead of
+    a connection per call. Per-domain cookie jars are cached in an in-memory LRU.
+    Cookie and session-state writes are coalesced and flushed by a background
+    thread every ``flush_interval`` seconds, so several saves of the same jar
+    cost one write. Expiry cleanup runs at most once per ``cleanup_interval``.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        config: SessionConfig,
+        cache_size: int = 256,
+        flush_interval: float = 2.0,
+        cleanup_interval: float = 300.0
+    ):
+        self.db_path = Path(db_path)
+        self.config = config
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.cleanup_interval = cleanup_interval
+
+        self._lock = threading.RLock()
+        self._jars: "OrderedDict[str, Tuple[List[Dict], datetime]]" = OrderedDict()
+        self._dirty_jars: Dict[str, Tuple[List[Dict], datetime]] = {}
+        self._dirty_states: Dict[str, Dict] = {}
+        self._last_cleanup = 0.0
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.writes_coalesced = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=10)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock:
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            self.conn.commit()
+
+    # -- generic access for the other cookie-DB tables -------------------------
+
+    def execute(self, sql: str, params: Tuple = ()):
+        with self._lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+
+    def fetchone(self, sql: str, params: Tuple = ()) -> Optional[Tuple]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    # -- cookies ----------------------------------------------------------------
+
+    def _remember(self, domain: str, cookies: List[Dict], expires: datetime):
+        self._jars[domain] = (cookies, expires)
+        self._jars.move_to_end(domain)
+        while len(self._jars) > self.cache_size:
+            self._jars.popitem(last=False)
+
+    def get_cookies(self, domain: str) -> Optional[List[Dict]]:
+        now = datetime.now()
+        with self._lock:
+            cached = self._jars.get(domain)
+            if cached is not None:
+                self._jars.move_to_end(domain)
+                cookies, expires = cached
+                return cookies if expires > now else None
+            row = self.conn.execute(
+                'SELECT cookies, expires FROM cookies WHERE domain = ?', (domain,)
+            ).fetchone()
+            if not row:
+                return None
+            cookies = json.loads(row[0])
+            try:
+                expires = datetime.fromisoformat(row[1]) if row[1] else datetime.max
+            except ValueError:
+                expires = now  # legacy CURRENT_TIMESTAMP-style rows are re-saved on next check
+            self._remember(domain, cookies, expires)
+            return cookies if expires > now else None
+
+    def save_cookies(self, domain: str, cookies: List[Dict]):
+        expires = datetime.now() + timedelta(days=self.config.cookie_expiration_days)
+        with self._lock:
+            cached = self._jars.get(domain)
+            self._remember(domain, cookies, expires)
+            if cached is not None and cached[0] == cookies and domain not in self._dirty_jars:
+                # Jar unchanged since it was stored; only the expiry would move
+                self.writes_coalesced += 1
+                return
+            if domain in self._dirty_jars:
+                self.writes_coalesced += 1
+            self._dirty_jars[domain] = (cookies, expires)
+        self._schedule_flush()
+
+    # -- sessions -----------------------------------------------------------------
+
+    def start_session(self, domain: str) -> str:
+        now = datetime.now()
+        session_id = hashlib.md5(f"{domain}_{now.isoformat()}".encode()).hexdigest()
+        expires_at = now + timedelta(seconds=self.config.session_ttl_seconds)
+        with self._lock:
+            self.conn.execute('''
+                INSERT INTO sessions (session_id, domain, created_at, expires_at)
+                VALUES (?, ?, ?, ?)
+            ''', (session_id, domain, now.isoformat(), expires_at.isoformat()))
+            self.conn.execute('''
+                DELETE FROM sessions WHERE domain = ? AND session_id NOT IN (
+                    SELECT session_id FROM sessions WHERE domain = ?
+                    ORDER BY created_at DESC LIMIT ?
+                )
+            ''', (domain, domain, self.config.max_sessions_per_domain))
+            self.conn.commit()
+        return session_id
+
+    def get_session_state(self, domain: str) -> Optional[Tuple[str, Optional[Dict]]]:
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT session_id, context_data FROM sessions
+                WHERE domain = ? AND expires_at > ?
+                ORDER BY created_at DESC LIMIT 1
+            ''', (domain, datetime.now().isoformat())).fetchone()
+            if not row:
+                return None
+            session_id, context_data = row
+            if session_id in self._dirty_states:
+                return session_id, self._dirty_states[session_id]
+            return session_id, json.loads(context_data) if context_data else None
+
+    def save_session_state(self, session_id: str, state: Dict):
+        with self._lock:
+            if session_id in self._dirty_states:
+                self.writes_coalesced += 1
+            self._dirty_states[session_id] = state
+        self._schedule_flush()
+
+    # -- maintenance ----------------------------------------------------------------
+
+    def cleanup(self):
+        """Delete expired sessions and cookie jars."""
+        now = datetime.now()
+        with self._lock:
+            self.conn.execute('DELETE FROM sessions WHERE expires_at <= ?', (now.isoformat(),))
+            self.conn.execute('DELETE FROM cookies WHERE expires <= ?', (now.isoformat(),))
+            self.conn.commit()
+            for domain in [d for d, (_, expires) in self._jars.items() if expires <= now]:
+                self._jars.pop(domain)
+            self._last_cleanup = time.time()
+
+    def maybe_cleanup(self):
+        if time.time() - self._last_cleanup >= self.cleanup_interval:
+            self.cleanup()
+
+    def flush(self):
+        """Write every pending cookie jar and session state in one transaction."""
+        with self._lock:
+            if not self._dirty_jars and not self._dirty_states:
+                return
+            jars, self._dirty_jars = self._dirty_jars, {}
+            states, self._dirty_states = self._dirty_states, {}
+            try:
+                self.conn.executemany('''
+                    INSERT OR REPLACE INTO cookies (domain, cookies, last_updated, expires)
+                    VALUES (?, ?, ?, ?)
+                ''', [
+                    (domain, json.dumps(cookies), datetime.now().isoformat(), expires.isoformat())
+                    for domain, (cookies, expires) in jars.items()
+                ])
+                self.conn.executemany(
+                    'UPDATE sessions SET context_data = ? WHERE session_id = ?',
+                    [(json.dumps(state), session_id) for session_id, state in states.items()]
+                )
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Cookie store flush failed, will retry: {e}")
+                self.conn.rollback()
+                for domain, jar in jars.items():
+                    self._dirty_jars.setdefault(domain, jar)
+                for session_id, state in states.items():
+                    self._dirty_states.setdefault(session_id, state)
+
+    def _schedule_flush(self):
+        if self.flush_interval <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._stop.clear()
+                self._flusher = threading.Thread(target=self._flush_loop, name="cookie-store-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Cookie store flush error: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,436 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from app.services.placement import LoadTracker
+from app.services.rate_limiter import DomainRateLimiter
+from app.services.resource_blocker import domain_matches
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_url(url: str) -> str:
+    """Key under which checks of the same page share a render."""
+    parsed = urlparse(url.strip())
+    path = parsed.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params, query, ""))
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
+
+
+@dataclass
+class DispatchItem:
+    """One queued check."""
+    watcher_id: int
+    domain: str
+    force: bool = False
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    rate_limited_at: Optional[float] = None  # first time the domain's rate limit deferred it
+    url_key: Optional[str] = None
+    priority: bool = False  # manual/API checks: served ahead of scheduled ones
+    attempt: int = 1  # > 1 for a retry of a failed check
+    retry_of: Optional[int] = None  # log id of the attempt being retried
+    riders: List["DispatchItem"] = field(default_factory=list)  # same-URL checks sharing this render
+
+    def batch(self) -> List["DispatchItem"]:
+        return [self] + self.riders
+
+    @property
+    def queue_wait(self) -> float:
+        return (self.started_at or time.time()) - self.enqueued_at
+
+    @property
+    def rate_wait(self) -> float:
+        if self.rate_limited_at is None:
+            return 0.0
+        return (self.started_at or time.time()) - self.rate_limited_at
+
+    def as_metrics(self) -> Dict[str, object]:
+        return {
+            'domain': self.domain,
+            'queue_wait': round(self.queue_wait, 3),
+            'rate_wait': round(self.rate_wait, 3),
+            'shared_with': len(self.riders),
+            'priority': self.priority,
+            'attempt': self.attempt,
+        }
+
+
+class CheckDispatcher:
+    """
+    Admission control between APScheduler and the render workers.
+
+    Scheduler jobs only ``submit`` a check; the dispatcher starts it once both the
+    global cap (``max_concurrent``) and its domain's cap allow. Excess work waits in
+    per-domain FIFO queues that are served round-robin, so one busy host cannot
+    starve the others, and a watcher is never queued or run twice at once. With a
+    ``rate_limiter`` a domain whose token bucket is empty is skipped (not slept on)
+    and the queue is pumped again when its next token is due.
+
+    With ``coalesce`` every queued check of the same normalized URL rides along
+    with the one being started, so renders (and the caps above) scale with unique
+    URLs rather than with watchers.
+
+    Priority checks (manual "Run now" and API-triggered) wait in their own FIFO
+    lane that is served before any domain queue, and may also use
+    ``priority_slots`` render slots beyond ``max_concurrent`` that scheduled checks
+    never take, so they start at once even when scheduled renders fill the pool.
+    Domain caps and rate limits still apply to them.
+
+    ``launch(item, done)`` starts the check on whatever runner the scheduler uses
+    (thread pool or event loop) and must call ``done()`` when it finishes.
+    ``on_finished(item)``, if set, is called after each render completes.
+    """
+
+    def __init__(
+        self,
+        launch: Callable[[DispatchItem, Callable[[], None]], None],
+        max_concurrent: int,
+        domain_limit: int,
+        domain_limits: Optional[Dict[str, int]] = None,
+        rate_limiter: Optional[DomainRateLimiter] = None,
+        coalesce: bool = True,
+        priority_slots: int = 0,
+    ):
+        self.launch = launch
+        self.max_concurrent = max(1, max_concurrent)
+        self.domain_limit = max(1, domain_limit)
+        self.domain_limits = {d.lower(): max(1, n) for d, n in (domain_limits or {}).items()}
+        self.rate_limiter = rate_limiter
+        self.coalesce = coalesce
+        self.priority_slots = max(0, priority_slots)
+        self.load = LoadTracker()
+        self.on_finished: Optional[Callable[[DispatchItem], None]] = None
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_due = 0.0
+        self._queues: "OrderedDict[str, Deque[DispatchItem]]" = OrderedDict()
+        self._queued: Dict[int, DispatchItem] = {}
+        self._priority: Deque[DispatchItem] = deque()
+        self._running: Dict[int, DispatchItem] = {}  # watcher id -> the render it is part of
+        self._held: Dict[int, DispatchItem] = {}  # retries waiting for the watcher's running check to finish
+        self._active = 0  # renders in flight
+        self._running_by_domain: Dict[str, int] = {}
+        self._accepting = True
+        self._dispatched = 0
+        self._deduplicated = 0
+        self._coalesced = 0
+        self._prioritized = 0
+
+    def bucket(self, url_or_host: str) -> str:
+        """Concurrency bucket for a URL: its configured domain, else the bare host."""
+        host = (urlparse(url_or_host).hostname if "://" in url_or_host else url_or_host) or ""
+        host = host.lower()
+        for domain in self.domain_limits:
+            if domain_matches(host, [domain]):
+                return domain
+        return host[4:] if host.startswith("www.") else host
+
+    def domain_cap(self, domain: str) -> int:
+        return self.domain_limits.get(domain, self.domain_limit)
+
+    def submit(
+        self,
+        watcher_id: int,
+        domain: str,
+        force: bool = False,
+        url_key: Optional[str] = None,
+        priority: bool = False,
+        attempt: int = 1,
+        retry_of: Optional[int] = None,
+    ) -> bool:
+        """
+        Queue a check. Returns False if the watcher is already running (or the
+        dispatcher is shut down); a queued duplicate is merged into the queued item,
+        moving it to the priority lane if this submission is a priority one. A
+        merged retry keeps its lineage (``attempt``, ``retry_of``). A retry of a
+        watcher that is still running is held and queued once that check finishes.
+        """
+        with self._lock:
+            if not self._accepting:
+                return False
+            if watcher_id in self._running:
+                if attempt > 1:
+                    held = self._held.get(watcher_id)
+                    if held is None or attempt > held.attempt:
+                        self._held[watcher_id] = DispatchItem(
+                            watcher_id=watcher_id,
+                            domain=domain,
+                            force=force or (held is not None and held.force),
+                            url_key=url_key,
+                            priority=priority or (held is not None and held.priority),
+                            attempt=attempt,
+                            retry_of=retry_of,
+                        )
+                    logger.info(f"[Watcher #{watcher_id}] Check still running, retry {attempt - 1} queued behind it")
+                    return True
+                self._deduplicated += 1
+                logger.info(f"[Watcher #{watcher_id}] Check already running, skipping")
+                return False
+            queued = self._queued.get(watcher_id)
+            if queued is not None:
+                self._deduplicated += 1
+                queued.force = queued.force or force
+                if attempt > queued.attempt:
+                    queued.attempt, queued.retry_of = attempt, retry_of
+                if priority and not queued.priority:
+                    self._remove_from_domain(queued)
+                    queued.priority = True
+                    self._priority.append(queued)
+                    self._prioritized += 1
+            else:
+                self._enqueue(DispatchItem(
+                    watcher_id=watcher_id,
+                    domain=domain,
+                    force=force,
+                    url_key=url_key,
+                    priority=priority,
+                    attempt=attempt,
+                    retry_of=retry_of,
+                ))
+        self._pump()
+        return True
+
+    def _enqueue(self, item: DispatchItem):
+        """Put a new item in its lane. Caller holds the lock."""
+        self._queued[item.watcher_id] = item
+        if item.priority:
+            self._priority.append(item)
+            self._prioritized += 1
+        else:
+            self._queues.setdefault(item.domain, deque()).append(item)
+
+    def _remove_from_domain(self, item: DispatchItem):
+        queue = self._queues.get(item.domain)
+        if queue is not None and item in queue:
+            queue.remove(item)
+            if not queue:
+                del self._queues[item.domain]
+
+    def _rate_wait(self, domain: str, waiting) -> float:
+        """Take a token for ``domain``; if none is free, mark ``waiting`` as rate limited and return the wait."""
+        if self.rate_limiter is None:
+            return 0.0
+        wait = self.rate_limiter.try_acquire(domain)
+        if wait:
+            now = time.time()
+            for item in waiting:
+                if item.rate_limited_at is None:
+                    item.rate_limited_at = now
+        return wait
+
+    def _start(self, item: DispatchItem):
+        """Mark a dequeued item (plus its same-URL riders) running. Caller holds the lock."""
+        if self.coalesce and item.url_key:
+            lanes = [self._priority]
+            if item.domain in self._queues:
+                lanes.append(self._queues[item.domain])
+            for lane in lanes:
+                riders = [other for other in lane if other.url_key == item.url_key]
+                for rider in riders:
+                    lane.remove(rider)
+                item.riders.extend(riders)
+            self._coalesced += len(item.riders)
+            if item.domain in self._queues and not self._queues[item.domain]:
+                del self._queues[item.domain]
+        item.started_at = time.time()
+        for member in item.batch():
+            member.started_at = item.started_at
+            del self._queued[member.watcher_id]
+            self._running[member.watcher_id] = item
+        self._active += 1
+        self._running_by_domain[item.domain] = self._running_by_domain.get(item.domain, 0) + 1
+        self._dispatched += 1
+        self.load.record_start(item.started_at, self._active)
+
+    def _take_ready(self) -> List[DispatchItem]:
+        """Pop every item that may start now: the priority lane first, then domains round-robin."""
+        ready = []
+        next_due = None
+        with self._lock:
+            for item in list(self._priority):
+                if self._active >= self.max_concurrent + self.priority_slots:
+                    break
+                if item not in self._priority:
+                    continue  # already started as a rider
+                if self._running_by_domain.get(item.domain, 0) >= self.domain_cap(item.domain):
+                    continue
+                wait = self._rate_wait(item.domain, [item])
+                if wait:
+                    next_due = wait if next_due is None else min(next_due, wait)
+                    continue
+                self._priority.remove(item)
+                self._start(item)
+                ready.append(item)
+
+            progress = True
+            while progress and self._active < self.max_concurrent:
+                progress = False
+                for domain in list(self._queues):
+                    if self._active >= self.max_concurrent:
+                        break
+                    queue = self._queues.get(domain)
+                    if not queue or self._running_by_domain.get(domain, 0) >= self.domain_cap(domain):
+                        continue
+                    wait = self._rate_wait(domain, queue)
+                    if wait:
+                        next_due = wait if next_due is None else min(next_due, wait)
+                        continue
+                    item = queue.popleft()
+                    if not queue:
+                        del self._queues[domain]
+                    else:
+                        self._queues.move_to_end(domain)  # next turn goes to another domain
+                    self._start(item)
+                    ready.append(item)
+                    progress = True
+            if next_due is not None:
+                self._arm_timer(next_due)
+        return ready
+
+    def position(self, watcher_id: int) -> Optional[Dict[str, object]]:
+        """
+        Where a watcher's check stands: running, or queued with its place in line
+        and an estimated start, assuming checks take the recent average duration.
+        None if the watcher is neither queued nor running.
+        """
+        with self._lock:
+            running = self._running.get(watcher_id)
+            if running is not None:
+                return {
+                    'state': 'running',
+                    'position': 0,
+                    'estimated_wait_seconds': 0,
+                    'estimated_start': _iso(running.started_at or time.time()),
+                }
+            item = self._queued.get(watcher_id)
+            if item is None:
+                return None
+            if item.priority:
+                ahead = list(self._priority).index(item)
+                same_domain = sum(1 for other in list(self._priority)[:ahead] if other.domain == item.domain)
+                capacity = self.max_concurrent + self.priority_slots
+            else:
+                queue = self._queues[item.domain]
+                index = queue.index(item)
+                # Round-robin: domains before ours in the rotation get index + 1 turns first, the rest index
+                domains = list(self._queues)
+                turn = domains.index(item.domain)
+                ahead = len(self._priority) + index + sum(
+                    min(len(self._queues[domain]), index + (1 if order < turn else 0))
+                    for order, domain in enumerate(domains)
+                    if domain != item.domain
+                )
+                same_domain = index + sum(1 for other in self._priority if other.domain == item.domain)
+                capacity = self.max_concurrent
+            duration = self.load.average_duration()
+            # Renders that must finish before a slot frees for this item, overall and on its domain
+            cap = self.domain_cap(item.domain)
+            global_backlog = max(0, self._active + ahead + 1 - capacity)
+            domain_backlog = max(0, self._running_by_domain.get(item.domain, 0) + same_domain + 1 - cap)
+            wait = max(global_backlog * duration / capacity, domain_backlog * duration / cap)
+            if self.rate_limiter is not None:
+                _, rate_per_minute, _ = self.rate_limiter.limits(item.domain)
+                if rate_per_minute > 0:
+                    wait = max(wait, same_domain * 60 / rate_per_minute)
+            return {
+                'state': 'queued',
+                'position': ahead + 1,
+                'estimated_wait_seconds': round(wait),
+                'estimated_start': _iso(time.time() + wait),
+            }
+
+    def _arm_timer(self, delay: float):
+        """Pump again once the earliest rate-limited domain has a token."""
+        due = time.monotonic() + delay
+        if self._timer is not None and self._timer.is_alive() and self._timer_due <= due:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_due = due
+        self._timer = threading.Timer(delay, self._pump)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _pump(self):
+        for item in self._take_ready():
+            if item.rate_wait and self.rate_limiter is not None:
+                self.rate_limiter.record_wait(item.rate_wait)
+            if item.queue_wait >= 1:
+                logger.info(
+                    f"[Watcher #{item.watcher_id}] Dispatched after {item.queue_wait:.1f}s in queue "
+                    f"({item.rate_wait:.1f}s rate limited)"
+                )
+            if item.riders:
+                logger.info(
+                    f"[Watcher #{item.watcher_id}] Sharing render with watchers "
+                    f"{', '.join(f'#{rider.watcher_id}' for rider in item.riders)}"
+                )
+            try:
+                self.launch(item, lambda item=item: self._finished(item))
+            except Exception as e:
+                logger.error(f"[Watcher #{item.watcher_id}] Failed to launch check: {e}")
+                self._finished(item)
+
+    def _finished(self, item: DispatchItem):
+        self.load.record_finish(item.started_at or time.time(), time.time())
+        with self._lock:
+            for member in item.batch():
+                self._running.pop(member.watcher_id, None)
+                held = self._held.pop(member.watcher_id, None)
+                if held is not None:
+                    held.enqueued_at = time.time()
+                    self._enqueue(held)
+            self._active -= 1
+            remaining = self._running_by_domain.get(item.domain, 1) - 1
+            if remaining > 0:
+                self._running_by_domain[item.domain] = remaining
+            else:
+                self._running_by_domain.pop(item.domain, None)
+        if self.on_finished is not None:
+            try:
+                self.on_finished(item)
+            except Exception as e:
+                logger.error(f"[Watcher #{item.watcher_id}] Finish hook failed: {e}")
+        self._pump()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            rate = self.rate_limiter.stats() if self.rate_limiter is not None else {}
+            return {
+                **rate,
+                'max_concurrent': self.max_concurrent,
+                'running': self._active,
+                'running_watchers': len(self._running),
+                'queued': len(self._queued),
+                'queued_priority': len(self._priority),
+                'held_retries': len(self._held),
+                'priority_slots': self.priority_slots,
+                'running_by_domain': dict(self._running_by_domain),
+                'queued_by_domain': {d: len(q) for d, q in self._queues.items()},
+                'dispatched': self._dispatched,
+                'deduplicated': self._deduplicated,
+                'coalesced': self._coalesced,
+                'prioritized': self._prioritized,
+            }
+
+    def shutdown(self):
+        """Stop accepting work and drop everything still queued."""
+        with self._lock:
+            self._accepting = False
+            if self._timer is not None:
+                self._timer.cancel()
+            self._queues.clear()
+            self._priority.clear()
+            self._queued.clear()
+            self._held.clear()
@@ -2,24 +2,88 @@ import logging
 import time
 import random
 import json
+import hashlib
 import os
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Callable, Optional, Tuple, List, Dict, Any
 from datetime import datetime, timedelta
-import hashlib
-import sqlite3
 from urllib.parse import urlparse
 import requests
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 from app.core.stealth_config import (
     MonitoringConfig, load_config_from_file, parse_cli_args,
     create_default_config_file, UserAgentConfig, HeaderConfig
 )
+from app.services.browser_pool import BrowserPool
+from app.services.cookie_store import CookieStore
+from app.services import json_condition
+from app.services.interaction_planner import InteractionPlanner
+from app.services.phrase_matcher import PhraseMatcher, PhraseMatcherCache
+from app.services.page_classifier import PageVerdict, PAGE_SNAPSHOT_JS, classify_page
+from app.services.phrase_watch import PhraseWatch, PHRASE_MATCH_JS
+from app.services.render_budget import RenderTooHeavyError
+from app.services.render_profile import RenderProfile, profile_from_metrics, detect_drift, last_step
+from app.services.resource_blocker import ResourceBlocker, resolve_blocking_policy
+from app.services.response_watch import ResponseWatch, phrase_hit, resolve_response_rules
+from app.services.scroll_engine import ScrollEngine, SCROLL_HEIGHT_JS
+from app.services.session_contexts import SessionContexts, WarmContext
+from app.services.static_fetch import StaticFetcher
 
 
 logger = logging.getLogger(__name__)
 
+# JavaScript to iterate rooms and check status directly in the browser
+# This avoids expensive multiple locator calls and parsing issues
+AGODA_AVAILABILITY_JS = """
+    (target_phrase) => {
+        const getRooms = () => {
+             const all = [];
+             // Selector A: Standard Grid
+             document.querySelectorAll('div[data-testid="room-item"]').forEach(el => all.push(el));
+             // Selector B: Master List
+             document.querySelectorAll('.MasterRoom').forEach(el => all.push(el));
+             // Selector C: Child Rooms
+             document.querySelectorAll('.ChildRoomsList-room').forEach(el => all.push(el));
+             return all;
+        };
+
+        const rooms = getRooms();
+        const lowerTarget = target_phrase.toLowerCase();
+        const keywords = lowerTarget.split(" ").filter(k => k.length > 0);
+        let debugMsg = `Found ${rooms.length} rooms. Keywords: ${keywords.join(",")}. `;
+
+        // If no rooms found, we might want to fail safe, or return false
+        if (rooms.length === 0) return { success: false, reason: debugMsg + "No room cards found." };
+
+        for (const room of rooms) {
+            const text = room.innerText || "";
+            const lowerText = text.toLowerCase();
+
+            // Check if room matches ALL keywords (token-based match)
+            const isMatch = keywords.every(k => lowerText.includes(k));
+
+            if (isMatch) {
+                 // Check if sold out
+                 const soldOutText = lowerText.includes("sold out");
+                 const soldOutBadge = room.querySelector('[data-testid="soldout-room-offer"]') || room.querySelector('.SoldOutMessage');
+
+                 if (!soldOutText && !soldOutBadge) {
+                     return { success: true, reason: debugMsg + "Match found and available." };
+                 } else {
+                     debugMsg += `match found but sold out (start text: ${lowerText.substring(0, 30)}...). `;
+                 }
+            }
+        }
+        return { success: false, reason: debugMsg + "No available room matched criteria." };
+    }
+"""
+
+EXCLUDED_TEXT_JS = "els => els.map(el => el.innerText.trim()).join(' ')"
+REMOVE_ELEMENTS_JS = "els => els.forEach(el => el.remove())"
+# A solved challenge replaces the document, which shows as a new title
+TITLE_CHANGED_JS = "title => document.title !== title"
+
 class EnhancedMonitor:
     """
     Enhanced Playwright-based monitoring system with stealth, smart rendering,
@@ -33,6 +97,10 @@ class EnhancedMonitor:
         self.ensure_cookie_storage()
         self.current_session_id = None
         self.session_start_time = None
+        self.browser_pool = BrowserPool(self.config.browser_pool)
+        self.session_contexts = SessionContexts(self.config.session)
+        self.phrase_matchers = PhraseMatcherCache()
+        self.static_fetcher = StaticFetcher()
 
     def setup_logging(self):
         """Configure logging based on settings."""
@@ -42,112 +110,141 @@ class EnhancedMonitor:
         )
 
     def ensure_cookie_storage(self):
-        """Ensure cookie storage database exists."""
-        self.cookie_db_path.parent.mkdir(parents=True, exist_ok=True)
-
-        conn = sqlite3.connect(self.cookie_db_path)
-        try:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS cookies (
-                    domain TEXT PRIMARY KEY,
-                    cookies TEXT,
-                    last_updated TIMESTAMP,
-                    expires TIMESTAMP
-                )
-            ''')
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS sessions (
-                    session_id TEXT PRIMARY KEY,
-                    domain TEXT,
-                    created_at TIMESTAMP,
-                    expires_at TIMESTAMP,
-                    context_data TEXT
-                )
-            ''')
-            conn.commit()
-        finally:
-            conn.close()
+        """Open the shared cookie/session store (creates the database if needed)."""
+        self.cookie_store = CookieStore(self.cookie_db_path, self.config.session)
 
     def get_cookies_for_domain(self, domain: str) -> Optional[List[Dict]]:
         """Retrieve stored cookies for a domain."""
-        conn = sqlite3.connect(self.cookie_db_path)
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT cookies, expires FROM cookies
-                WHERE domain = ? AND (expires IS NULL OR expires > CURRENT_TIMESTAMP)
-            ''', (domain,))
-
-            result = cursor.fetchone()
-            if result:
-                cookies_data, expires = result
-                return json.loads(cookies_data)
-            return None
-        finally:
-            conn.close()
+        return self.cookie_store.get_cookies(domain)
 
     def save_cookies_for_domain(self, domain: str, cookies: List[Dict]):
-        """Store cookies for a domain."""
-        expires = (datetime.now() + timedelta(
-            days=self.config.session.cookie_expiration_days
-        )).isoformat()
-
-        conn = sqlite3.connect(self.cookie_db_path)
-        try:
-            conn.execute('''
-                INSERT OR REPLACE INTO cookies (domain, cookies, last_updated, expires)
-                VALUES (?, ?, CURRENT_TIMESTAMP, ?)
-            ''', (domain, json.dumps(cookies), expires))
-            conn.commit()
-        finally:
-            conn.close()
+        """Store cookies for a domain (written behind; identical jars are not rewritten)."""
+        self.cookie_store.save_cookies(domain, cookies)
 
     def start_new_session(self, domain: str) -> str:
-        """Start a new monitoring session."""
-        session_id = hashlib.md5(f"{domain}_{datetime.now().isoformat()}".encode()).hexdigest()
-        expires_at = (datetime.now() + timedelta(
-            seconds=self.config.session.session_ttl_seconds
-        )).isoformat()
-
-        conn = sqlite3.connect(self.cookie_db_path)
-        try:
-            conn.execute('''
-                INSERT INTO sessions (session_id, domain, created_at, expires_at)
-                VALUES (?, ?, CURRENT_TIMESTAMP, ?)
-            ''', (session_id, domain, expires_at))
-            conn.commit()
-        finally:
-            conn.close()
-
+        """Start a new monitoring session, keeping at most ``max_sessions_per_domain`` rows."""
+        session_id = self.cookie_store.start_session(domain)
         self.current_session_id = session_id
         self.session_start_time = datetime.now()
         return session_id
 
     def get_active_session(self, domain: str) -> Optional[str]:
         """Get active session for domain if it exists and is valid."""
-        conn = sqlite3.connect(self.cookie_db_path)
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT session_id FROM sessions
-                WHERE domain = ? AND expires_at > CURRENT_TIMESTAMP
-                ORDER BY created_at DESC LIMIT 1
-            ''', (domain,))
-
-            result = cursor.fetchone()
-            return result[0] if result else None
-        finally:
-            conn.close()
+        active = self.get_session_state(domain)
+        return active[0] if active else None
+
+    def get_session_state(self, domain: str) -> Optional[Tuple[str, Optional[Dict]]]:
+        """Latest unexpired session for a domain as (session_id, Playwright storage state)."""
+        return self.cookie_store.get_session_state(domain)
+
+    def save_session_state(self, session_id: str, state: Dict):
+        """Persist a context's storage state (cookies + localStorage) for its session."""
+        self.cookie_store.save_session_state(session_id, state)
+
+    def resolve_session(self, domain: str) -> Tuple[str, Optional[Dict]]:
+        """Reuse the domain's active session (and its stored state) or start a new one."""
+        active = self.get_session_state(domain)
+        if active:
+            logger.info(f"Reusing existing session: {active[0]}")
+            self.current_session_id = active[0]
+            return active
+        logger.info("Starting new monitoring session")
+        return self.start_new_session(domain), None
 
     def cleanup_expired_sessions(self):
         """Clean up expired sessions."""
-        conn = sqlite3.connect(self.cookie_db_path)
+        self.cookie_store.cleanup()
+
+    def prepare_session(self, domain: str) -> Optional[List[Dict]]:
+        """Return the stored cookies for a domain; expiry cleanup runs periodically."""
+        self.cookie_store.maybe_cleanup()
+        return self.get_cookies_for_domain(domain)
+
+    def open_session_context(
+        self, pooled, domain: str, stored_cookies: Optional[List[Dict]]
+    ) -> Tuple[Any, Optional[WarmContext], Dict[str, Any]]:
+        """
+        Get the BrowserContext for one check: the domain's warm context in this
+        browser if there is one, otherwise a new context seeded from the session's
+        stored state and kept warm when the browser has room for it.
+
+        Returns:
+            Tuple of (context, warm context lease or None, session info for metrics)
+        """
+        warm, reason, stale = self.session_contexts.checkout(pooled, domain)
+        for old in stale:
+            try:
+                old.context.close()
+            except Exception as e:
+                logger.debug(f"Error closing expired context: {e}")
+        if warm is not None:
+            return warm.context, warm, self.warm_session_info(warm, domain)
+
+        session_id, state = self.resolve_session(domain)
+        context = pooled.browser.new_context(**self.session_context_options(state))
+        self.apply_stealth_overrides(context)
+        if stored_cookies:
+            context.add_cookies(stored_cookies)
+            logger.info(f"Added {len(stored_cookies)} stored cookies")
+        warm, info = self.register_session_context(pooled, domain, reason, session_id, state, context)
+        return context, warm, info
+
+    # Bookkeeping shared by ``open_session_context`` / ``close_session_context`` here
+    # and in ``AsyncEnhancedMonitor``
+
+    def warm_session_info(self, warm: WarmContext, domain: str) -> Dict[str, Any]:
+        self.current_session_id = warm.session_id
+        logger.info(f"Reusing warm context for {domain} (session {warm.session_id}, {warm.uses} checks)")
+        return {'session': 'warm', 'session_id': warm.session_id, 'session_uses': warm.uses}
+
+    def session_context_options(self, state: Optional[Dict]) -> Dict[str, Any]:
+        options = self.get_context_options()
+        if state:
+            options['storage_state'] = state
+        return options
+
+    def register_session_context(
+        self, pooled, domain: str, reason: str, session_id: str, state: Optional[Dict], context
+    ) -> Tuple[Optional[WarmContext], Dict[str, Any]]:
+        """Keep a new context warm when the browser has room for it; returns (lease or None, session info)."""
+        warm = None
+        if reason in ("cold", "expired"):
+            warm = self.session_contexts.register(pooled, domain, session_id, context)
+        return warm, {
+            'session': 'new', 'reason': reason, 'session_id': session_id,
+            'session_uses': 0, 'restored_state': bool(state)
+        }
+
+    def keep_context_warm(self, pooled, warm: Optional[WarmContext], failed: bool) -> bool:
+        """Whether a finished check's context goes back to the warm pool; a lost lease is discarded."""
+        if warm is not None and not failed and not pooled.closed:
+            return True
+        if warm is not None:
+            self.session_contexts.discard(pooled, warm)
+        return False
+
+    def close_session_context(
+        self, pooled, context, warm: Optional[WarmContext], session_id: Optional[str], failed: bool = False
+    ):
+        """Persist the context's storage state, then keep it warm or close it."""
+        try:
+            if session_id and not failed:
+                self.save_session_state(session_id, context.storage_state())
+        except Exception as e:
+            logger.debug(f"Could not save session state: {e}")
+
+        if self.keep_context_warm(pooled, warm, failed):
+            for page in list(context.pages):
+                try:
+                    page.close()
+                except Exception as e:
+                    logger.debug(f"Error closing page: {e}")
+            self.session_contexts.checkin(warm)
+            return
         try:
-            conn.execute('DELETE FROM sessions WHERE expires_at <= CURRENT_TIMESTAMP')
-            conn.execute('DELETE FROM cookies WHERE expires <= CURRENT_TIMESTAMP')
-            conn.commit()
-        finally:
-            conn.close()
+            context.close()
+        except Exception as e:
+            logger.debug(f"Error closing context: {e}")
 
     def get_stealth_headers(self, url: str) -> Dict[str, str]:
         """Generate stealth headers for the request."""
@@ -180,8 +277,8 @@ class EnhancedMonitor:
             return width, height
         return 1920, 1080
 
-    def apply_stealth_overrides(self, context):
-        """Apply stealth overrides to the browser context."""
+    def build_stealth_script(self) -> str:
+        """Build the init script that masks automation fingerprints."""
         stealth_script = []
 
         if self.config.stealth.enable_webdriver_masking:
@@ -221,93 +318,121 @@ class EnhancedMonitor:
             "Object.defineProperty(screen, 'height', {get: () => 1080});"
         ])
 
+        return "\n".join(stealth_script)
+
+    def apply_stealth_overrides(self, context):
+        """Apply stealth overrides to the browser context."""
+        stealth_script = self.build_stealth_script()
         if stealth_script:
-            context.add_init_script("\n".join(stealth_script))
-
-    def apply_request_throttling(self):
-        """Apply request throttling if configured."""
-        if self.config.stealth.request_throttling > 0:
-            time.sleep(self.config.stealth.request_throttling)
-
-    def perform_smart_interactions(self, page, url: str):
-        """Perform smart interactions to trigger dynamic content loading."""
-        logger.info(f"Performing smart interactions for {url}")
-
-        # Robust key-based scrolling to trigger lazy loading
-        # This uses the proven logic from the verification phase
-        last_height = page.evaluate("document.body.scrollHeight")
-        logger.info(f"Smart Interactions: initial height {last_height}, starting keyboard scroll...")
-        
-        max_scrolls = 30
-        consecutive_stable_checks = 0
-        required_stable_checks = 3 
-        
-        for i in range(max_scrolls):
-            # Press End to go to bottom
-            page.keyboard.press("End")
-            
-            # Wait for load - generous wait
-            page.wait_for_timeout(3000)
-            
-            new_height = page.evaluate("document.body.scrollHeight")
-            
-            if new_height == last_height:
-                consecutive_stable_checks += 1
-                logger.debug(f"Smart Interactions: height stable ({new_height}) for {consecutive_stable_checks}/{required_stable_checks}")
-                
-                if consecutive_stable_checks >= required_stable_checks:
-                    logger.info("Smart Interactions: page fully loaded (stable height). Stopping scroll.")
-                    break
-                    
-                # Aggressive Shake: Back up a bit to re-trigger intersection
-                logger.debug("Smart Interactions: keyboard shake (PageUp x 3) to unstick...")
-                for _ in range(3):
-                    page.keyboard.press("PageUp")
-                    page.wait_for_timeout(500)
-                
-                # Press End again to re-approach
-                page.keyboard.press("End")
-            else:
-                consecutive_stable_checks = 0 
-                logger.info(f"Smart Interactions: scroll {i+1}/{max_scrolls}, height increased {last_height}->{new_height}")
-                last_height = new_height
+            context.add_init_script(stealth_script)
+
+    def get_context_options(self) -> Dict[str, Any]:
+        """Keyword arguments for ``browser.new_context`` with stealth settings."""
+        width, height = self.get_viewport_size()
+        return {
+            "viewport": {"width": width, "height": height},
+            "user_agent": self.config.stealth.user_agents.get_random_agent(),
+            "locale": "en-US",
+            "timezone_id": "America/New_York",
+            "ignore_https_errors": True,
+            "bypass_csp": True
+        }
+
+    def perform_smart_interactions(
+        self,
+        page,
+        url: str,
+        watch: Optional[PhraseWatch] = None,
+        profile: Optional[RenderProfile] = None,
+        responses: Optional[ResponseWatch] = None,
+        metrics: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Perform smart interactions to trigger dynamic content loading.
+
+        With a learned ``profile`` only its selectors are tried and the scroll loop is
+        capped at its budget; without one the full configured routine runs. Either
+        watcher reaching a verdict ends the routine. With ``metrics`` every wait is
+        clipped to the render budget and an exhausted budget aborts the routine.
+        """
+        engine = self.interaction_engine(url, profile, metrics)
+        should_stop = self.stop_condition(watch, responses)
+        interaction_stats = self.interaction_stats(engine.scroll(page, should_stop=should_stop), profile)
+        if should_stop and should_stop():
+            return {**interaction_stats, 'early_exit': True}
+
+        planner = self.interaction_planner(profile)
+        if not planner.selectors():
+            return interaction_stats
+        try:
+            plan = planner.plan(page)
+        except Exception as e:
+            logger.debug(f"Error planning interactions: {e}")
+            return interaction_stats
+        interaction_stats.update(plan.as_metrics())
 
         # Hover over potential trigger elements
-        for selector in self.config.rendering.hover_selectors:
+        for selector, index in plan.hovers:
+            self.check_render_budget(metrics or {})
             try:
-                elements = page.locator(selector)
-                count = elements.count()
-                if count > 0:
-                    logger.debug(f"Found {count} elements matching hover selector: {selector}")
-                    for i in range(min(count, 3)):  # Hover over first 3 elements
-                        elements.nth(i).hover()
-                        time.sleep(0.5)
+                page.locator(selector).nth(index).hover()
+                if selector not in interaction_stats['hover_hits']:
+                    interaction_stats['hover_hits'].append(selector)
             except Exception as e:
                 logger.debug(f"Error hovering over {selector}: {e}")
+        if interaction_stats['hover_hits']:
+            engine.wait_for_growth(page, page.evaluate(SCROLL_HEIGHT_JS), timeout_ms=engine.quiet_ms)
 
-        # Click load more buttons if visible
-        for selector in self.config.rendering.click_selectors:
+        # Click the first visible load-more button of each selector group
+        for selector, index in plan.clicks:
+            self.check_render_budget(metrics or {})
             try:
-                button = page.locator(selector)
-                if button.count() > 0 and button.first.is_visible():
-                    logger.info(f"Clicking load more button: {selector}")
-                    button.first.click()
-                    time.sleep(2)  # Wait for content to load
-                    break  # Only click the first matching button
+                logger.info(f"Clicking load more button: {selector}")
+                height = page.evaluate(SCROLL_HEIGHT_JS)
+                page.locator(selector).nth(index).click()
+                interaction_stats['click_hits'].append(selector)
+                engine.wait_for_growth(page, height)  # Wait for content to load
             except Exception as e:
                 logger.debug(f"Error clicking {selector}: {e}")
 
-        # Try text-based selectors for load more buttons
-        for selector in self.config.rendering.load_more_button_selectors:
-            try:
-                button = page.locator(selector)
-                if button.count() > 0 and button.first.is_visible():
-                    logger.info(f"Clicking text-based load more button: {selector}")
-                    button.first.click()
-                    time.sleep(2)  # Wait for content to load
-                    break  # Only click the first matching button
-            except Exception as e:
-                logger.debug(f"Error clicking text-based button {selector}: {e}")
+        return interaction_stats
+
+    def interaction_engine(
+        self, url: str, profile: Optional[RenderProfile], metrics: Optional[Dict[str, Any]]
+    ) -> ScrollEngine:
+        """
+        Robust key-based scrolling to trigger lazy loading, waiting on page
+        growth/mutation signals instead of fixed sleeps.
+        """
+        logger.info(f"Performing smart interactions for {url}" + (" (replaying profile)" if profile else ""))
+        rendering = self.config.rendering
+        return ScrollEngine(
+            rendering,
+            max_scrolls=profile.scroll_budget(rendering.render_profile_scroll_margin) if profile else None,
+            **self.scroll_budget_hooks(metrics)
+        )
+
+    @staticmethod
+    def interaction_stats(stats, profile: Optional[RenderProfile]) -> Dict[str, Any]:
+        return {
+            **stats.as_metrics(),
+            'profile': 'replay' if profile else 'learn',
+            'hover_hits': [],
+            'click_hits': [],
+        }
+
+    def interaction_planner(self, profile: Optional[RenderProfile]) -> InteractionPlanner:
+        """
+        Resolves every hover/click selector in one in-page pass so only the visible
+        candidates are acted on: the profile's selectors, else the configured ones.
+        """
+        if profile:
+            return InteractionPlanner(profile.hover_selectors, [[s] for s in profile.click_selectors])
+        rendering = self.config.rendering
+        return InteractionPlanner(
+            rendering.hover_selectors,
+            [rendering.click_selectors, rendering.load_more_button_selectors]
+        )
 
     def validate_content_visibility(self, page, selector: str) -> bool:
         """Validate that content is actually visible and not hidden."""
@@ -335,27 +460,16 @@ class EnhancedMonitor:
             logger.debug(f"Error validating visibility for {selector}: {e}")
             return False
 
-    def calculate_exponential_backoff(self, attempt: int) -> float:
-        """Calculate exponential backoff delay."""
-        if self.config.resilience.retry_strategy != "exponential_backoff":
-            return 0.0
-
-        base = self.config.resilience.backoff_base
-        max_delay = self.config.resilience.backoff_max
-
-        # Calculate delay: base * 2^(attempt-1), but don't exceed max
-        delay = min(base * (2 ** (attempt - 1)), max_delay)
-        return delay
-
-
-
     def should_retry_based_on_size(self, current_content: str, previous_content: Optional[str] = None) -> bool:
         """Determine if retry is needed based on content size thresholds."""
         if not previous_content:
             return False
+        return self.should_retry_based_on_length(len(current_content), len(previous_content))
 
-        current_size = len(current_content)
-        previous_size = len(previous_content)
+    def should_retry_based_on_length(self, current_size: int, previous_size: Optional[int] = None) -> bool:
+        """Size-threshold check on text lengths, so the text itself need not be kept."""
+        if not previous_size:
+            return False
 
         # If current content is significantly smaller than previous, consider retry
         size_ratio = current_size / previous_size if previous_size > 0 else 1.0
@@ -366,6 +480,286 @@ class EnhancedMonitor:
 
         return False
 
+    def create_phrase_watch(
+        self,
+        url: str,
+        target_phrase: str,
+        exclude_selector: Optional[str],
+        screenshot_path: Optional[str],
+        html_dump_path: Optional[str],
+        extra_phrases: Optional[List[str]] = None
+    ) -> Optional[PhraseWatch]:
+        """
+        Early-exit watcher for this render, or None when the full routine must run:
+        Agoda has its own availability logic, debug dumps want the finished page, and
+        a shared render has to evaluate every watcher's phrase on the finished page.
+        """
+        if not self.config.rendering.early_exit or "agoda.com" in url:
+            return None
+        if screenshot_path or html_dump_path or extra_phrases:
+            return None
+        return PhraseWatch(target_phrase, exclude_selector)
+
+    def create_response_watch(
+        self, url: str, target_phrase: str, watcher_id: Optional[int], extra_phrases: Optional[List[str]]
+    ) -> Optional[ResponseWatch]:
+        """
+        Network-tier watcher for this render, or None when no ``response_rules``
+        cover the page (or it is a shared render, which needs every phrase's verdict).
+        """
+        if extra_phrases:
+            return None
+        rules = resolve_response_rules(self.config.rendering, url, watcher_id)
+        return ResponseWatch(target_phrase, rules) if rules else None
+
+    @staticmethod
+    def stop_condition(*watchers) -> Optional[Callable[[], bool]]:
+        """True once any of the render's watchers reached a verdict (None without watchers)."""
+        active = [watcher for watcher in watchers if watcher is not None]
+        if not active:
+            return None
+        return lambda: any(watcher.decided for watcher in active)
+
+    @staticmethod
+    def response_result(
+        responses: ResponseWatch, url: str, target_phrase: str, metrics: Dict[str, Any]
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        metrics['steps'].append(responses.metrics_step())
+        metrics['final_status'] = 'success' if responses.found else 'not_found'
+        message = (
+            f"Target phrase '{target_phrase}' {'found' if responses.found else 'not found'} on {url} "
+            f"(network response)"
+        )
+        logger.info(message)
+        return responses.found, message, metrics
+
+    def early_exit_result(
+        self, watch: PhraseWatch, url: str, target_phrase: str, metrics: Dict[str, Any]
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        metrics['steps'].append(watch.metrics_step())
+        metrics['final_status'] = 'success'
+        message = f"Target phrase '{target_phrase}' found on {url} (early exit)"
+        logger.info(message)
+        return True, message, metrics
+
+    @staticmethod
+    def start_render_budget(metrics: Dict[str, Any], budget: Optional[float]):
+        """Start the browser-tier clock; a ``budget`` (seconds) becomes the render's deadline."""
+        metrics['render_started'] = time.time()
+        metrics['render_budget'] = budget
+
+    @staticmethod
+    def finish_render_budget(metrics: Dict[str, Any]):
+        metrics['render_seconds'] = time.time() - metrics['render_started']
+
+    @staticmethod
+    def render_time_left(metrics: Dict[str, Any]) -> Optional[float]:
+        if not metrics.get('render_budget'):
+            return None
+        return metrics['render_budget'] - (time.time() - metrics['render_started'])
+
+    def check_render_budget(self, metrics: Dict[str, Any]):
+        """Abort the render with ``RenderTooHeavyError`` once it is past its budget."""
+        left = self.render_time_left(metrics)
+        if left is not None and left <= 0:
+            raise RenderTooHeavyError(time.time() - metrics['render_started'])
+
+    def scroll_budget_hooks(self, metrics: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """``ScrollEngine`` hooks that keep scroll waits inside the render budget."""
+        if not metrics or not metrics.get('render_budget'):
+            return {}
+        return {
+            'clip_ms': lambda ms: self.page_timeout_ms(metrics, ms / 1000),
+            'checkpoint': lambda: self.check_render_budget(metrics),
+        }
+
+    def page_timeout_ms(self, metrics: Dict[str, Any], timeout: float) -> int:
+        """``timeout`` (seconds) clipped to what is left of the render budget."""
+        left = self.render_time_left(metrics)
+        if left is not None:
+            timeout = min(timeout, max(left, 1.0))
+        return int(timeout * 1000)
+
+    @staticmethod
+    def heavy_result(url: str, metrics: Dict[str, Any], error: RenderTooHeavyError) -> Tuple[bool, str, Dict[str, Any]]:
+        metrics['final_status'] = 'heavy'
+        metrics['steps'].append({
+            'step': 'render_budget',
+            'timestamp': time.time(),
+            'duration': error.duration,
+            'budget': metrics.get('render_budget'),
+        })
+        message = f"Render of {url} exceeded its {metrics['render_budget']:.0f}s budget, aborted after {error.duration:.0f}s"
+        logger.warning(message)
+        return False, message, metrics
+
+    def page_snapshot(self, page) -> Optional[Dict[str, Any]]:
+        try:
+            return page.evaluate(PAGE_SNAPSHOT_JS)
+        except Exception as e:
+            logger.debug(f"Could not snapshot page for classification: {e}")
+            return None
+
+    def classify_loaded_page(self, page, response, metrics: Dict[str, Any]) -> Optional[PageVerdict]:
+        """
+        Judge the page right after navigation (see ``page_classifier``), before any
+        scrolling or selector waits. A challenge interstitial first gets
+        ``challenge_grace_seconds`` to solve itself and replace the document.
+        """
+        if not self.config.rendering.classify_pages:
+            return None
+        step_start = time.time()
+        http_status = response.status if response is not None else None
+        snapshot = self.page_snapshot(page)
+        verdict = classify_page(http_status, snapshot)
+        grace_ms = self.challenge_grace_ms(verdict, metrics)
+        if grace_ms is not None:
+            try:
+                page.wait_for_function(TITLE_CHANGED_JS, arg=snapshot.get('title', ''), timeout=grace_ms)
+                page.wait_for_load_state("domcontentloaded", timeout=grace_ms)
+            except Exception:
+                pass  # still challenged, or navigating away
+            verdict = self.reclassify_after_grace(http_status, snapshot, self.page_snapshot(page))
+        self.record_page_classification(metrics, step_start, http_status, snapshot, verdict)
+        return verdict
+
+    def challenge_grace_ms(self, verdict: Optional[PageVerdict], metrics: Dict[str, Any]) -> Optional[int]:
+        """How long a challenge interstitial may take to solve itself; None when there is nothing to wait for."""
+        grace = self.config.rendering.challenge_grace_seconds
+        if verdict is None or not verdict.challenge or grace <= 0:
+            return None
+        return self.page_timeout_ms(metrics, grace)
+
+    @staticmethod
+    def reclassify_after_grace(
+        http_status: Optional[int], before: Dict[str, Any], after: Optional[Dict[str, Any]]
+    ) -> Optional[PageVerdict]:
+        # A solved challenge replaces the document, so the navigation's status no longer applies
+        replaced = after is None or after.get('title') != before.get('title')
+        return classify_page(None if replaced else http_status, after)
+
+    @staticmethod
+    def record_page_classification(
+        metrics: Dict[str, Any],
+        step_start: float,
+        http_status: Optional[int],
+        snapshot: Optional[Dict[str, Any]],
+        verdict: Optional[PageVerdict],
+    ):
+        metrics['steps'].append({
+            'step': 'page_classification',
+            'timestamp': time.time(),
+            'duration': time.time() - step_start,
+            'status_code': http_status,
+            'text_length': snapshot.get('text_length') if snapshot else None,
+            'verdict': verdict.status if verdict else 'ok',
+            'reason': verdict.reason if verdict else None,
+        })
+
+    @staticmethod
+    def classified_result(url: str, metrics: Dict[str, Any], verdict: PageVerdict) -> Tuple[bool, str, Dict[str, Any]]:
+        metrics['final_status'] = verdict.status
+        metrics['page_verdict'] = verdict.reason
+        kind = "blocked" if verdict.status == 'blocked' else "error page"
+        message = f"Render of {url} ended after navigation: {kind} ({verdict.reason})"
+        logger.warning(message)
+        return False, message, metrics
+
+    def extract_page_text(self, page, exclude_selector: Optional[str], metrics: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Legacy extraction: pull the full page text over CDP after removing excluded
+        elements. Returns (content, excluded_content).
+        """
+        step_start = time.time()
+        full_content = page.content()
+        excluded_content = ""
+        if exclude_selector:
+            try:
+                count = page.locator(exclude_selector).count()
+                logger.info(f"Found {count} elements matching exclude selector")
+                excluded_content = page.locator(exclude_selector).evaluate_all(EXCLUDED_TEXT_JS)
+                logger.info(f"Captured excluded content using evaluate_all")
+            except Exception as e:
+                logger.warning(f"Failed to capture excluded content: {e}")
+        self.add_step(
+            metrics, 'content_capture', step_start,
+            full_content_length=len(full_content), excluded_content_length=len(excluded_content)
+        )
+
+        # Remove excluded elements if provided
+        if exclude_selector:
+            step_start = time.time()
+            try:
+                logger.info(f"Removing elements matching: {exclude_selector}")
+                removed_count = page.locator(exclude_selector).count()
+                page.locator(exclude_selector).evaluate_all(REMOVE_ELEMENTS_JS)
+                self.excluded_removed(metrics, step_start, exclude_selector, removed_count)
+            except Exception as e:
+                self.exclusion_failed(metrics, step_start, e)
+
+        # Get cleaned page content
+        step_start = time.time()
+        content = page.locator('body').inner_text()
+        self.add_step(metrics, 'content_extraction', step_start, content_length=len(content))
+        return content, excluded_content
+
+    def excluded_removed(self, metrics: Dict[str, Any], step_start: float, selector: str, removed_count: int):
+        logger.info(f"Removed {removed_count} excluded elements")
+        self.add_step(metrics, 'exclude_elements', step_start, selector=selector, removed_count=removed_count)
+
+    def exclusion_failed(self, metrics: Dict[str, Any], step_start: float, error: Exception):
+        logger.warning(f"Failed to remove excluded elements: {error}")
+        self.add_step(metrics, 'exclude_elements_error', step_start, error=str(error))
+
+    def match_phrase_in_page(self, page, target_phrase: str, exclude_selector: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Run the phrase match in the page over visible, non-excluded text nodes,
+        separated at block boundaries as in ``inner_text()``.
+
+        Returns {found, snippet, text_length, excluded_found, fingerprint}, or None when the
+        exclude selector is Playwright-only or the evaluate fails.
+        """
+        try:
+            return page.evaluate(PHRASE_MATCH_JS, {'phrase': target_phrase, 'exclude': exclude_selector})
+        except Exception as e:
+            logger.warning(f"In-page phrase match failed, falling back to text extraction: {e}")
+            return None
+
+    @staticmethod
+    def text_fingerprint(text: str, source: str = "text") -> str:
+        """Short hash of whitespace-normalized text, prefixed with where the text came from."""
+        digest = hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=8).hexdigest()
+        return f"{source}:{digest}"
+
+    @staticmethod
+    def match_phrase_in_text(target_phrase: str, content: str, excluded_content: str) -> Dict[str, Any]:
+        """Python-side equivalent of ``match_phrase_in_page`` for extracted text."""
+        return PhraseMatcher([target_phrase]).match(content, excluded_content)[target_phrase]
+
+    def match_phrases_in_text(
+        self, phrases: List[str], content: str, excluded_content: str, url: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Verdicts for every phrase of a shared render, keyed by phrase, from one pass
+        over the text. The compiled matcher is cached per page until its phrase set changes.
+        """
+        matcher = self.phrase_matchers.get(self.page_key(url) if url else "", phrases)
+        return matcher.match(content, excluded_content)
+
+    @staticmethod
+    def record_shared_matches(metrics: Dict[str, Any], matches: Dict[str, Dict[str, Any]]):
+        """Merge shared-render verdicts into the metrics; a phrase seen in any attempt stays found."""
+        shared = metrics.setdefault('shared_matches', {})
+        for phrase, match in matches.items():
+            previous = shared.get(phrase)
+            if previous is None or (match['found'] and not previous['found']):
+                shared[phrase] = {
+                    'found': match['found'],
+                    'snippet': match.get('snippet'),
+                    'offsets': match.get('offsets', []),
+                    'excluded_found': match.get('excluded_found', False),
+                }
+
     def check_agoda_availability(self, page, target_phrase: str) -> bool:
         """
         Specialized check for Agoda availability using direct DOM traversal.
@@ -373,59 +767,252 @@ class EnhancedMonitor:
         """
         logger.info(f"Running Agoda-specific availability check for phrase: '{target_phrase}'")
         try:
-            # JavaScript to iterate rooms and check status directly in the browser
-            # This avoids expensive multiple locator calls and parsing issues
-            js_script = """
-                (target_phrase) => {
-                    const getRooms = () => {
-                         const all = [];
-                         // Selector A: Standard Grid
-                         document.querySelectorAll('div[data-testid="room-item"]').forEach(el => all.push(el));
-                         // Selector B: Master List
-                         document.querySelectorAll('.MasterRoom').forEach(el => all.push(el));
-                         // Selector C: Child Rooms
-                         document.querySelectorAll('.ChildRoomsList-room').forEach(el => all.push(el));
-                         return all;
-                    };
-                    
-                    const rooms = getRooms();
-                    const lowerTarget = target_phrase.toLowerCase();
-                    const keywords = lowerTarget.split(" ").filter(k => k.length > 0);
-                    let debugMsg = `Found ${rooms.length} rooms. Keywords: ${keywords.join(",")}. `;
-                    
-                    // If no rooms found, we might want to fail safe, or return false
-                    if (rooms.length === 0) return { success: false, reason: debugMsg + "No room cards found." };
-                    
-                    for (const room of rooms) {
-                        const text = room.innerText || "";
-                        const lowerText = text.toLowerCase();
-                        
-                        // Check if room matches ALL keywords (token-based match)
-                        const isMatch = keywords.every(k => lowerText.includes(k));
-                        
-                        if (isMatch) {
-                             // Check if sold out
-                             const soldOutText = lowerText.includes("sold out");
-                             const soldOutBadge = room.querySelector('[data-testid="soldout-room-offer"]') || room.querySelector('.SoldOutMessage');
-                             
-                             if (!soldOutText && !soldOutBadge) {
-                                 return { success: true, reason: debugMsg + "Match found and available." };
-                             } else {
-                                 debugMsg += `match found but sold out (start text: ${lowerText.substring(0, 30)}...). `;
-                             }
-                        }
-                    }
-                    return { success: false, reason: debugMsg + "No available room matched criteria." };
-                }
-            """
-            result = page.evaluate(js_script, target_phrase)
-            logger.info(f"Agoda check result: {result['success']} - Reason: {result['reason']}")
-            return result['success']
-            
+            return self.agoda_available(page.evaluate(AGODA_AVAILABILITY_JS, target_phrase))
         except Exception as e:
             logger.error(f"Error in Agoda availability check: {e}")
             return False
 
+    @staticmethod
+    def agoda_available(result: Dict[str, Any]) -> bool:
+        logger.info(f"Agoda check result: {result['success']} - Reason: {result['reason']}")
+        return result['success']
+
+    def new_metrics(self, url: str, target_phrase: str) -> Dict[str, Any]:
+        return {
+            'start_time': time.time(),
+            'url': url,
+            'target_phrase': target_phrase,
+            'attempts': 0,
+            'final_status': 'pending',
+            'execution_time': 0,
+            'tier': None,
+            'steps': []
+        }
+
+    @staticmethod
+    def page_key(url: str) -> str:
+        """Host + path; tier decisions are learned per watched page, not per query string."""
+        parsed = urlparse(url)
+        return f"{parsed.netloc.lower()}{parsed.path or '/'}"
+
+    def get_render_tier(self, page_key: str) -> Optional[Dict[str, Any]]:
+        """Learned static/browser decision for a page, if it has not expired."""
+        result = self.cookie_store.fetchone('''
+            SELECT needs_js, static_agreements, reason FROM render_tiers
+            WHERE page_key = ? AND updated_at > ?
+        ''', (page_key, (datetime.now() - timedelta(
+            hours=self.config.rendering.static_decision_ttl_hours
+        )).isoformat()))
+        if result:
+            return {'needs_js': bool(result[0]), 'static_agreements': result[1], 'reason': result[2]}
+        return None
+
+    def save_render_tier(self, page_key: str, needs_js: bool, static_agreements: int, reason: Optional[str]):
+        self.cookie_store.execute('''
+            INSERT OR REPLACE INTO render_tiers (page_key, needs_js, static_agreements, reason, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (page_key, int(needs_js), static_agreements, reason, datetime.now().isoformat()))
+
+    @staticmethod
+    def profile_key(url: str, watcher_id: Optional[int] = None) -> str:
+        """Render profiles are learned per watcher, falling back to the domain for ad-hoc checks."""
+        if watcher_id is not None:
+            return f"watcher:{watcher_id}"
+        return urlparse(url).netloc.lower()
+
+    def get_render_profile(self, profile_key: str) -> Optional[RenderProfile]:
+        """Learned interaction profile, if profiles are enabled and it has not expired."""
+        if not self.config.rendering.render_profiles:
+            return None
+        result = self.cookie_store.fetchone('''
+            SELECT profile FROM render_profiles
+            WHERE profile_key = ? AND updated_at > ?
+        ''', (profile_key, (datetime.now() - timedelta(
+            hours=self.config.rendering.render_profile_ttl_hours
+        )).isoformat()))
+        if result:
+            return RenderProfile.from_dict(json.loads(result[0]))
+        return None
+
+    def save_render_profile(self, profile: RenderProfile, refresh: bool = True):
+        """Store a profile; ``refresh=False`` keeps its learned-at time (replay bookkeeping)."""
+        if refresh:
+            self.cookie_store.execute('''
+                INSERT OR REPLACE INTO render_profiles (profile_key, profile, updated_at)
+                VALUES (?, ?, ?)
+            ''', (profile.key, json.dumps(profile.to_dict()), datetime.now().isoformat()))
+        else:
+            self.cookie_store.execute('''
+                UPDATE render_profiles SET profile = ? WHERE profile_key = ?
+            ''', (json.dumps(profile.to_dict()), profile.key))
+
+    def delete_render_profile(self, profile_key: str):
+        self.cookie_store.execute('DELETE FROM render_profiles WHERE profile_key = ?', (profile_key,))
+
+    def render_profile_for(
+        self, url: str, watcher_id: Optional[int], extra_phrases: Optional[List[str]] = None
+    ) -> Optional[RenderProfile]:
+        """
+        Learned profile to replay, or None when the full routine must run. A shared
+        render serves phrases the primary watcher's profile knows nothing about (they
+        may need deeper scrolls or other clicks), so it never replays or learns one.
+        """
+        if extra_phrases:
+            return None
+        return self.get_render_profile(self.profile_key(url, watcher_id))
+
+    def learn_render_profile(self, profile_key: str, metrics: Dict[str, Any], found: bool):
+        """
+        Update the render profile after a browser render.
+
+        A full routine (re)learns the profile. A replay that missed a phrase the
+        profile had seen, or whose text shrank past ``size_threshold_percentage``,
+        has drifted: the profile is dropped so the next check runs everything again.
+        """
+        if not self.config.rendering.render_profiles or metrics.get('final_status') == 'failed':
+            return
+        interactions = last_step(metrics, 'smart_interactions')
+        if interactions is None:
+            return
+
+        if interactions.get('profile') == 'replay':
+            profile = self.get_render_profile(profile_key)
+            if profile is None:
+                return
+            drift = detect_drift(profile, metrics, found, self.config.resilience.size_threshold_percentage)
+            if drift:
+                logger.info(f"Render profile {profile_key} drifted ({drift}); re-learning on next check")
+                self.delete_render_profile(profile_key)
+            else:
+                profile.replays += 1
+                self.save_render_profile(profile, refresh=False)
+            return
+
+        profile = profile_from_metrics(profile_key, metrics, found)
+        if profile is not None:
+            logger.info(
+                f"Learned render profile {profile_key}: {profile.productive_scrolls} productive scrolls, "
+                f"{len(profile.hover_selectors)} hover / {len(profile.click_selectors)} click selectors"
+            )
+            self.save_render_profile(profile)
+
+    def is_browser_only(self, url: str, selector: Optional[str], exclude_selector: Optional[str]) -> Optional[str]:
+        """Return why a check must skip the static tier, or None if it may use it."""
+        if not self.config.rendering.static_first:
+            return "static_disabled"
+        if selector or exclude_selector:
+            return "needs_dom"
+        domain = urlparse(url).netloc.lower()
+        for browser_domain in self.config.rendering.browser_only_domains:
+            if domain == browser_domain or domain.endswith("." + browser_domain):
+                return "browser_only_domain"
+        return None
+
+    def try_static_tier(
+        self,
+        url: str,
+        target_phrase: str,
+        selector: Optional[str],
+        exclude_selector: Optional[str],
+        metrics: Dict[str, Any],
+        extra_phrases: Optional[List[str]] = None
+    ) -> Optional[Tuple[bool, str, Dict[str, Any]]]:
+        """
+        Static tier: fetch the page over plain HTTP and match the phrase in its text.
+
+        Returns a final (found, message, metrics) verdict, or None when the check has
+        to escalate to the browser. Static verdicts, hits and misses alike, are only
+        trusted once the browser has agreed with the static tier for this page
+        ``static_confirmations`` times; a phrase that only appears in markup the
+        browser does not show (a hit the render contradicts) sends the page to the
+        browser for good.
+        """
+        skip_reason = self.is_browser_only(url, selector, exclude_selector)
+        page_key = self.page_key(url)
+        learned = None if skip_reason else self.get_render_tier(page_key)
+        if learned and learned['needs_js']:
+            skip_reason = f"learned_js ({learned['reason']})"
+        if skip_reason:
+            metrics['static_decision'] = skip_reason
+            return None
+
+        step_start = time.time()
+        try:
+            result = self.static_fetcher.fetch(
+                url, self.get_stealth_headers(url), self.config.rendering.static_timeout
+            )
+        except Exception as e:
+            logger.info(f"Static fetch failed for {url}, escalating to browser: {e}")
+            metrics['steps'].append({
+                'step': 'static_fetch',
+                'timestamp': time.time(),
+                'duration': time.time() - step_start,
+                'error': str(e)
+            })
+            metrics['static_decision'] = 'fetch_error'
+            return None
+
+        matches = self.match_phrases_in_text([target_phrase] + (extra_phrases or []), result.text, "", url)
+        found = matches.pop(target_phrase)['found']
+        confirmed = learned is not None and learned['static_agreements'] >= self.config.rendering.static_confirmations
+        if result.status_code >= 400:
+            decision = f"http_{result.status_code}"
+        elif result.js_reason and not found:
+            decision = result.js_reason
+        elif confirmed:
+            decision = "answered"
+        else:
+            decision = "unconfirmed"
+        if extra_phrases:
+            self.record_shared_matches(metrics, matches)
+
+        metrics['steps'].append({
+            'step': 'static_fetch',
+            'timestamp': time.time(),
+            'duration': time.time() - step_start,
+            'status_code': result.status_code,
+            'html_length': result.html_length,
+            'content_length': len(result.text),
+            'found': found,
+            'method': decision
+        })
+        metrics['static_decision'] = decision
+        metrics['static_found'] = found
+        metrics['content_fingerprint'] = self.text_fingerprint(result.text, "static")
+
+        if result.js_reason and not found:
+            self.save_render_tier(page_key, True, 0, result.js_reason)
+        if decision != "answered":
+            return None
+
+        metrics['tier'] = 'static'
+        metrics['attempts'] = 1
+        if found:
+            metrics['final_status'] = 'success'
+            message = f"Target phrase '{target_phrase}' found on {url} (static HTML)"
+        else:
+            metrics['final_status'] = 'not_found'
+            message = f"Target phrase '{target_phrase}' not found on {url} (static HTML)"
+        logger.info(message)
+        return found, message, metrics
+
+    def learn_render_tier(self, url: str, metrics: Dict[str, Any], browser_found: bool):
+        """Update the page's tier decision after the browser had to answer."""
+        if 'static_found' not in metrics or metrics.get('final_status') in ('failed', 'blocked'):
+            return
+        page_key = self.page_key(url)
+        if browser_found and not metrics['static_found']:
+            logger.info(f"Browser found content the static tier missed; {page_key} needs JS")
+            self.save_render_tier(page_key, True, 0, "browser_only_match")
+        elif metrics['static_found'] and not browser_found:
+            logger.info(f"Static HTML matched content the browser does not show; {page_key} needs JS")
+            self.save_render_tier(page_key, True, 0, "static_only_match")
+        elif metrics.get('static_decision') == 'unconfirmed':
+            # Both tiers agreed on a page whose static HTML looked complete
+            learned = self.get_render_tier(page_key)
+            agreements = (learned['static_agreements'] if learned else 0) + 1
+            self.save_render_tier(page_key, False, agreements, "agreement")
+
     def monitor_url(
         self,
         url: str,
@@ -433,43 +1020,314 @@ class EnhancedMonitor:
         selector: Optional[str] = None,
         exclude_selector: Optional[str] = None,
         screenshot_path: Optional[str] = None,
-        html_dump_path: Optional[str] = None
+        html_dump_path: Optional[str] = None,
+        watcher_id: Optional[int] = None,
+        extra_phrases: Optional[List[str]] = None,
+        render_budget: Optional[float] = None
     ) -> Tuple[bool, str, Dict[str, Any]]:
         """
         Enhanced URL monitoring with all stealth, rendering, and resilience features.
 
+        Tries the static HTTP tier first and escalates to the browser when the page
+        needs JavaScript; ``metrics['tier']`` records which tier answered.
+
+        ``extra_phrases`` turns the check into a shared render: the page is loaded
+        once, driven by ``target_phrase``, and every extra phrase is matched against
+        the same content. Their verdicts land in ``metrics['shared_matches']``.
+
+        ``render_budget`` (seconds) bounds the browser tier, retries included; a
+        render that runs over is aborted with ``final_status`` ``'heavy'``.
+
         Returns:
             Tuple of (found: bool, message: str, metrics: Dict)
         """
-        start_time = time.time()
-        domain = urlparse(url).netloc
-        metrics = {
-            'start_time': start_time,
-            'url': url,
-            'target_phrase': target_phrase,
-            'attempts': 0,
-            'final_status': 'pending',
-            'execution_time': 0,
-            'steps': []
+        metrics = self.new_metrics(url, target_phrase)
+
+        static_verdict = self.try_static_tier(
+            url, target_phrase, selector, exclude_selector, metrics, extra_phrases
+        )
+        if static_verdict is not None:
+            return static_verdict
+
+        self.start_render_budget(metrics, render_budget)
+        found, message, metrics = self.render_in_browser(
+            url, target_phrase, selector, exclude_selector, screenshot_path, html_dump_path, metrics,
+            watcher_id=watcher_id, extra_phrases=extra_phrases
+        )
+        self.finish_render_budget(metrics)
+        self.learn_render_tier(url, metrics, found)
+        if not extra_phrases:
+            self.learn_render_profile(self.profile_key(url, watcher_id), metrics, found)
+        return found, message, metrics
+
+    def check_json(
+        self,
+        url: str,
+        target_phrase: str,
+        condition: Optional[str] = None,
+        extra_phrases: Optional[List[str]] = None
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Check a JSON API watcher: one pooled HTTP request, no browser.
+
+        The watcher matches when ``condition`` (see ``json_condition``) holds and
+        every keyword of ``target_phrase`` appears in the payload's values; either
+        may be blank. Refusals (HTTP 401/403/429, challenge pages) end as
+        ``blocked``, other HTTP errors and non-JSON bodies as ``failed``.
+        ``extra_phrases`` share the fetch the way they share a render.
+        """
+        metrics = self.new_metrics(url, target_phrase)
+        metrics['tier'] = 'json'
+        metrics['attempts'] = 1
+        step_start = time.time()
+        try:
+            result = self.static_fetcher.fetch_json(
+                url, self.get_stealth_headers(url), self.config.rendering.static_timeout
+            )
+        except Exception as e:
+            metrics['steps'].append({
+                'step': 'json_fetch',
+                'timestamp': time.time(),
+                'duration': time.time() - step_start,
+                'error': str(e)
+            })
+            metrics['final_status'] = 'failed'
+            message = f"JSON fetch of {url} failed: {str(e)[:300]}"
+            logger.warning(message)
+            return False, message, metrics
+
+        step = {
+            'step': 'json_fetch',
+            'timestamp': time.time(),
+            'duration': result.duration,
+            'status_code': result.status_code,
+            'content_length': len(result.body),
         }
+        metrics['steps'].append(step)
+        verdict = classify_page(result.status_code, None)
+        if verdict is None and result.payload is None:
+            snapshot = {
+                'title': '',
+                'text': result.body[:4000],
+                'text_length': len(result.body),
+                'html': result.body[:20000],
+                'html_length': len(result.body),
+            }
+            verdict = classify_page(result.status_code, snapshot) or PageVerdict('failed', 'not_json')
+        if verdict is not None:
+            step['method'] = verdict.reason
+            metrics['final_status'] = verdict.status
+            metrics['page_verdict'] = verdict.reason
+            message = f"JSON fetch of {url} {'refused' if verdict.status == 'blocked' else 'failed'} ({verdict.reason})"
+            logger.warning(message)
+            return False, message, metrics
+
+        holds = json_condition.evaluate(result.payload, condition) if condition else True
+        matches = {
+            phrase: {'found': holds and phrase_hit(result.payload, phrase.lower().split(), [])}
+            for phrase in [target_phrase] + (extra_phrases or [])
+        }
+        found = matches.pop(target_phrase)['found']
+        if extra_phrases:
+            self.record_shared_matches(metrics, matches)
+        step['found'] = found
+        step['method'] = 'condition' if condition else 'phrase'
+        metrics['content_fingerprint'] = self.text_fingerprint(json.dumps(result.payload, sort_keys=True), "json")
+        metrics['final_status'] = 'success' if found else 'not_found'
+        metrics['execution_time'] = time.time() - metrics['start_time']
+        target = " and ".join(
+            part for part in (
+                f"phrase '{target_phrase}'" if target_phrase.strip() else "",
+                f"condition '{condition}'" if condition else "",
+            ) if part
+        )
+        message = f"JSON watch ({target}) {'matched' if found else 'not matched'} on {url}"
+        logger.info(message)
+        return found, message, metrics
+
+    # Engine-independent steps of a browser render. ``render_in_browser`` here and in
+    # ``AsyncEnhancedMonitor`` only differ in how they call Playwright.
+
+    @staticmethod
+    def add_step(metrics: Dict[str, Any], step: str, step_start: float, **fields):
+        metrics['steps'].append({
+            'step': step,
+            'timestamp': time.time(),
+            'duration': time.time() - step_start,
+            **fields
+        })
+
+    def attempt_watchers(
+        self,
+        url: str,
+        target_phrase: str,
+        exclude_selector: Optional[str],
+        screenshot_path: Optional[str],
+        html_dump_path: Optional[str],
+        watcher_id: Optional[int],
+        extra_phrases: Optional[List[str]]
+    ) -> Tuple[ResourceBlocker, Optional[PhraseWatch], Optional[ResponseWatch]]:
+        """Resource blocker, early-exit watcher and network watcher for one render attempt."""
+        # Drop images, fonts, media and trackers we never look at
+        blocker = ResourceBlocker(resolve_blocking_policy(self.config.rendering, url, watcher_id))
+        watch = self.create_phrase_watch(
+            url, target_phrase, exclude_selector, screenshot_path, html_dump_path, extra_phrases
+        )
+        responses = self.create_response_watch(url, target_phrase, watcher_id, extra_phrases)
+        return blocker, watch, responses
 
-        # Clean up expired sessions
-        self.cleanup_expired_sessions()
+    def matches_in_page(self, html_dump_path: Optional[str], extra_phrases: Optional[List[str]]) -> bool:
+        """
+        Whether to match the phrase inside the page so only the verdict crosses CDP;
+        HTML dumps and shared renders need the full text.
+        """
+        return self.config.rendering.match_in_page and not html_dump_path and not extra_phrases
 
-        # Check for existing session
-        existing_session = self.get_active_session(domain)
-        if existing_session:
-            logger.info(f"Reusing existing session: {existing_session}")
-            self.current_session_id = existing_session
+    def record_in_page_match(self, metrics: Dict[str, Any], step_start: float, match: Optional[Dict[str, Any]]):
+        if match is not None:
+            self.add_step(metrics, 'content_extraction', step_start, method='in_page', content_length=match['text_length'])
+
+    def match_extracted_text(
+        self,
+        url: str,
+        target_phrase: str,
+        content: str,
+        excluded_content: str,
+        metrics: Dict[str, Any],
+        extra_phrases: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Match extracted page text; every phrase of a shared render in one pass over it."""
+        if extra_phrases:
+            matches = self.match_phrases_in_text([target_phrase] + extra_phrases, content, excluded_content, url)
+            match = matches.pop(target_phrase)
+            self.record_shared_matches(metrics, matches)
         else:
-            logger.info("Starting new monitoring session")
-            self.start_new_session(domain)
+            match = self.match_phrase_in_text(target_phrase, content, excluded_content)
+        match['fingerprint'] = self.text_fingerprint(content)
+        return match
+
+    def agoda_result(
+        self,
+        url: str,
+        target_phrase: str,
+        metrics: Dict[str, Any],
+        step_start: float,
+        found: bool,
+        extra_found: Optional[Dict[str, bool]] = None
+    ) -> Optional[Tuple[bool, str, Dict[str, Any]]]:
+        """Verdict of the Agoda availability check, or None to retry (if any are left)."""
+        if extra_found:
+            self.record_shared_matches(metrics, {phrase: {'found': hit} for phrase, hit in extra_found.items()})
+        self.add_step(metrics, 'agoda_check', step_start, found=found)
+        if not found:
+            # We skip the generic check to avoid false positives/negatives from raw text
+            logger.info("Agoda check returned False, skipping generic text check")
+            return None
+        metrics['final_status'] = 'success'
+        message = f"Target phrase '{target_phrase}' found on {url} (Agoda Check)"
+        logger.info(message)
+        return True, message, metrics
+
+    def write_html_dump(self, html_dump_path: str, content: str, metrics: Dict[str, Any]):
+        step_start = time.time()
+        try:
+            Path(html_dump_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(html_dump_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            logger.info(f"Saved HTML to {html_dump_path}")
+        except Exception as e:
+            logger.warning(f"Failed to save HTML: {e}")
+        self.add_step(metrics, 'html_dump', step_start, path=html_dump_path)
+
+    def match_result(
+        self, url: str, target_phrase: str, match: Dict[str, Any], metrics: Dict[str, Any]
+    ) -> Optional[Tuple[bool, str, Dict[str, Any]]]:
+        """Final verdict of an attempt from its phrase match, or None when the phrase was not seen."""
+        step_start = time.time()
+        found = match['found']
+        metrics['content_fingerprint'] = match.get('fingerprint')
+
+        # Check if phrase is exclusively in sold-out content
+        if not found and match['excluded_found']:
+            metrics['final_status'] = 'not_found'
+            message = f"Target phrase '{target_phrase}' found only in sold-out content, returning not found"
+            logger.info(message)
+            return False, message, metrics
+
+        self.add_step(
+            metrics, 'content_analysis', step_start,
+            target_found=found, content_length=match['text_length'], snippet=match['snippet']
+        )
+        if found:
+            metrics['final_status'] = 'success'
+            message = f"Target phrase '{target_phrase}' found on {url}"
+            logger.info(message)
+            return True, message, metrics
+        return None
+
+    def next_length(self, length: int, last_length: Optional[int]) -> int:
+        """Track the page size between attempts (logs when a size-based retry is due)."""
+        if last_length and self.should_retry_based_on_length(length, last_length):
+            logger.info("Content size threshold not met, will retry")
+        return length
+
+    def attempt_failed(
+        self, metrics: Dict[str, Any], attempt: int, attempt_start: float, error: Exception
+    ) -> Optional[Tuple[bool, str, Dict[str, Any]]]:
+        """Record a failed attempt; returns the final result once no retries are left."""
+        logger.error(f"Attempt {attempt} failed: {str(error)}", exc_info=True)
+        self.add_step(metrics, 'error', attempt_start, error=str(error), attempt=attempt)
+        if attempt > self.config.resilience.max_retries:
+            metrics['final_status'] = 'failed'
+            return False, f"Render failed after {attempt} attempt(s): {str(error)[:300]}", metrics
+        return None
+
+    @staticmethod
+    def exhausted_result(target_phrase: str, attempt: int, metrics: Dict[str, Any]) -> Tuple[bool, str, Dict[str, Any]]:
+        metrics['final_status'] = 'not_found'
+        message = f"Target phrase '{target_phrase}' not found after {attempt} attempt(s)"
+        logger.warning(message)
+        return False, message, metrics
+
+    def save_response_cookies(self, context, domain: str) -> int:
+        cookies = context.cookies()
+        if cookies:
+            self.save_cookies_for_domain(domain, cookies)
+        return len(cookies) if cookies else 0
+
+    def save_screenshot(self, page, screenshot_path: str, metrics: Dict[str, Any]):
+        step_start = time.time()
+        try:
+            page.screenshot(path=screenshot_path)
+            logger.info(f"Saved screenshot to {screenshot_path}")
+        except Exception as e:
+            logger.warning(f"Failed to save screenshot: {e}")
+        self.add_step(metrics, 'screenshot', step_start, path=screenshot_path)
 
-        # Get stored cookies for this domain
-        stored_cookies = self.get_cookies_for_domain(domain)
+    def render_in_browser(
+        self,
+        url: str,
+        target_phrase: str,
+        selector: Optional[str],
+        exclude_selector: Optional[str],
+        screenshot_path: Optional[str],
+        html_dump_path: Optional[str],
+        metrics: Dict[str, Any],
+        watcher_id: Optional[int] = None,
+        extra_phrases: Optional[List[str]] = None
+    ) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Browser tier: render the page with Playwright, re-rendering at once up to
+        ``resilience.max_retries`` times. The scheduler runs it with none and
+        reschedules failed checks as delayed jobs instead (see ``retry_policy``).
+        """
+        domain = urlparse(url).netloc
+        metrics['tier'] = 'browser'
+        stored_cookies = self.prepare_session(domain)
+        profile = self.render_profile_for(url, watcher_id, extra_phrases)
 
         attempt = 0
-        last_content = None
+        last_length = None
 
         while attempt <= self.config.resilience.max_retries:
             attempt += 1
@@ -477,81 +1335,75 @@ class EnhancedMonitor:
             attempt_start = time.time()
 
             try:
-                self.apply_request_throttling()
+                self.check_render_budget(metrics)
                 step_start = time.time()
 
-                with sync_playwright() as p:
-                    # Configure browser launch
-                    browser = p.chromium.launch(
-                        headless=True,
-                        args=[
-                            "--disable-blink-features=AutomationControlled",
-                            "--disable-features=IsolateOrigins,site-per-process",
-                            "--disable-infobars",
-                            "--disable-notifications",
-                            "--disable-geolocation",
-                            "--disable-sync",
-                            "--metrics-recording-only",
-                            "--no-sandbox",
-                            "--disable-setuid-sandbox"
-                        ]
-                    )
-
+                with self.browser_pool.browser() as (pooled, pool_info):
+                    context = None
+                    warm = None
+                    blocker = None
+                    failed = False
+                    session_info = {}
                     try:
-                        # Create browser context with stealth settings
-                        width, height = self.get_viewport_size()
-                        context = browser.new_context(
-                            viewport={"width": width, "height": height},
-                            user_agent=self.config.stealth.user_agents.get_random_agent(),
-                            locale="en-US",
-                            timezone_id="America/New_York",
-                            ignore_https_errors=True,
-                            bypass_csp=True
+                        # Warm per-domain context (session affinity) or a fresh one
+                        # with stealth settings, stored session state and cookies
+                        context, warm, session_info = self.open_session_context(pooled, domain, stored_cookies)
+                        blocker, watch, responses = self.attempt_watchers(
+                            url, target_phrase, exclude_selector, screenshot_path, html_dump_path, watcher_id, extra_phrases
                         )
-
-                        # Apply stealth overrides
-                        self.apply_stealth_overrides(context)
-
-                        # Add stored cookies if available
-                        if stored_cookies:
-                            context.add_cookies(stored_cookies)
-                            logger.info(f"Added {len(stored_cookies)} stored cookies")
+                        blocker.attach(context)
 
                         page = context.new_page()
-                        metrics['steps'].append({
-                            'step': 'browser_launch',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start
-                        })
+                        page.set_default_timeout(self.page_timeout_ms(metrics, self.config.rendering.max_timeout))
+                        if watch:
+                            watch.attach(page)
+                        if responses:
+                            responses.attach(page)
+                        self.add_step(metrics, 'browser_launch', step_start, **pool_info, **session_info)
 
                         # Navigate to URL with smart waiting
                         step_start = time.time()
                         logger.info(f"Attempt {attempt}: Navigating to {url}")
-
+                        response = None
                         try:
-                            page.goto(
+                            response = page.goto(
                                 url,
                                 wait_until="domcontentloaded",
-                                timeout=int(self.config.rendering.max_timeout * 1000)
+                                timeout=self.page_timeout_ms(metrics, self.config.rendering.max_timeout)
                             )
                         except PlaywrightTimeout:
                             logger.warning(f"DOM content load timeout, continuing with partial content")
                             # Continue with whatever content we have
+                        self.add_step(metrics, 'navigation', step_start)
+                        self.check_render_budget(metrics)
+
+                        # Blocked, challenged and error pages cannot hold the phrase: end the attempt now
+                        verdict = self.classify_loaded_page(page, response, metrics)
+                        if verdict is not None:
+                            failed = True  # do not keep (or persist) the refused session
+                            return self.classified_result(url, metrics, verdict)
 
-                        metrics['steps'].append({
-                            'step': 'navigation',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start
-                        })
+                        # The API answered while the document loaded
+                        if responses and responses.decided:
+                            self.save_response_cookies(context, domain)
+                            return self.response_result(responses, url, target_phrase, metrics)
 
                         # Smart interactions to trigger dynamic content
                         step_start = time.time()
-                        self.perform_smart_interactions(page, url)
-                        metrics['steps'].append({
-                            'step': 'smart_interactions',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start
-                        })
+                        # Replay the learned profile on the first attempt; retries run everything
+                        interaction_stats = self.perform_smart_interactions(
+                            page, url, watch, profile if attempt == 1 else None, responses, metrics
+                        )
+                        self.add_step(metrics, 'smart_interactions', step_start, **interaction_stats)
+
+                        # The in-page watcher already saw the phrase; skip the rest
+                        if watch and watch.found:
+                            self.save_response_cookies(context, domain)
+                            return self.early_exit_result(watch, url, target_phrase, metrics)
+                        if responses and responses.decided:
+                            self.save_response_cookies(context, domain)
+                            return self.response_result(responses, url, target_phrase, metrics)
+                        self.check_render_budget(metrics)
 
                         # Wait for specific selector if provided
                         if selector:
@@ -559,227 +1411,82 @@ class EnhancedMonitor:
                             try:
                                 page.wait_for_selector(
                                     selector,
-                                    timeout=int(self.config.rendering.poll_interval * 1000)
+                                    timeout=self.page_timeout_ms(metrics, self.config.rendering.poll_interval)
                                 )
                                 logger.info(f"Selector '{selector}' found")
                             except Exception as e:
                                 logger.warning(f"Selector '{selector}' not found: {e}")
-                            metrics['steps'].append({
-                                'step': 'selector_wait',
-                                'timestamp': time.time(),
-                                'duration': time.time() - step_start,
-                                'selector': selector,
-                                'found': page.locator(selector).count() > 0
-                            })
+                            self.add_step(
+                                metrics, 'selector_wait', step_start,
+                                selector=selector, found=page.locator(selector).count() > 0
+                            )
+
+                        if responses and responses.decided:
+                            self.save_response_cookies(context, domain)
+                            return self.response_result(responses, url, target_phrase, metrics)
 
                         # SPECIALIZED AGODA CHECK
                         if "agoda.com" in url:
                             step_start = time.time()
-                            found = self.check_agoda_availability(page, target_phrase)
-                            metrics['steps'].append({
-                                'step': 'agoda_check',
-                                'timestamp': time.time(),
-                                'duration': time.time() - step_start,
-                                'found': found
-                            })
-                            
-                            if found:
-                                metrics['final_status'] = 'success'
-                                message = f"Target phrase '{target_phrase}' found on {url} (Agoda Check)"
-                                logger.info(message)
-                                
-                                # Save cookies before returning
-                                final_cookies = context.cookies()
-                                if final_cookies:
-                                    self.save_cookies_for_domain(domain, final_cookies)
-                                    
-                                return True, message, metrics
-                            
-                            # If not found via Agoda check, we consider it not found for this iteration
-                            # We skip the generic check to avoid false positives/negatives from raw text
-                            logger.info("Agoda check returned False, skipping generic text check")
-                            # We continue to retry loop (backoff)
-                            # But first ensure we close browser
-                            browser.close()
-                            
-                            if attempt < self.config.resilience.max_retries:
-                                backoff_delay = self.calculate_exponential_backoff(attempt)
-                                if backoff_delay > 0:
-                                    logger.info(f"Waiting {backoff_delay:.2f}s before retry attempt {attempt + 1}")
-                                    time.sleep(backoff_delay)
-                            continue
-
-                        # Capture full content and excluded content before removal
-
-                        step_start = time.time()
-                        full_content = page.content()
-                        excluded_content = ""
-                        if exclude_selector:
-                            try:
-                                count = page.locator(exclude_selector).count()
-                                logger.info(f"Found {count} elements matching exclude selector")
-                                excluded_content = page.locator(exclude_selector).evaluate_all("els => els.map(el => el.innerText.trim()).join(' ')")
-                                logger.info(f"Captured excluded content using evaluate_all")
-                            except Exception as e:
-                                logger.warning(f"Failed to capture excluded content: {e}")
-                        metrics['steps'].append({
-                            'step': 'content_capture',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start,
-                            'full_content_length': len(full_content),
-                            'excluded_content_length': len(excluded_content)
-                        })
-
-                        # Remove excluded elements if provided
-                        if exclude_selector:
+                            result = self.agoda_result(
+                                url, target_phrase, metrics, step_start,
+                                self.check_agoda_availability(page, target_phrase),
+                                {phrase: self.check_agoda_availability(page, phrase) for phrase in extra_phrases or []}
+                            )
+                            if result is None:
+                                # Retry (if any are left) without waiting: delayed retries are the scheduler's job
+                                continue
+                            self.save_response_cookies(context, domain)
+                            return result
+
+                        match = None
+                        if self.matches_in_page(html_dump_path, extra_phrases):
                             step_start = time.time()
-                            try:
-                                logger.info(f"Removing elements matching: {exclude_selector}")
-                                removed_count = page.locator(exclude_selector).count()
-                                page.locator(exclude_selector).evaluate_all("els => els.forEach(el => el.remove())")
-                                logger.info(f"Removed {removed_count} excluded elements")
-                                metrics['steps'].append({
-                                    'step': 'exclude_elements',
-                                    'timestamp': time.time(),
-                                    'duration': time.time() - step_start,
-                                    'selector': exclude_selector,
-                                    'removed_count': removed_count
-                                })
-                            except Exception as e:
-                                logger.warning(f"Failed to remove excluded elements: {e}")
-                                metrics['steps'].append({
-                                    'step': 'exclude_elements_error',
-                                    'timestamp': time.time(),
-                                    'duration': time.time() - step_start,
-                                    'error': str(e)
-                                })
-
-                        # Get cleaned page content
-                        step_start = time.time()
-                        content = page.locator('body').inner_text()
-                        metrics['steps'].append({
-                            'step': 'content_extraction',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start,
-                            'content_length': len(content)
-                        })
-
-                        # Take screenshot if requested
+                            match = self.match_phrase_in_page(page, target_phrase, exclude_selector)
+                            self.record_in_page_match(metrics, step_start, match)
+                        if match is None:
+                            content, excluded_content = self.extract_page_text(page, exclude_selector, metrics)
+                            match = self.match_extracted_text(
+                                url, target_phrase, content, excluded_content, metrics, extra_phrases
+                            )
+
                         if screenshot_path:
-                            step_start = time.time()
-                            try:
-                                page.screenshot(path=screenshot_path)
-                                logger.info(f"Saved screenshot to {screenshot_path}")
-                            except Exception as e:
-                                logger.warning(f"Failed to save screenshot: {e}")
-                            metrics['steps'].append({
-                                'step': 'screenshot',
-                                'timestamp': time.time(),
-                                'duration': time.time() - step_start,
-                                'path': screenshot_path
-                            })
-
-                        # Dump HTML if requested
+                            self.save_screenshot(page, screenshot_path, metrics)
                         if html_dump_path:
-                            step_start = time.time()
-                            try:
-                                Path(html_dump_path).parent.mkdir(parents=True, exist_ok=True)
-                                with open(html_dump_path, 'w', encoding='utf-8') as f:
-                                    f.write(content)
-                                logger.info(f"Saved HTML to {html_dump_path}")
-                            except Exception as e:
-                                logger.warning(f"Failed to save HTML: {e}")
-                            metrics['steps'].append({
-                                'step': 'html_dump',
-                                'timestamp': time.time(),
-                                'duration': time.time() - step_start,
-                                'path': html_dump_path
-                            })
+                            self.write_html_dump(html_dump_path, content, metrics)
 
                         # Store cookies for future use
                         step_start = time.time()
-                        cookies = context.cookies()
-                        if cookies:
-                            self.save_cookies_for_domain(domain, cookies)
-                            logger.info(f"Saved {len(cookies)} cookies for {domain}")
-                        metrics['steps'].append({
-                            'step': 'cookie_storage',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start,
-                            'cookies_stored': len(cookies) if cookies else 0
-                        })
-
-                        # Check for target phrase in content
-                        step_start = time.time()
-                        found = target_phrase.lower() in content.lower()
-
-                        # Check if phrase is exclusively in sold-out content
-                        if not found and excluded_content and target_phrase.lower() in excluded_content.lower():
-                            metrics['final_status'] = 'not_found'
-                            message = f"Target phrase '{target_phrase}' found only in sold-out content, returning not found"
-                            logger.info(message)
-                            return False, message, metrics
-
-
-
-                        metrics['steps'].append({
-                            'step': 'content_analysis',
-                            'timestamp': time.time(),
-                            'duration': time.time() - step_start,
-                            'target_found': found,
-                            'content_length': len(content)
-                        })
-
-                        if found:
-                            metrics['final_status'] = 'success'
-                            message = f"Target phrase '{target_phrase}' found on {url}"
-                            logger.info(message)
-
-                            # Save final cookies
-                            final_cookies = context.cookies()
-                            if final_cookies:
-                                self.save_cookies_for_domain(domain, final_cookies)
-
-                            return True, message, metrics
-
-                        # Check if we should retry based on content size
-                        if last_content and self.should_retry_based_on_size(content, last_content):
-                            logger.info("Content size threshold not met, will retry")
-                            last_content = content
-                            continue
-
-                        last_content = content
-
+                        stored = self.save_response_cookies(context, domain)
+                        if stored:
+                            logger.info(f"Saved {stored} cookies for {domain}")
+                        self.add_step(metrics, 'cookie_storage', step_start, cookies_stored=stored)
+
+                        result = self.match_result(url, target_phrase, match, metrics)
+                        if result is not None:
+                            return result
+                        last_length = self.next_length(match['text_length'], last_length)
+
+                    except Exception:
+                        failed = True
+                        raise
                     finally:
-                        browser.close()
-
-                # Calculate backoff for next attempt
-                if attempt < self.config.resilience.max_retries:
-                    backoff_delay = self.calculate_exponential_backoff(attempt)
-                    if backoff_delay > 0:
-                        logger.info(f"Waiting {backoff_delay:.2f}s before retry attempt {attempt + 1}")
-                        time.sleep(backoff_delay)
-
+                        if blocker is not None:
+                            metrics['steps'].append(blocker.metrics_step())
+                            if context is not None:
+                                blocker.detach(context)
+                        if context is not None:
+                            self.close_session_context(pooled, context, warm, session_info.get('session_id'), failed)
+
+            except RenderTooHeavyError as e:
+                return self.heavy_result(url, metrics, e)
             except Exception as e:
-                error_msg = f"Attempt {attempt} failed: {str(e)}"
-                logger.error(error_msg, exc_info=True)
-                metrics['steps'].append({
-                    'step': 'error',
-                    'timestamp': time.time(),
-                    'duration': time.time() - attempt_start,
-                    'error': str(e),
-                    'attempt': attempt
-                })
-
-                if attempt >= self.config.resilience.max_retries:
-                    metrics['final_status'] = 'failed'
-                    return False, f"All {self.config.resilience.max_retries} attempts failed", metrics
+                result = self.attempt_failed(metrics, attempt, attempt_start, e)
+                if result is not None:
+                    return result
 
         # If we get here, all retries exhausted without success
-        metrics['final_status'] = 'not_found'
-        message = f"Target phrase '{target_phrase}' not found after {self.config.resilience.max_retries} attempts"
-        logger.warning(message)
-        return False, message, metrics
+        return self.exhausted_result(target_phrase, attempt, metrics)
 
     def generate_diff_report(self, metrics: Dict[str, Any], report_path: str):
         """Generate a detailed diff report of the monitoring process."""
@@ -816,8 +1523,11 @@ class EnhancedMonitor:
             <p><strong>Status:</strong> <span class="{'success' if metrics['final_status'] == 'success' else 'failed'}">
                 {metrics['final_status'].upper()}
             </span></p>
+            <p><strong>Tier:</strong> {metrics.get('tier') or 'N/A'}</p>
             <p><strong>Attempts:</strong> {metrics['attempts']}</p>
             <p><strong>Execution Time:</strong> {metrics['execution_time']:.2f}s</p>
+            <p><strong>Queue Wait:</strong> {metrics.get('dispatch', {}).get('queue_wait', 0):.2f}s
+                ({metrics.get('dispatch', {}).get('rate_wait', 0):.2f}s rate limited)</p>
 
             <h2>Timeline</h2>
             <table>
@@ -850,6 +1560,22 @@ class EnhancedMonitor:
                 details.append(f"Error: {step['error']}")
             if 'method' in step:
                 details.append(f"Method: {step['method']}")
+            if 'scrolls' in step:
+                details.append(f"Scrolls: {step['scrolls']} ({step['productive_scrolls']} productive, ~{step['time_saved_est']:.1f}s saved)")
+            if 'selector_hits' in step:
+                details.append(f"Selectors: {len(step['selector_hits'])}/{step['selectors_probed']} matched")
+            if 'profile' in step:
+                details.append(f"Profile: {step['profile']}")
+            if 'found_after' in step:
+                details.append(f"Phrase seen after {step['found_after']:.2f}s")
+            if 'requests_blocked' in step:
+                details.append(f"Blocked: {step['requests_blocked']} requests (~{step['bytes_blocked_est'] // 1024} KB)")
+            if 'status_code' in step:
+                details.append(f"HTTP: {step['status_code']}")
+            if 'session' in step:
+                details.append(f"Session: {step['session']}" + (f" ({step['session_uses']} prior checks)" if step.get('session_uses') else ""))
+            if 'pool' in step:
+                details.append(f"Pool: {step['pool']}" + (f" ({step['reason']})" if step.get('reason') else ""))
 
             details_str = ", ".join(details) if details else "N/A"
 
@@ -948,6 +1674,9 @@ def main():
         html_dump_path=html_dump_path
     )
 
+    monitor.browser_pool.shutdown()
+    monitor.cookie_store.close()
+
     # Calculate total execution time
     metrics['execution_time'] = time.time() - metrics['start_time']
 
@@ -963,6 +1692,7 @@ def main():
     print(f"Target Phrase: {args.phrase}")
     print(f"Status: {'FOUND' if found else 'NOT FOUND'}")
     print(f"Message: {message}")
+    print(f"Tier: {metrics.get('tier')}")
     print(f"Attempts: {metrics['attempts']}")
     print(f"Execution Time: {metrics['execution_time']:.2f}s")
     print(f"Report: {report_path}")
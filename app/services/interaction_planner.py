@@ -0,0 +1,168 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Resolves every selector in one round trip. Playwright's ``X:has-text('...')`` is
+# emulated (case-insensitive, whitespace-normalized substring of the text), and the
+# same bounding-box/visibility rule Playwright uses decides what is visible, so the
+# returned indices line up with ``page.locator(selector).nth(i)``.
+PROBE_SELECTORS_JS = """
+    (selectors) => {
+        const HAS_TEXT = /^(.*?):has-text\\(\\s*(['"])(.*)\\2\\s*\\)$/;
+        const normalize = s => (s || '').replace(/\\s+/g, ' ').toLowerCase();
+        const visible = el => {
+            const rect = el.getBoundingClientRect();
+            if (!rect.width || !rect.height) return false;
+            return getComputedStyle(el).visibility !== 'hidden';
+        };
+        const results = {};
+        for (const selector of selectors) {
+            let elements;
+            try {
+                const m = selector.match(HAS_TEXT);
+                if (m) {
+                    const needle = normalize(m[3]).trim();
+                    elements = Array.from(document.querySelectorAll(m[1] || '*'))
+                        .filter(el => normalize(el.textContent).includes(needle));
+                } else {
+                    elements = Array.from(document.querySelectorAll(selector));
+                }
+            } catch (e) {
+                results[selector] = {supported: false, count: 0, visible: []};
+                continue;
+            }
+            const visibleIdx = [];
+            for (let i = 0; i < elements.length && visibleIdx.length < __MAX_TARGETS__; i++) {
+                if (visible(elements[i])) visibleIdx.push(i);
+            }
+            results[selector] = {supported: true, count: elements.length, visible: visibleIdx};
+        }
+        return results;
+    }
+"""
+
+MAX_TARGETS_PER_SELECTOR = 3
+
+
+@dataclass
+class SelectorProbe:
+    selector: str
+    supported: bool = True
+    count: int = 0
+    visible: List[int] = field(default_factory=list)
+
+
+@dataclass
+class InteractionPlan:
+    """The visible elements worth touching, resolved before any interaction runs."""
+    hovers: List[Tuple[str, int]] = field(default_factory=list)
+    clicks: List[Tuple[str, int]] = field(default_factory=list)
+    probes: Dict[str, SelectorProbe] = field(default_factory=dict)
+    fallback_probes: int = 0
+    probe_time: float = 0.0
+
+    def as_metrics(self) -> Dict[str, Any]:
+        return {
+            'selectors_probed': len(self.probes),
+            'selector_hits': {
+                probe.selector: {'count': probe.count, 'visible': len(probe.visible)}
+                for probe in self.probes.values() if probe.count
+            },
+            'fallback_probes': self.fallback_probes,
+            'probe_time': round(self.probe_time, 3),
+        }
+
+
+class InteractionPlanner:
+    """
+    Single-pass interaction planning.
+
+    Every hover and click selector is resolved with one ``page.evaluate`` instead of
+    a ``count()``/``is_visible()`` pair per selector. Selectors the page cannot run
+    (other Playwright-only syntax) fall back to per-selector locator probing.
+    ``click_groups`` are tried in order; the first visible element of each group is
+    clicked, matching the old "first matching button" behaviour.
+    """
+
+    def __init__(self, hover_selectors: List[str], click_groups: List[List[str]]):
+        self.hover_selectors = list(hover_selectors or [])
+        self.click_groups = [list(group or []) for group in click_groups]
+
+    def selectors(self) -> List[str]:
+        seen = []
+        for selector in self.hover_selectors + [s for group in self.click_groups for s in group]:
+            if selector not in seen:
+                seen.append(selector)
+        return seen
+
+    @staticmethod
+    def script() -> str:
+        return PROBE_SELECTORS_JS.replace("__MAX_TARGETS__", str(MAX_TARGETS_PER_SELECTOR))
+
+    def _build(self, raw: Dict[str, Dict[str, Any]]) -> InteractionPlan:
+        plan = InteractionPlan()
+        for selector in self.selectors():
+            result = raw.get(selector) or {}
+            plan.probes[selector] = SelectorProbe(
+                selector=selector,
+                supported=result.get('supported', False),
+                count=result.get('count', 0),
+                visible=list(result.get('visible', [])),
+            )
+        return plan
+
+    def _finish(self, plan: InteractionPlan) -> InteractionPlan:
+        for selector in self.hover_selectors:
+            for index in plan.probes[selector].visible:
+                plan.hovers.append((selector, index))
+        for group in self.click_groups:
+            for selector in group:
+                visible = plan.probes[selector].visible
+                if visible:
+                    plan.clicks.append((selector, visible[0]))
+                    break
+        return plan
+
+    def _fallback(self, page, probe: SelectorProbe):
+        locator = page.locator(probe.selector)
+        probe.count = locator.count()
+        probe.visible = [
+            i for i in range(min(probe.count, MAX_TARGETS_PER_SELECTOR)) if locator.nth(i).is_visible()
+        ]
+
+    async def _fallback_async(self, page, probe: SelectorProbe):
+        locator = page.locator(probe.selector)
+        probe.count = await locator.count()
+        probe.visible = [
+            i for i in range(min(probe.count, MAX_TARGETS_PER_SELECTOR)) if await locator.nth(i).is_visible()
+        ]
+
+    def plan(self, page) -> InteractionPlan:
+        started = time.time()
+        plan = self._build(page.evaluate(self.script(), self.selectors()))
+        for probe in plan.probes.values():
+            if not probe.supported:
+                plan.fallback_probes += 1
+                try:
+                    self._fallback(page, probe)
+                except Exception as e:
+                    logger.debug(f"Error probing {probe.selector}: {e}")
+        plan.probe_time = time.time() - started
+        return self._finish(plan)
+
+    async def plan_async(self, page) -> InteractionPlan:
+        started = time.time()
+        plan = self._build(await page.evaluate(self.script(), self.selectors()))
+        for probe in plan.probes.values():
+            if not probe.supported:
+                plan.fallback_probes += 1
+                try:
+                    await self._fallback_async(page, probe)
+                except Exception as e:
+                    logger.debug(f"Error probing {probe.selector}: {e}")
+        plan.probe_time = time.time() - started
+        return self._finish(plan)
@@ -0,0 +1,238 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+
+from app.db.database import SessionLocal
+from app.db.models import CheckJob
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    watcher_id: int
+    force: bool
+    attempt: int = 1
+    retry_of: Optional[int] = None
+
+
+class JobQueue:
+    """
+    Due checks persisted in the ``check_jobs`` table, so renders can run in
+    worker processes (``python -m app.worker``) on this box or any other that
+    shares the database.
+
+    The scheduler ``enqueue``s; workers ``claim`` jobs under a lease and ``renew``
+    it while the check runs. A worker that dies stops renewing, and once its
+    lease expires the job is claimed again, up to ``max_attempts`` times. Claims
+    are conditional UPDATEs (only one worker's matches the row), so no
+    database-specific locking is needed.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        lease_seconds: int = 300,
+        max_attempts: int = 3,
+        retention_hours: int = 24,
+    ):
+        self.session_factory = session_factory
+        self.lease_seconds = max(1, lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.retention_hours = retention_hours
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            and_(CheckJob.status == QUEUED, CheckJob.run_after <= now),
+            and_(CheckJob.status == RUNNING, CheckJob.lease_expires_at < now),
+        )
+
+    def enqueue(
+        self,
+        watcher_id: int,
+        force: bool = False,
+        delay: float = 0.0,
+        attempt: int = 1,
+        retry_of: Optional[int] = None,
+    ) -> bool:
+        """
+        Queue a check, claimable after ``delay`` seconds. Returns False if the
+        watcher's check is already running; a queued duplicate is merged into the
+        queued job (``force`` and the later attempt are kept). Retries
+        (``attempt`` > 1) are queued while the failed check is still running,
+        since that check is the one scheduling them.
+        """
+        pending_states = (QUEUED,) if attempt > 1 else (QUEUED, RUNNING)
+        with self.session_factory() as db:
+            pending = db.execute(
+                select(CheckJob)
+                .where(CheckJob.watcher_id == watcher_id, CheckJob.status.in_(pending_states))
+                .order_by(CheckJob.id)
+            ).scalars().first()
+            if pending is not None and pending.status == RUNNING:
+                logger.info(f"[Watcher #{watcher_id}] Check already running in a worker, skipping")
+                return False
+            if pending is not None:
+                pending.force = pending.force or force
+                if attempt > pending.check_attempt:
+                    pending.check_attempt = attempt
+                    pending.retry_of_log_id = retry_of
+                db.commit()
+                return True
+            now = datetime.utcnow()
+            db.add(CheckJob(
+                watcher_id=watcher_id,
+                force=force,
+                status=QUEUED,
+                enqueued_at=now,
+                run_after=now + timedelta(seconds=max(0.0, delay)),
+                check_attempt=attempt,
+                retry_of_log_id=retry_of,
+            ))
+            db.commit()
+            return True
+
+    def claim(self, owner: str, limit: int, priority: Optional[bool] = None) -> List[ClaimedJob]:
+        """
+        Lease up to ``limit`` due (or abandoned) jobs to ``owner``, manual
+        (``force``) jobs first; ``priority`` restricts the claim to one kind.
+        """
+        if limit <= 0:
+            return []
+        now = datetime.utcnow()
+        claimed = []
+        with self.session_factory() as db:
+            # Abandoned jobs that used up their attempts are not handed out again
+            db.execute(
+                update(CheckJob)
+                .where(
+                    CheckJob.status == RUNNING,
+                    CheckJob.lease_expires_at < now,
+                    CheckJob.attempts >= self.max_attempts,
+                )
+                .values(status=FAILED, finished_at=now, error="lease expired after final attempt")
+            )
+            query = select(
+                CheckJob.id, CheckJob.watcher_id, CheckJob.force, CheckJob.check_attempt, CheckJob.retry_of_log_id
+            ).where(self._claimable(now))
+            if priority is not None:
+                query = query.where(CheckJob.force == priority)
+            candidates = db.execute(
+                query.order_by(CheckJob.force.desc(), CheckJob.run_after, CheckJob.id).limit(limit)
+            ).all()
+            for job_id, watcher_id, force, attempt, retry_of in candidates:
+                result = db.execute(
+                    update(CheckJob)
+                    .where(CheckJob.id == job_id, self._claimable(now))
+                    .values(
+                        status=RUNNING,
+                        lease_owner=owner,
+                        lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        attempts=CheckJob.attempts + 1,
+                        started_at=now,
+                    )
+                )
+                if result.rowcount == 1:
+                    claimed.append(ClaimedJob(job_id, watcher_id, force, attempt, retry_of))
+            db.commit()
+        return claimed
+
+    def renew(self, owner: str, job_ids: Iterable[int]) -> int:
+        """Extend the leases ``owner`` still holds; returns how many were extended."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return 0
+        with self.session_factory() as db:
+            result = db.execute(
+                update(CheckJob)
+                .where(CheckJob.id.in_(job_ids), CheckJob.lease_owner == owner, CheckJob.status == RUNNING)
+                .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+        if result.rowcount < len(job_ids):
+            logger.warning(f"Worker {owner} lost {len(job_ids) - result.rowcount} job lease(s)")
+        return result.rowcount
+
+    def complete(self, owner: str, job_id: int, error: str | None = None) -> bool:
+        """Mark a claimed job finished. Returns False if the lease had been taken over."""
+        with self.session_factory() as db:
+            result = db.execute(
+                update(CheckJob)
+                .where(CheckJob.id == job_id, CheckJob.lease_owner == owner, CheckJob.status == RUNNING)
+                .values(status=FAILED if error else DONE, finished_at=datetime.utcnow(), error=error)
+            )
+            db.commit()
+        if result.rowcount != 1:
+            logger.warning(f"Job {job_id} finished after its lease moved to another worker")
+        return result.rowcount == 1
+
+    def release(self, owner: str, job_ids: Iterable[int]):
+        """Hand unfinished jobs back to the queue (worker shutdown) without waiting for lease expiry."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with self.session_factory() as db:
+            db.execute(
+                update(CheckJob)
+                .where(CheckJob.id.in_(job_ids), CheckJob.lease_owner == owner, CheckJob.status == RUNNING)
+                .values(status=QUEUED, lease_owner=None, lease_expires_at=None)
+            )
+            db.commit()
+
+    def position(self, watcher_id: int) -> Optional[Dict[str, object]]:
+        """Place in the claim order of a watcher's pending job (None if there is none)."""
+        with self.session_factory() as db:
+            job = db.execute(
+                select(CheckJob)
+                .where(CheckJob.watcher_id == watcher_id, CheckJob.status.in_((QUEUED, RUNNING)))
+                .order_by(CheckJob.id)
+            ).scalars().first()
+            if job is None:
+                return None
+            if job.status == RUNNING:
+                return {'state': 'running', 'position': 0, 'worker': job.lease_owner}
+            earlier = or_(
+                CheckJob.run_after < job.run_after,
+                and_(CheckJob.run_after == job.run_after, CheckJob.id < job.id),
+            )
+            same_lane = and_(CheckJob.force == job.force, earlier)
+            ahead_clause = same_lane if job.force else or_(CheckJob.force == True, same_lane)
+            ahead = db.execute(
+                select(func.count()).select_from(CheckJob).where(CheckJob.status == QUEUED, ahead_clause)
+            ).scalar_one()
+        return {'state': 'queued', 'position': ahead + 1}
+
+    def purge(self) -> int:
+        """Delete finished jobs older than ``retention_hours``."""
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        with self.session_factory() as db:
+            result = db.execute(
+                delete(CheckJob).where(CheckJob.status.in_((DONE, FAILED)), CheckJob.finished_at < cutoff)
+            )
+            db.commit()
+        return result.rowcount
+
+    def stats(self) -> Dict[str, object]:
+        with self.session_factory() as db:
+            counts = dict(db.execute(select(CheckJob.status, func.count()).group_by(CheckJob.status)).all())
+            workers = db.execute(
+                select(func.count(func.distinct(CheckJob.lease_owner))).where(CheckJob.status == RUNNING)
+            ).scalar_one()
+        return {
+            'queued': counts.get(QUEUED, 0),
+            'running': counts.get(RUNNING, 0),
+            'done': counts.get(DONE, 0),
+            'failed': counts.get(FAILED, 0),
+            'busy_workers': workers,
+        }
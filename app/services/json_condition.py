@@ -0,0 +1,134 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from app.db.models import WatcherKind
+from app.services import json_path
+
+
+# <path> [<op> <literal>], joined with "and" / "or" ("and" binds tighter, no parentheses)
+_CLAUSE = re.compile(
+    r"""\s*(?P<path>[^\s=!<>]+)"""
+    r"""(?:\s*(?P<op>==|!=|<=|>=|<|>|\bcontains\b)\s*(?P<value>"(?:[^"\\]|\\.)*"|'[^']*'|[^\s]+))?"""
+    r"""\s*(?:(?P<join>\band\b|\bor\b)|$)""",
+    re.I,
+)
+
+
+class ConditionError(ValueError):
+    pass
+
+
+@dataclass
+class Clause:
+    path: str
+    op: Optional[str] = None  # None: some selected node is truthy
+    value: Any = None
+
+
+_KEYWORDS = {"true": True, "false": False, "null": None, "none": None}
+
+
+def _literal(raw: str) -> Any:
+    if raw.startswith("'") and raw.endswith("'"):
+        return raw[1:-1]
+    if raw.lower() in _KEYWORDS:
+        return _KEYWORDS[raw.lower()]  # True, FALSE, None, ...
+    try:
+        return json.loads(raw)  # "text", numbers
+    except ValueError:
+        raise ConditionError(f"Unquoted value {raw!r}: put text in quotes") from None
+
+
+def parse_condition(text: str) -> List[List[Clause]]:
+    """
+    Parse a condition into OR-groups of AND-ed clauses, e.g.
+    ``$.available == true and $..price < 200`` or ``$.rooms[*].name contains "deluxe"``.
+    """
+    text = (text or "").strip()
+    if not text:
+        raise ConditionError("Empty condition")
+    groups: List[List[Clause]] = [[]]
+    pos = 0
+    while pos < len(text):
+        match = _CLAUSE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ConditionError(f"Cannot parse condition at {text[pos:]!r}")
+        try:
+            json_path.parse(match.group('path'))
+        except json_path.JsonPathError as e:
+            raise ConditionError(str(e)) from e
+        op = match.group('op').lower() if match.group('op') else None
+        value = _literal(match.group('value')) if op else None
+        groups[-1].append(Clause(match.group('path'), op, value))
+        join = (match.group('join') or "").lower()
+        pos = match.end()
+        if join and pos >= len(text):
+            raise ConditionError(f"Condition ends with {join!r}")
+        if join == "or":
+            groups.append([])
+    return groups
+
+
+def watcher_condition(kind: str, phrase: str, condition: Optional[str]) -> Optional[str]:
+    """
+    Check a watcher's target and return the condition to store: page watchers need
+    a phrase and keep no condition, JSON watchers a phrase, a valid condition, or both.
+    """
+    condition = (condition or "").strip() or None
+    if kind == WatcherKind.page:
+        condition = None
+    elif condition:
+        try:
+            parse_condition(condition)
+        except ConditionError as e:
+            raise ConditionError(f"Invalid JSON condition: {e}") from e
+    if not (phrase or "").strip() and not condition:
+        raise ConditionError("A phrase (or, for JSON watchers, a condition) is required")
+    return condition
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compare(node: Any, op: str, value: Any) -> bool:
+    if op == "contains":
+        if isinstance(node, list):
+            return any(_compare(item, "contains", value) for item in node)
+        return str(value).lower() in json_path.scalar_text(node)
+    if op in ("==", "!="):
+        left, right = _number(node), _number(value)
+        if isinstance(node, bool) or isinstance(value, bool):
+            equal = node is value  # true is not 1
+        elif left is not None and right is not None:
+            equal = left == right
+        elif isinstance(node, str) and isinstance(value, str):
+            equal = node.lower() == value.lower()
+        else:
+            equal = node == value
+        return equal if op == "==" else not equal
+    left, right = _number(node), _number(value)
+    if left is None or right is None:
+        return False
+    return {"<": left < right, "<=": left <= right, ">": left > right, ">=": left >= right}[op]
+
+
+def clause_holds(data: Any, clause: Clause) -> bool:
+    """A clause holds when any node its path selects satisfies it; ``!=`` holds when none equals the value."""
+    nodes = json_path.select(data, clause.path)
+    if clause.op is None:
+        return any(node not in (None, False, "", [], {}) for node in nodes)
+    if clause.op == "!=":
+        return bool(nodes) and all(_compare(node, "!=", clause.value) for node in nodes)
+    return any(_compare(node, clause.op, clause.value) for node in nodes)
+
+
+def evaluate(data: Any, condition: str) -> bool:
+    return any(all(clause_holds(data, clause) for clause in group) for group in parse_condition(condition))
@@ -0,0 +1,91 @@
+import re
+from typing import Any, List
+
+
+# $, .key, ..key, .*, [n], [*], ['key'] / ["key"]
+_TOKEN = re.compile(
+    r"""\.\.(?P<deep>[A-Za-z_$][\w$-]*|\*)"""
+    r"""|\.(?P<key>[A-Za-z_$][\w$-]*|\*)"""
+    r"""|\[\s*(?:(?P<index>-?\d+)|(?P<star>\*)|'(?P<sq>[^']*)'|"(?P<dq>[^"]*)")\s*\]"""
+)
+
+
+class JsonPathError(ValueError):
+    pass
+
+
+def parse(path: str) -> List[tuple]:
+    """Split a JSONPath expression into (kind, value) steps."""
+    path = (path or "$").strip()
+    if not path.startswith("$"):
+        path = "$." + path  # "rooms[*].name" is shorthand for "$.rooms[*].name"
+    steps, pos = [], 1
+    while pos < len(path):
+        match = _TOKEN.match(path, pos)
+        if match is None:
+            raise JsonPathError(f"Unsupported JSONPath at {path[pos:]!r} in {path!r}")
+        if match.group('deep') is not None:
+            steps.append(('deep', match.group('deep')))
+        elif match.group('key') is not None:
+            steps.append(('key', match.group('key')))
+        elif match.group('index') is not None:
+            steps.append(('index', int(match.group('index'))))
+        elif match.group('star') is not None:
+            steps.append(('key', '*'))
+        else:
+            steps.append(('key', match.group('sq') if match.group('sq') is not None else match.group('dq')))
+        pos = match.end()
+    return steps
+
+
+def _children(node: Any) -> List[Any]:
+    if isinstance(node, dict):
+        return list(node.values())
+    if isinstance(node, list):
+        return list(node)
+    return []
+
+
+def _descendants(node: Any) -> List[Any]:
+    found = [node]
+    for child in _children(node):
+        found.extend(_descendants(child))
+    return found
+
+
+def _step(node: Any, kind: str, value: Any) -> List[Any]:
+    if kind == 'index':
+        if isinstance(node, list) and -len(node) <= value < len(node):
+            return [node[value]]
+        return []
+    if value == '*':
+        return _children(node)
+    if isinstance(node, dict) and value in node:
+        return [node[value]]
+    return []
+
+
+def select(data: Any, path: str) -> List[Any]:
+    """
+    Nodes of ``data`` matched by ``path``. Supports the JSONPath subset the
+    watchers need: ``$``, ``.key``, ``['key']``, ``[n]``, ``[*]``/``.*`` and
+    recursive ``..key``; filters and slices are not supported.
+    """
+    nodes = [data]
+    for kind, value in parse(path):
+        if kind == 'deep':
+            nodes = [match for node in nodes for sub in _descendants(node) for match in _step(sub, 'key', value)]
+        else:
+            nodes = [match for node in nodes for match in _step(node, kind, value)]
+    return nodes
+
+
+def scalar_text(node: Any) -> str:
+    """Lowercased string and number values under ``node`` (keys excluded), for phrase matching."""
+    if isinstance(node, dict):
+        return " ".join(scalar_text(value) for value in node.values())
+    if isinstance(node, list):
+        return " ".join(scalar_text(value) for value in node)
+    if node is None or isinstance(node, bool):
+        return ""
+    return str(node).lower()
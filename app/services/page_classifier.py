@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+# Page facts the classifier needs, read in one round trip right after navigation
+PAGE_SNAPSHOT_JS = """
+() => {
+    const text = document.body ? (document.body.innerText || '') : '';
+    const html = document.documentElement ? document.documentElement.outerHTML : '';
+    return {
+        title: document.title || '',
+        text: text.slice(0, 4000),
+        text_length: text.length,
+        html: html.slice(0, 20000),
+        html_length: html.length,
+    };
+}
+"""
+
+# Refused outright: auth walls, bot blocks, rate limits, legal blocks
+BLOCKED_HTTP_STATUSES = {401, 403, 407, 429, 451}
+
+# Anti-bot interstitials, by vendor/kind, as a visitor reads them (title and visible text)
+CHALLENGE_TEXT_MARKERS = [
+    ("cloudflare", re.compile(r"just a moment\.\.\.|attention required! \| cloudflare", re.I)),
+    ("captcha", re.compile(r"(complete|solve) the (security check|captcha)|captcha to continue", re.I)),
+    ("bot_check", re.compile(
+        r"are you a (robot|human)|verify (that )?you are (a )?human|unusual traffic from your|"
+        r"pardon our interruption|access denied|request (was )?blocked",
+        re.I,
+    )),
+]
+# Markup only vendor interstitials carry. Generic widgets (reCAPTCHA, hCaptcha,
+# Turnstile, bot-management beacons) load on ordinary pages too and are not markers.
+CHALLENGE_HTML_MARKERS = [
+    ("cloudflare", re.compile(r"cf_chl_opt|cf-chl-", re.I)),
+    ("captcha", re.compile(r"px-captcha|captcha-delivery\.com", re.I)),
+]
+# Challenge pages carry little text; a real page that embeds a captcha widget (login, contact form) has more
+MAX_CHALLENGE_TEXT_LENGTH = 2000
+# ... and little markup; an SPA shell right after domcontentloaded also has little text, so
+# markup markers only count on pages this small
+MAX_CHALLENGE_HTML_LENGTH = 100_000
+# Below this a page without any text is an empty error response, not a shell still loading scripts
+MIN_PAGE_HTML_LENGTH = 256
+
+
+@dataclass
+class PageVerdict:
+    """Why a freshly loaded page cannot contain the phrase."""
+    status: str  # final_status for the check: 'blocked' or 'failed'
+    reason: str
+    challenge: bool = False  # an interstitial that may still solve itself
+
+
+def challenge_marker(snapshot: Dict[str, Any]) -> Optional[str]:
+    """Vendor/kind of the anti-bot interstitial a small page shows, if any."""
+    if snapshot.get('text_length', 0) > MAX_CHALLENGE_TEXT_LENGTH:
+        return None
+    visible = " ".join((snapshot.get('title') or '', snapshot.get('text') or ''))
+    for name, pattern in CHALLENGE_TEXT_MARKERS:
+        if pattern.search(visible):
+            return name
+    if snapshot.get('html_length', 0) > MAX_CHALLENGE_HTML_LENGTH:
+        return None
+    for name, pattern in CHALLENGE_HTML_MARKERS:
+        if pattern.search(snapshot.get('html') or ''):
+            return name
+    return None
+
+
+def classify_page(http_status: Optional[int], snapshot: Optional[Dict[str, Any]]) -> Optional[PageVerdict]:
+    """
+    Classify a page right after navigation: refused (HTTP 401/403/429..., or an
+    anti-bot challenge/captcha interstitial) is ``blocked``; an HTTP error or an
+    empty response is ``failed``. None means the page looks real and the render
+    should go on. Without a ``snapshot`` only the status is judged.
+    """
+    marker = challenge_marker(snapshot) if snapshot else None
+    if marker:
+        reason = f"http_{http_status} ({marker})" if http_status is not None and http_status >= 400 else marker
+        return PageVerdict('blocked', reason, challenge=True)
+    if http_status in BLOCKED_HTTP_STATUSES:
+        return PageVerdict('blocked', f"http_{http_status}")
+    if http_status is not None and http_status >= 400:
+        return PageVerdict('failed', f"http_{http_status}")
+    if snapshot and snapshot.get('html_length', 0) < MIN_PAGE_HTML_LENGTH and not snapshot.get('text', '').strip():
+        return PageVerdict('failed', "empty_page")
+    return None
@@ -0,0 +1,235 @@
+import json
+import logging
+import time
+from typing import Optional, Dict, Any
+
+
+logger = logging.getLogger(__name__)
+
+# Shared helpers for scanning the text a user can actually see: text nodes under
+# visible, non-excluded elements, lowercased with whitespace collapsed. Like
+# ``innerText``, text in different block-level boxes (blocks, table cells, flex
+# items) and around ``<br>`` is separated, while inline elements run together.
+VISIBLE_TEXT_HELPERS_JS = """
+    const __normalize = s => s.toLowerCase().replace(/\\s+/g, ' ');
+    const __SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+    const __makeVisibleText = (exclude) => {
+        const excluded = el => {
+            if (!exclude) return false;
+            try { return !!el.closest(exclude); } catch (e) { return false; }
+        };
+        const visible = el => el.checkVisibility
+            ? el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true})
+            : el.getClientRects().length > 0;
+        const inline = el => {
+            const display = getComputedStyle(el).display;
+            return display.startsWith('inline') || display === 'contents';
+        };
+        return (root) => {
+            const verdicts = new WeakMap();
+            const blocks = new WeakMap();
+            const blockOf = el => {
+                let block = blocks.get(el);
+                if (block === undefined) {
+                    block = (el === root || !el.parentElement || !inline(el)) ? el : blockOf(el.parentElement);
+                    blocks.set(el, block);
+                }
+                return block;
+            };
+            const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT | NodeFilter.SHOW_ELEMENT, {
+                acceptNode: node => {
+                    if (node.nodeType === 1) {
+                        return node.tagName === 'BR' ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+                    }
+                    const el = node.parentElement;
+                    if (!el) return NodeFilter.FILTER_REJECT;
+                    let ok = verdicts.get(el);
+                    if (ok === undefined) {
+                        ok = !__SKIP_TAGS.has(el.tagName) && !excluded(el) && visible(el);
+                        verdicts.set(el, ok);
+                    }
+                    return ok ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT;
+                }
+            });
+            const parts = [];
+            let node, lastBlock = null;
+            while ((node = walker.nextNode())) {
+                if (node.nodeType === 1) {
+                    parts.push('\\n');
+                    continue;
+                }
+                const block = blockOf(node.parentElement);
+                if (lastBlock !== null && block !== lastBlock) parts.push('\\n');
+                lastBlock = block;
+                parts.push(node.nodeValue);
+            }
+            return __normalize(parts.join(''));
+        };
+    };
+    const __selectorSupported = (selector) => {
+        if (!selector) return true;
+        try { document.querySelector(selector); return true; } catch (e) { return false; }
+    };
+"""
+
+# Init script: watches DOM mutations while the page loads and scrolls, and
+# reports the first visible match of the phrase through an exposed binding.
+PHRASE_WATCH_JS = """
+(() => {
+    if (window.__watcherPhraseWatch) return;
+    window.__watcherPhraseWatch = true;
+    const cfg = __CONFIG__;
+""" + VISIBLE_TEXT_HELPERS_JS + """
+    const phrase = __normalize(cfg.phrase).trim();
+    if (!phrase) return;
+
+    let observer = null;
+    let pending = new Set();
+    let fullScan = true;
+    let timer = null;
+    let done = false;
+
+    const report = (text, index) => {
+        done = true;
+        if (observer) observer.disconnect();
+        const snippet = text.slice(Math.max(0, index - 60), index + phrase.length + 60).trim();
+        window.__watcherPhraseHit = snippet;
+        try { window[cfg.binding](snippet); } catch (e) {}
+    };
+
+    const scan = () => {
+        timer = null;
+        if (done || !document.body) return;
+        const visibleText = __makeVisibleText(cfg.exclude);
+        const roots = (fullScan || pending.size > 200) ? [document.body] : Array.from(pending);
+        fullScan = false;
+        pending = new Set();
+        for (const root of roots) {
+            if (!root.isConnected) continue;
+            const text = visibleText(root);
+            const index = text.indexOf(phrase);
+            if (index >= 0) return report(text, index);
+        }
+    };
+
+    const schedule = () => { if (!timer && !done) timer = setTimeout(scan, cfg.throttleMs); };
+
+    const start = () => {
+        if (!__selectorSupported(cfg.exclude)) return;  // Playwright-only selector; cannot honor exclusions
+        observer = new MutationObserver(records => {
+            for (const record of records) {
+                const target = record.target.nodeType === 1 ? record.target : record.target.parentElement;
+                if (target) pending.add(target);
+            }
+            schedule();
+        });
+        observer.observe(document.documentElement, {
+            childList: true, subtree: true, characterData: true,
+            attributes: true, attributeFilter: ['class', 'style', 'hidden']
+        });
+        fullScan = true;
+        schedule();
+    };
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start, {once: true});
+    } else {
+        start();
+    }
+    window.addEventListener('load', () => { fullScan = true; schedule(); });
+})();
+"""
+
+# One-shot match over the finished page. Returns only the verdict, a snippet, the
+# visible text length and an FNV-1a fingerprint of that text (or null when the
+# exclude selector is not plain CSS), so the page text never has to cross CDP.
+# The text keeps ``innerText``'s element boundaries, so the verdict agrees with a
+# substring check on ``body.inner_text()`` (a phrase spanning table cells or flex
+# items matches; words from adjacent cells do not merge).
+PHRASE_MATCH_JS = """
+(cfg) => {
+""" + VISIBLE_TEXT_HELPERS_JS + """
+    if (!__selectorSupported(cfg.exclude)) return null;
+    const phrase = __normalize(cfg.phrase).trim();
+    const text = __makeVisibleText(cfg.exclude)(document.body || document.documentElement);
+    const index = text.indexOf(phrase);
+    let excludedFound = false;
+    if (index < 0 && cfg.exclude) {
+        for (const el of document.querySelectorAll(cfg.exclude)) {
+            if (__normalize(el.innerText || '').includes(phrase)) { excludedFound = true; break; }
+        }
+    }
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+        hash ^= text.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return {
+        found: index >= 0,
+        snippet: index >= 0 ? text.slice(Math.max(0, index - 60), index + phrase.length + 60).trim() : null,
+        text_length: text.length,
+        excluded_found: excludedFound,
+        fingerprint: 'page:' + (hash >>> 0).toString(16)
+    };
+}
+"""
+
+
+class PhraseWatch:
+    """
+    Early-exit watcher for one check.
+
+    Installs ``PHRASE_WATCH_JS`` on the page before navigation; the page calls back
+    through an exposed binding as soon as the phrase is visible outside excluded
+    elements, so the render can stop without finishing its interaction routine.
+    """
+
+    BINDING = "__watcherPhraseFound"
+    throttle_ms = 250
+
+    def __init__(self, target_phrase: str, exclude_selector: Optional[str] = None):
+        self.target_phrase = target_phrase
+        self.exclude_selector = exclude_selector
+        self.started_at = time.time()
+        self.found = False
+        self.snippet: Optional[str] = None
+        self.found_after: Optional[float] = None
+
+    @property
+    def decided(self) -> bool:
+        """Whether the render may stop (same interface as ``ResponseWatch``)."""
+        return self.found
+
+    def script(self) -> str:
+        config = {
+            'phrase': self.target_phrase,
+            'exclude': self.exclude_selector,
+            'binding': self.BINDING,
+            'throttleMs': self.throttle_ms,
+        }
+        return PHRASE_WATCH_JS.replace("__CONFIG__", json.dumps(config))
+
+    def _on_found(self, source, snippet: str):
+        if not self.found:
+            self.found = True
+            self.snippet = snippet
+            self.found_after = time.time() - self.started_at
+            logger.info(f"Phrase watcher matched after {self.found_after:.2f}s: ...{snippet}...")
+
+    def attach(self, page):
+        page.expose_binding(self.BINDING, self._on_found)
+        page.add_init_script(self.script())
+
+    async def attach_async(self, page):
+        await page.expose_binding(self.BINDING, self._on_found)
+        await page.add_init_script(self.script())
+
+    def metrics_step(self) -> Dict[str, Any]:
+        return {
+            'step': 'early_exit',
+            'timestamp': time.time(),
+            'duration': 0.0,
+            'found': True,
+            'found_after': round(self.found_after or 0.0, 3),
+            'snippet': self.snippet,
+        }
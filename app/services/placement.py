@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Fixed anchor for every interval job, so a watcher keeps its phase across restarts
+PHASE_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+# Multiples of the golden ratio mod 1 are spread evenly, so consecutive ids land far apart
+GOLDEN_RATIO_FRACTION = 0.6180339887498949
+DEFAULT_CHECK_SECONDS = 30.0
+
+
+def url_seed(url_key: str) -> int:
+    """Phase seed shared by every watcher of one page, so their checks coincide and share a render."""
+    return zlib.crc32(url_key.encode("utf-8"))
+
+
+def phase_offset(seed: int, interval_minutes: int) -> float:
+    """Stable offset (seconds) inside the interval window for a seed (watcher id or ``url_seed``)."""
+    fraction = (seed * GOLDEN_RATIO_FRACTION) % 1.0
+    return fraction * interval_minutes * 60
+
+
+def start_date(seed: int, interval_minutes: int) -> datetime:
+    """Interval-trigger start date that puts the job on its phase."""
+    return PHASE_EPOCH + timedelta(seconds=phase_offset(seed, interval_minutes))
+
+
+def fire_times(seed: int, interval_minutes: int, start: float, end: float) -> Iterable[float]:
+    """Planned run times (epoch seconds, without jitter) in ``[start, end)``."""
+    period = interval_minutes * 60
+    first = start_date(seed, interval_minutes).timestamp()
+    k = max(0, math.ceil((start - first) / period))
+    t = first + k * period
+    while t < end:
+        yield t
+        t += period
+
+
+def _spread(buckets: Dict[int, float], start: float, end: float):
+    """Add the seconds of ``[start, end)`` to the per-minute buckets they overlap."""
+    minute = int(start // 60)
+    while minute * 60 < end:
+        overlap = min(end, (minute + 1) * 60) - max(start, minute * 60)
+        if overlap > 0:
+            buckets[minute] = buckets.get(minute, 0.0) + overlap
+        minute += 1
+
+
+class LoadTracker:
+    """
+    Per-minute record of dispatched checks: starts, peak concurrency and busy
+    seconds (busy seconds / 60 is the average concurrency for the minute).
+    Only the last ``retention_minutes`` are kept.
+    """
+
+    def __init__(self, retention_minutes: int = 180):
+        self.retention_minutes = retention_minutes
+        self._lock = threading.Lock()
+        self._starts: "OrderedDict[int, int]" = OrderedDict()
+        self._peaks: Dict[int, int] = {}
+        self._busy: Dict[int, float] = {}
+        self._durations: List[float] = []
+
+    def _trim(self, now: float):
+        oldest = int(now // 60) - self.retention_minutes
+        while self._starts and next(iter(self._starts)) < oldest:
+            minute, _ = self._starts.popitem(last=False)
+            self._peaks.pop(minute, None)
+        for minute in [m for m in self._busy if m < oldest]:
+            del self._busy[minute]
+
+    def record_start(self, now: float, running: int):
+        minute = int(now // 60)
+        with self._lock:
+            self._starts[minute] = self._starts.get(minute, 0) + 1
+            self._peaks[minute] = max(self._peaks.get(minute, 0), running)
+            self._trim(now)
+
+    def record_finish(self, started: float, finished: float):
+        with self._lock:
+            _spread(self._busy, started, finished)
+            self._durations = (self._durations + [finished - started])[-200:]
+
+    def average_duration(self) -> float:
+        with self._lock:
+            if not self._durations:
+                return DEFAULT_CHECK_SECONDS
+            return sum(self._durations) / len(self._durations)
+
+    def actual(self, minute: int) -> Tuple[int, float, int]:
+        """Starts, average concurrency and peak concurrency for one minute."""
+        with self._lock:
+            return (
+                self._starts.get(minute, 0),
+                self._busy.get(minute, 0.0) / 60,
+                self._peaks.get(minute, 0),
+            )
+
+
+def load_report(
+    jobs: Iterable[Tuple[int, int]],
+    tracker: LoadTracker,
+    window_minutes: int = 60,
+    now: Optional[float] = None,
+) -> Dict[str, object]:
+    """
+    Expected versus actual concurrency per minute.
+
+    ``jobs`` holds the distinct (seed, interval minutes) phases; watchers sharing
+    a phase share a render, so they count once. Expected load projects every
+    planned run over the last ``window_minutes`` (compared with what the
+    dispatcher actually did) and the next ``window_minutes``, assuming each check
+    takes the recent average duration.
+    """
+    now = time.time() if now is None else now
+    duration = tracker.average_duration()
+    current = int(now // 60)
+    first, last = current - window_minutes, current + window_minutes
+    expected_starts: Dict[int, int] = {}
+    expected_busy: Dict[int, float] = {}
+    jobs = set(jobs)
+    for seed, interval in jobs:
+        for t in fire_times(seed, interval, first * 60 - duration, (last + 1) * 60):
+            if t >= first * 60:
+                minute = int(t // 60)
+                expected_starts[minute] = expected_starts.get(minute, 0) + 1
+            _spread(expected_busy, t, t + duration)
+
+    minutes = []
+    for minute in range(first, last + 1):
+        row = {
+            'minute': datetime.fromtimestamp(minute * 60, timezone.utc).strftime('%Y-%m-%dT%H:%MZ'),
+            'expected_starts': expected_starts.get(minute, 0),
+            'expected_concurrency': round(expected_busy.get(minute, 0.0) / 60, 2),
+        }
+        if minute <= current:
+            starts, concurrency, peak = tracker.actual(minute)
+            row.update(actual_starts=starts, actual_concurrency=round(concurrency, 2), actual_peak=peak)
+        minutes.append(row)
+
+    past = [row for row in minutes if 'actual_starts' in row]
+    return {
+        'jobs': len(jobs),
+        'average_check_seconds': round(duration, 1),
+        'expected_peak': max((row['expected_concurrency'] for row in minutes), default=0),
+        'actual_peak': max((row['actual_peak'] for row in past), default=0),
+        'minutes': minutes,
+    }
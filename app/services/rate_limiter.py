@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.core.stealth_config import StealthConfig
+from app.services.resource_blocker import domain_matches
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TokenBucket:
+    """``burst`` tokens, refilled at ``rate`` tokens per second."""
+    rate: float
+    burst: int
+    tokens: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self):
+        self.tokens = float(self.burst)
+
+    def try_take(self, now: float) -> float:
+        """Take a token. Returns 0 on success, else the seconds until one is available."""
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class DomainRateLimiter:
+    """
+    Token-bucket rate limits keyed by domain.
+
+    ``try_acquire`` never sleeps: it either spends a token or says how long the
+    caller should defer. Overrides match subdomains (``agoda.com`` covers
+    ``www.agoda.com``); domains without a rate are unlimited.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = 0.0,
+        burst: int = 1,
+        overrides: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(1, int(burst))
+        self.overrides = {d.lower(): dict(v or {}) for d, v in (overrides or {}).items()}
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._deferrals = 0
+        self._wait_total = 0.0
+
+    @classmethod
+    def from_config(cls, stealth: StealthConfig) -> "DomainRateLimiter":
+        rate = stealth.domain_rate_per_minute
+        if not rate and stealth.request_throttling > 0:
+            # The old fixed sleep between requests, expressed as a per-domain rate
+            rate = 60.0 / stealth.request_throttling
+        return cls(rate, stealth.domain_burst, stealth.domain_rate_overrides)
+
+    def limits(self, domain: str) -> Tuple[str, float, int]:
+        """Bucket key, rate (per minute) and burst for a domain."""
+        for key, override in self.overrides.items():
+            if domain_matches(domain, [key]):
+                return (
+                    key,
+                    float(override.get('rate_per_minute', self.rate_per_minute)),
+                    max(1, int(override.get('burst', self.burst))),
+                )
+        return domain, self.rate_per_minute, self.burst
+
+    def try_acquire(self, domain: str) -> float:
+        key, rate, burst = self.limits(domain.lower())
+        if rate <= 0:
+            return 0.0
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket.rate != rate / 60.0 or bucket.burst != burst:
+                bucket = self._buckets[key] = TokenBucket(rate=rate / 60.0, burst=burst)
+            wait = bucket.try_take(time.monotonic())
+            if wait:
+                self._deferrals += 1
+            return wait
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self._wait_total += seconds
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'deferrals': self._deferrals,
+                'rate_wait_total': round(self._wait_total, 3),
+                'limited_domains': len(self._buckets),
+            }
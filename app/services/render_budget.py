@@ -0,0 +1,75 @@
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+# Bounds for a watcher's browser render budget (seconds)
+MIN_RENDER_SECONDS = 30
+MAX_RENDER_SECONDS = 180
+SAMPLE_SIZE = 20
+# Renders needed before the learned budget replaces the maximum
+MIN_SAMPLES = 5
+# Budget = p95 render duration times this
+HEADROOM = 1.5
+
+
+@dataclass
+class RenderStats:
+    load_duration: float
+    effective_timeout: float  # the budget the render ran under
+    aborted: bool = False  # cut off as over budget
+
+
+class RenderTooHeavyError(Exception):
+    def __init__(self, duration: float):
+        self.duration = duration
+        super().__init__(f"render exceeded {duration:.2f}s")
+
+
+def load_samples(raw: Optional[str]) -> List[float]:
+    try:
+        samples = json.loads(raw) if raw else []
+    except ValueError:
+        return []
+    return [float(s) for s in samples if isinstance(s, (int, float))] if isinstance(samples, list) else []
+
+
+def percentile(samples: List[float], q: float = 0.95) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def budget_for(samples: List[float]) -> float:
+    """
+    Render budget for a watcher: ``HEADROOM`` times its p95 render duration,
+    within the bounds. Until ``MIN_SAMPLES`` renders are known it is the maximum.
+    """
+    if len(samples) < MIN_SAMPLES:
+        return float(MAX_RENDER_SECONDS)
+    return float(max(MIN_RENDER_SECONDS, min(MAX_RENDER_SECONDS, math.ceil(percentile(samples) * HEADROOM))))
+
+
+def render_stats(metrics: Dict[str, Any]) -> Optional[RenderStats]:
+    """
+    Duration and budget of the browser render behind ``metrics``. None if the
+    static tier answered, or if the render was cut short by a blocked or error page.
+    """
+    if metrics.get('tier') != 'browser' or metrics.get('render_seconds') is None or metrics.get('page_verdict'):
+        return None
+    return RenderStats(
+        load_duration=float(metrics['render_seconds']),
+        effective_timeout=float(metrics.get('render_budget') or MAX_RENDER_SECONDS),
+        aborted=metrics.get('final_status') == 'heavy',
+    )
+
+
+def observe(samples: List[float], stats: RenderStats) -> List[float]:
+    """
+    Add a render to the samples. An aborted render counts with the time it was
+    allowed, so a page that keeps running over earns a larger budget (up to the
+    maximum) instead of being cut off at the same point forever.
+    """
+    duration = max(stats.load_duration, stats.effective_timeout) if stats.aborted else stats.load_duration
+    return (samples + [round(duration, 2)])[-SAMPLE_SIZE:]
@@ -0,0 +1,269 @@
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.stealth_config import MonitoringConfig
+
+
+logger = logging.getLogger(__name__)
+
+PROC = Path("/proc")
+POLL_SECONDS = 0.5
+MB = 1024 * 1024
+
+
+class RenderKilledError(Exception):
+    """A render process went over its memory or wall-clock budget and was killed."""
+
+
+def _proc_table() -> Optional[Dict[int, Tuple[int, int]]]:
+    """pid -> (ppid, resident bytes) for every process in ``/proc``; None where it is unavailable."""
+    if not PROC.is_dir():
+        return None
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    table = {}
+    for entry in PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # Fields after the "(comm)" field: state, ppid, pgrp, ... rss is the 22nd
+            fields = (entry / "stat").read_text().rsplit(")", 1)[1].split()
+            table[int(entry.name)] = (int(fields[1]), int(fields[21]) * page_size)
+        except (OSError, ValueError, IndexError):
+            continue
+    return table
+
+
+def process_tree(pid: int, table: Optional[Dict[int, Tuple[int, int]]] = None) -> List[int]:
+    """
+    ``pid`` and all of its descendants, found by parent pid. Playwright launches
+    Chromium detached (its own process group), so the browser is only reachable
+    through the tree: render child -> node driver -> Chromium -> its helpers.
+    """
+    table = _proc_table() if table is None else table
+    if not table:
+        return [pid]
+    children: Dict[int, List[int]] = {}
+    for child, (parent, _) in table.items():
+        children.setdefault(parent, []).append(child)
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """
+    Resident bytes of a process and all of its descendants (the render child,
+    its Playwright driver and the browser). None where ``/proc`` is unavailable.
+    """
+    table = _proc_table()
+    if table is None:
+        return None
+    return sum(table[p][1] for p in process_tree(pid, table) if p in table)
+
+
+def _render_child(conn, config: MonitoringConfig, max_checks: int):
+    """Child process loop: render each request with one long-lived monitor, then exit."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    from app.services.enhanced_monitor import EnhancedMonitor
+
+    monitor = EnhancedMonitor(config)
+    try:
+        for _ in range(max_checks):
+            try:
+                kwargs = conn.recv()
+            except EOFError:
+                break
+            if kwargs is None:
+                break
+            try:
+                conn.send(("ok", monitor.monitor_url(**kwargs)))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        monitor.browser_pool.shutdown()
+        monitor.cookie_store.close()
+
+
+class _RenderProcess:
+    def __init__(self, context, config: MonitoringConfig, max_checks: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_render_child, args=(child_conn, config, max_checks), name="watcher-render", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.checks = 0
+
+    def kill(self):
+        # Snapshot the tree first: once the child dies its browser is reparented
+        for pid in process_tree(self.process.pid):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.process.join(5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(10)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class RenderProcessPool:
+    """
+    Runs ``monitor_url`` in pooled child processes instead of the calling thread.
+
+    Each child owns its monitor (and so its browser) for ``max_checks`` renders
+    and is then replaced, so leaked pages, Playwright state and browser bloat die
+    with it. While a render runs the parent watches it: past ``timeout_seconds``
+    of wall clock, or once the child and its browser together hold more than
+    ``memory_limit_mb`` resident, the child and every process under it (the
+    browser included) are killed and the check fails with ``RenderKilledError``.
+    Requests and results (found, message, metrics) travel over a pipe, and
+    renders run on as many cores as there are children.
+    """
+
+    def __init__(
+        self,
+        config: MonitoringConfig,
+        size: int,
+        max_checks: int = 50,
+        memory_limit_mb: int = 1536,
+        timeout_seconds: float = 300,
+    ):
+        self.config = config
+        self.size = max(1, size)
+        self.max_checks = max(1, max_checks)
+        self.memory_limit = memory_limit_mb * MB if memory_limit_mb > 0 else None
+        self.timeout_seconds = timeout_seconds
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._idle: List[_RenderProcess] = []
+        self._busy: set[_RenderProcess] = set()
+        self._closed = False
+        self._started = 0
+        self._recycled = 0
+        self._killed_timeout = 0
+        self._killed_memory = 0
+        self._crashed = 0
+
+    def _take(self) -> _RenderProcess:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("render pool is shut down")
+            while self._idle:
+                child = self._idle.pop()
+                if child.process.is_alive():
+                    self._busy.add(child)
+                    return child
+                child.conn.close()
+            self._started += 1
+        child = _RenderProcess(self._context, self.config, self.max_checks)
+        with self._lock:
+            self._busy.add(child)
+        return child
+
+    def _give_back(self, child: _RenderProcess, broken: bool = False):
+        with self._lock:
+            self._busy.discard(child)
+            keep = not broken and not self._closed and child.checks < self.max_checks
+        if keep and self.memory_limit is not None:
+            rss = process_tree_rss(child.process.pid)
+            keep = rss is None or rss < self.memory_limit
+        if keep:
+            with self._lock:
+                self._idle.append(child)
+            return
+        if broken:
+            child.kill()
+        else:
+            with self._lock:
+                self._recycled += 1
+            child.stop()
+
+    def _await_result(self, child: _RenderProcess) -> Tuple[str, Any]:
+        started = time.monotonic()
+        while not child.conn.poll(POLL_SECONDS):
+            elapsed = time.monotonic() - started
+            if not child.process.is_alive():
+                with self._lock:
+                    self._crashed += 1
+                raise RenderKilledError(f"render process exited with code {child.process.exitcode}")
+            if self.timeout_seconds and elapsed > self.timeout_seconds:
+                with self._lock:
+                    self._killed_timeout += 1
+                raise RenderKilledError(f"render killed after {elapsed:.0f}s (wall-clock limit {self.timeout_seconds:.0f}s)")
+            if self.memory_limit is not None:
+                rss = process_tree_rss(child.process.pid)
+                if rss is not None and rss > self.memory_limit:
+                    with self._lock:
+                        self._killed_memory += 1
+                    raise RenderKilledError(
+                        f"render killed at {rss / MB:.0f} MB resident (limit {self.memory_limit / MB:.0f} MB)"
+                    )
+        try:
+            return child.conn.recv()
+        except EOFError:
+            with self._lock:
+                self._crashed += 1
+            raise RenderKilledError(f"render process exited with code {child.process.exitcode}")
+
+    def monitor_url(self, **kwargs) -> Tuple[bool, str, Dict[str, Any]]:
+        """Same contract as ``EnhancedMonitor.monitor_url``, run in a child process."""
+        with self._slots:
+            child = self._take()
+            try:
+                child.conn.send(kwargs)
+                child.checks += 1
+                kind, payload = self._await_result(child)
+            except BaseException:
+                self._give_back(child, broken=True)
+                raise
+            self._give_back(child)
+        if kind == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'busy': len(self._busy),
+                'started': self._started,
+                'recycled': self._recycled,
+                'killed_timeout': self._killed_timeout,
+                'killed_memory': self._killed_memory,
+                'crashed': self._crashed,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            busy = list(self._busy)
+        for child in idle:
+            child.stop()
+        for child in busy:
+            child.kill()
@@ -0,0 +1,76 @@
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Dict, Any
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderProfile:
+    """
+    What a full interaction routine turned out to need for one watcher (or domain).
+
+    Learned from a complete render and replayed on later checks: the scroll loop is
+    capped just past the last productive scroll, and only the hover/click selectors
+    that actually matched are tried again.
+    """
+    key: str
+    productive_scrolls: int = 0
+    phrase_scrolls: Optional[int] = None  # scrolls done when the phrase became visible
+    phrase_seen_after: Optional[float] = None  # seconds into the render
+    phrase_seen: bool = False
+    hover_selectors: List[str] = field(default_factory=list)
+    click_selectors: List[str] = field(default_factory=list)
+    content_length: Optional[int] = None
+    replays: int = 0
+
+    def scroll_budget(self, margin: int) -> int:
+        needed = max(self.productive_scrolls, self.phrase_scrolls or 0)
+        return max(1, needed + margin)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RenderProfile":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+def last_step(metrics: Dict[str, Any], name: str) -> Optional[Dict[str, Any]]:
+    for step in reversed(metrics.get('steps', [])):
+        if step.get('step') == name:
+            return step
+    return None
+
+
+def profile_from_metrics(key: str, metrics: Dict[str, Any], found: bool) -> Optional[RenderProfile]:
+    """Build a profile from a learning render's metrics, or None if there was no render."""
+    interactions = last_step(metrics, 'smart_interactions')
+    if interactions is None:
+        return None
+    early_exit = last_step(metrics, 'early_exit')
+    extraction = last_step(metrics, 'content_extraction')
+    return RenderProfile(
+        key=key,
+        productive_scrolls=interactions.get('productive_scrolls', 0),
+        phrase_scrolls=interactions.get('scrolls') if interactions.get('stopped_on_phrase') else None,
+        phrase_seen_after=early_exit.get('found_after') if early_exit else None,
+        phrase_seen=found,
+        hover_selectors=list(interactions.get('hover_hits', [])),
+        click_selectors=list(interactions.get('click_hits', [])),
+        content_length=extraction.get('content_length') if extraction else None,
+    )
+
+
+def detect_drift(profile: RenderProfile, metrics: Dict[str, Any], found: bool, size_threshold: float) -> Optional[str]:
+    """Return why a replayed render no longer matches its profile, or None."""
+    if profile.phrase_seen and not found:
+        return "miss"
+    extraction = last_step(metrics, 'content_extraction')
+    if extraction and profile.content_length:
+        ratio = extraction.get('content_length', 0) / profile.content_length
+        if ratio < size_threshold:
+            return f"content_drop ({ratio:.2f})"
+    return None
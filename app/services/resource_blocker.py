@@ -0,0 +1,182 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Set
+from urllib.parse import urlparse
+
+from app.core.stealth_config import RenderingConfig
+
+
+logger = logging.getLogger(__name__)
+
+# Rough transfer sizes per resource type. Aborted requests never report a size,
+# so savings are estimated from these averages.
+ESTIMATED_BYTES = {
+    "image": 45_000,
+    "media": 500_000,
+    "font": 35_000,
+    "stylesheet": 25_000,
+    "script": 60_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 5_000,
+}
+
+
+def domain_matches(host: str, domains: List[str]) -> bool:
+    """True if host is one of the domains or a subdomain of one."""
+    host = host.lower()
+    for domain in domains:
+        domain = domain.lower()
+        if host == domain or host.endswith("." + domain):
+            return True
+    return False
+
+
+@dataclass
+class BlockingPolicy:
+    """Which requests a render is allowed to make."""
+    enabled: bool = True
+    resource_types: Set[str] = field(default_factory=set)
+    blocked_domains: List[str] = field(default_factory=list)
+    allowed_domains: List[str] = field(default_factory=list)
+
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """Return why a request should be blocked, or None to let it through."""
+        if not self.enabled:
+            return None
+        host = urlparse(url).hostname or ""
+        if not host:
+            return None  # data:, blob: and friends
+        if domain_matches(host, self.allowed_domains):
+            return None
+        if domain_matches(host, self.blocked_domains):
+            return "domain"
+        if resource_type in self.resource_types:
+            return "type"
+        return None
+
+
+def resolve_blocking_policy(config: RenderingConfig, url: str, watcher_id: Optional[int] = None) -> BlockingPolicy:
+    """
+    Build the policy for one check.
+
+    ``config.blocking_overrides`` is keyed by domain or ``watcher:<id>``; a watcher
+    override wins over a domain override, which wins over the global settings.
+    """
+    host = urlparse(url).hostname or ""
+    policy = BlockingPolicy(
+        enabled=config.block_resources,
+        resource_types=set(config.blocked_resource_types),
+        # Domain blocking is for third parties; never block the watched site itself
+        blocked_domains=[d for d in config.blocked_domains if not domain_matches(host, [d])],
+        allowed_domains=list(config.allowed_domains),
+    )
+    overrides = config.blocking_overrides or {}
+    matched = [
+        override for key, override in overrides.items()
+        if not key.startswith("watcher:") and domain_matches(host, [key])
+    ]
+    if watcher_id is not None and f"watcher:{watcher_id}" in overrides:
+        matched.append(overrides[f"watcher:{watcher_id}"])
+
+    for override in matched:
+        policy.enabled = override.get('enabled', policy.enabled)
+        if 'resource_types' in override:
+            policy.resource_types = set(override['resource_types'])
+        if 'blocked_domains' in override:
+            policy.blocked_domains = list(override['blocked_domains'])
+        if 'allowed_domains' in override:
+            policy.allowed_domains = list(override['allowed_domains'])
+    return policy
+
+
+class ResourceBlocker:
+    """
+    Route handler that aborts unwanted requests for one browser context and keeps
+    per-check counters for the ``resource_blocking`` metrics step.
+    """
+
+    def __init__(self, policy: BlockingPolicy):
+        self.policy = policy
+        self.requests_allowed = 0
+        self.requests_blocked = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.bytes_blocked_est = 0
+        self.bytes_loaded = 0
+
+    def _decide(self, request) -> bool:
+        resource_type = request.resource_type
+        reason = self.policy.block_reason(resource_type, request.url)
+        if reason is None:
+            self.requests_allowed += 1
+            return False
+        self.requests_blocked += 1
+        key = f"{resource_type}" if reason == "type" else f"{resource_type} (domain)"
+        self.blocked_by_type[key] = self.blocked_by_type.get(key, 0) + 1
+        self.bytes_blocked_est += ESTIMATED_BYTES.get(resource_type, ESTIMATED_BYTES["other"])
+        return True
+
+    def _record_response(self, response):
+        try:
+            self.bytes_loaded += int(response.headers.get("content-length") or 0)
+        except (TypeError, ValueError):
+            pass
+
+    def handle(self, route):
+        if self._decide(route.request):
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    async def handle_async(self, route):
+        if self._decide(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def attach(self, context):
+        """Install the blocker on a sync ``BrowserContext``."""
+        if not self.policy.enabled:
+            return
+        context.route("**/*", self.handle)
+        context.on("response", self._record_response)
+
+    async def attach_async(self, context):
+        """Install the blocker on an async ``BrowserContext``."""
+        if not self.policy.enabled:
+            return
+        await context.route("**/*", self.handle_async)
+        context.on("response", self._record_response)
+
+    def detach(self, context):
+        """Remove the blocker from a sync context that outlives this check."""
+        if not self.policy.enabled:
+            return
+        try:
+            context.unroute("**/*", self.handle)
+            context.remove_listener("response", self._record_response)
+        except Exception as e:
+            logger.debug(f"Error detaching resource blocker: {e}")
+
+    async def detach_async(self, context):
+        if not self.policy.enabled:
+            return
+        try:
+            await context.unroute("**/*", self.handle_async)
+            context.remove_listener("response", self._record_response)
+        except Exception as e:
+            logger.debug(f"Error detaching resource blocker: {e}")
+
+    def metrics_step(self) -> Dict[str, Any]:
+        return {
+            'step': 'resource_blocking',
+            'timestamp': time.time(),
+            'duration': 0.0,
+            'enabled': self.policy.enabled,
+            'requests_allowed': self.requests_allowed,
+            'requests_blocked': self.requests_blocked,
+            'blocked_by_type': dict(self.blocked_by_type),
+            'bytes_blocked_est': self.bytes_blocked_est,
+            'bytes_loaded': self.bytes_loaded,
+        }
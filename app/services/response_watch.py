@@ -0,0 +1,169 @@
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from app.core.stealth_config import RenderingConfig
+from app.services import json_path
+from app.services.resource_blocker import domain_matches
+
+
+logger = logging.getLogger(__name__)
+
+# Larger payloads are not parsed (listing dumps, bundles served as JSON)
+MAX_RESPONSE_BYTES = 5_000_000
+
+
+@dataclass
+class ResponseRule:
+    """Which API responses answer a check, and how."""
+    url_pattern: re.Pattern
+    json_path: str = "$"
+    exclude_phrases: List[str] = field(default_factory=list)  # nodes mentioning these never match (e.g. "sold out")
+    miss_is_final: bool = False  # a matching response without a hit ends the check as not found
+
+    @classmethod
+    def from_config(cls, raw: Dict[str, Any]) -> "ResponseRule":
+        json_path.parse(raw.get('json_path', '$'))  # fail on load, not on every response
+        return cls(
+            url_pattern=re.compile(raw['url_pattern'], re.I),
+            json_path=raw.get('json_path', '$'),
+            exclude_phrases=[p.lower() for p in raw.get('exclude_phrases', [])],
+            miss_is_final=bool(raw.get('miss_is_final', False)),
+        )
+
+
+def resolve_response_rules(config: RenderingConfig, url: str, watcher_id: Optional[int] = None) -> List[ResponseRule]:
+    """
+    Rules for one check. ``config.response_rules`` is keyed by domain or
+    ``watcher:<id>``; a watcher's rules replace its domain's.
+    """
+    rules = config.response_rules or {}
+    raw = None
+    if watcher_id is not None and f"watcher:{watcher_id}" in rules:
+        raw = rules[f"watcher:{watcher_id}"]
+    else:
+        host = urlparse(url).hostname or ""
+        raw = next(
+            (value for key, value in rules.items() if not key.startswith("watcher:") and domain_matches(host, [key])),
+            None,
+        )
+    parsed = []
+    for entry in raw or []:
+        try:
+            parsed.append(ResponseRule.from_config(entry))
+        except (KeyError, re.error, json_path.JsonPathError) as e:
+            logger.warning(f"Ignoring invalid response rule {entry!r}: {e}")
+    return parsed
+
+
+def phrase_hit(node: Any, keywords: List[str], exclude_phrases: List[str]) -> bool:
+    """Every keyword of the phrase in the node's values, and none of the exclusions (Agoda-style room match)."""
+    text = json_path.scalar_text(node)
+    return all(k in text for k in keywords) and not any(p in text for p in exclude_phrases)
+
+
+class ResponseWatch:
+    """
+    Network-tier watcher for one render.
+
+    Subscribes to the page's responses; JSON payloads from URLs that match a
+    rule are searched for the target phrase (every keyword within one node the
+    rule's ``json_path`` selects) as they arrive, so availability served over
+    XHR answers the check before the UI has rendered or been scrolled.
+    """
+
+    def __init__(self, target_phrase: str, rules: List[ResponseRule]):
+        self.keywords = [k for k in target_phrase.lower().split() if k]
+        self.rules = rules
+        self.started_at = time.time()
+        self.verdict: Optional[str] = None  # 'found' or 'not_found'
+        self.decided_after: Optional[float] = None
+        self.source_url: Optional[str] = None
+        self.snippet: Optional[str] = None
+        self.responses_matched = 0
+
+    @property
+    def decided(self) -> bool:
+        return self.verdict is not None
+
+    @property
+    def found(self) -> bool:
+        return self.verdict == 'found'
+
+    def _rule_for(self, response) -> Optional[ResponseRule]:
+        if self.decided or response.request.resource_type not in ("xhr", "fetch"):
+            return None
+        for rule in self.rules:
+            if rule.url_pattern.search(response.url):
+                return rule
+        return None
+
+    @staticmethod
+    def _too_large(response) -> bool:
+        try:
+            return int(response.headers.get('content-length') or 0) > MAX_RESPONSE_BYTES
+        except ValueError:
+            return False
+
+    def evaluate(self, rule: ResponseRule, url: str, payload: Any):
+        """Apply ``rule`` to a parsed payload and record the verdict it reaches, if any."""
+        if self.decided:
+            return
+        self.responses_matched += 1
+        for node in json_path.select(payload, rule.json_path):
+            if phrase_hit(node, self.keywords, rule.exclude_phrases):
+                self._decide('found', url, json.dumps(node, default=str)[:200])
+                return
+        if rule.miss_is_final:
+            self._decide('not_found', url, None)
+
+    def _decide(self, verdict: str, url: str, snippet: Optional[str]):
+        self.verdict = verdict
+        self.source_url = url
+        self.snippet = snippet
+        self.decided_after = time.time() - self.started_at
+        logger.info(f"Response watcher: phrase {verdict} in {url} after {self.decided_after:.2f}s")
+
+    def _on_response(self, response):
+        rule = self._rule_for(response)
+        if rule is None or self._too_large(response):
+            return
+        try:
+            payload = response.json()
+        except Exception as e:
+            logger.debug(f"Skipping non-JSON response {response.url}: {e}")
+            return
+        self.evaluate(rule, response.url, payload)
+
+    async def _on_response_async(self, response):
+        rule = self._rule_for(response)
+        if rule is None or self._too_large(response):
+            return
+        try:
+            payload = await response.json()
+        except Exception as e:
+            logger.debug(f"Skipping non-JSON response {response.url}: {e}")
+            return
+        self.evaluate(rule, response.url, payload)
+
+    def attach(self, page):
+        page.on("response", self._on_response)
+
+    def attach_async(self, page):
+        page.on("response", self._on_response_async)
+
+    def metrics_step(self) -> Dict[str, Any]:
+        return {
+            'step': 'response_match',
+            'timestamp': time.time(),
+            'duration': 0.0,
+            'found': self.found,
+            'decided_after': round(self.decided_after or 0.0, 3),
+            'source_url': self.source_url,
+            'responses_matched': self.responses_matched,
+            'snippet': self.snippet,
+        }
@@ -0,0 +1,59 @@
+from typing import Any, Dict, Optional
+
+from app.core.stealth_config import ResilienceConfig, RetryStrategy
+
+
+# Never re-run sooner than this, so the retry cannot race the check that scheduled it
+MIN_RETRY_DELAY_SECONDS = 1.0
+
+
+def strategy(resilience: ResilienceConfig) -> RetryStrategy:
+    value = resilience.retry_strategy
+    return value if isinstance(value, RetryStrategy) else RetryStrategy(value)
+
+
+def retry_delay(resilience: ResilienceConfig, attempt: int) -> float:
+    """
+    Seconds to wait before re-running a check whose ``attempt``-th try needs a
+    retry: ``backoff_base * 2^(attempt-1)`` for exponential backoff, ``backoff_base
+    * attempt`` for linear and size-based, capped at ``backoff_max``.
+    """
+    kind = strategy(resilience)
+    if kind == RetryStrategy.EXPONENTIAL_BACKOFF:
+        delay = resilience.backoff_base * (2 ** (attempt - 1))
+    elif kind in (RetryStrategy.LINEAR, RetryStrategy.SIZE_BASED):
+        delay = resilience.backoff_base * attempt
+    else:
+        delay = 0.0
+    return max(MIN_RETRY_DELAY_SECONDS, min(delay, resilience.backoff_max))
+
+
+def should_retry(
+    resilience: ResilienceConfig,
+    status: str,
+    content_length: Optional[int] = None,
+    previous_length: Optional[int] = None,
+) -> bool:
+    """
+    Whether a check outcome deserves another attempt. Failed renders are retried
+    by every strategy but ``none``; size-based retries also re-run a "not found"
+    whose page text shrank below ``size_threshold_percentage`` of the previous
+    check's (a truncated render rather than a real miss). Heavy renders are not
+    retried: they already used their whole budget.
+    """
+    kind = strategy(resilience)
+    if kind == RetryStrategy.NONE:
+        return False
+    if status == "error":
+        return True
+    if kind == RetryStrategy.SIZE_BASED and status == "not_found" and content_length is not None and previous_length:
+        return content_length / previous_length < resilience.size_threshold_percentage
+    return False
+
+
+def content_length(metrics: Dict[str, Any]) -> Optional[int]:
+    """Length of the page text the verdict was based on, if the check got that far."""
+    for step in reversed(metrics.get('steps', [])):
+        if step.get('content_length') is not None:
+            return int(step['content_length'])
+    return None
@@ -0,0 +1,265 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional
+
+from app.core.stealth_config import RenderingConfig
+
+
+logger = logging.getLogger(__name__)
+
+# Resolves as soon as document height changes. DOM mutations keep the wait alive
+# (content is arriving); a page with no mutations for quietMs is considered idle.
+# Also resolves early once the phrase watcher has flagged a match.
+WAIT_FOR_GROWTH_JS = """
+    ([prevHeight, timeoutMs, quietMs]) => new Promise(resolve => {
+        const root = document.body || document.documentElement;
+        const start = performance.now();
+        let lastMutation = start;
+        let mutations = 0;
+        const observer = new MutationObserver(records => {
+            mutations += records.length;
+            lastMutation = performance.now();
+        });
+        observer.observe(root, {childList: true, subtree: true, attributes: false, characterData: true});
+        const finish = (grew) => {
+            observer.disconnect();
+            resolve({
+                height: root.scrollHeight,
+                grew: grew,
+                mutations: mutations,
+                waited: performance.now() - start,
+                phrase_hit: !!window.__watcherPhraseHit
+            });
+        };
+        const tick = () => {
+            const now = performance.now();
+            if (window.__watcherPhraseHit) return finish(root.scrollHeight !== prevHeight);
+            if (root.scrollHeight !== prevHeight) return finish(true);
+            if (now - start >= timeoutMs) return finish(false);
+            if (now - lastMutation >= quietMs) return finish(false);
+            setTimeout(tick, 50);
+        };
+        tick();
+    })
+"""
+
+SCROLL_HEIGHT_JS = "(document.body || document.documentElement).scrollHeight"
+
+# What the old fixed-sleep routine spent: 3s per End press, plus 3x500ms
+# PageUp shakes for each of the 3 stable checks it needed before stopping.
+LEGACY_SECONDS_PER_SCROLL = 3.0
+LEGACY_SECONDS_PER_SHAKE = 1.5
+LEGACY_STABLE_CHECKS = 3
+
+
+@dataclass
+class ScrollStats:
+    scrolls: int = 0
+    productive_scrolls: int = 0
+    shakes: int = 0
+    stopped_on_stable: bool = False
+    stopped_on_phrase: bool = False
+    waited_seconds: float = 0.0
+    elapsed: float = 0.0
+
+    def legacy_estimate(self) -> float:
+        """Seconds the fixed-sleep routine would have needed for the same page."""
+        estimate = self.productive_scrolls * LEGACY_SECONDS_PER_SCROLL
+        if self.stopped_on_stable:
+            estimate += LEGACY_STABLE_CHECKS * (LEGACY_SECONDS_PER_SCROLL + LEGACY_SECONDS_PER_SHAKE)
+        return estimate
+
+    def as_metrics(self) -> Dict[str, Any]:
+        return {
+            'scrolls': self.scrolls,
+            'productive_scrolls': self.productive_scrolls,
+            'shakes': self.shakes,
+            'stopped_on_stable': self.stopped_on_stable,
+            'stopped_on_phrase': self.stopped_on_phrase,
+            'scroll_time': round(self.elapsed, 3),
+            'time_saved_est': round(max(0.0, self.legacy_estimate() - self.elapsed), 3),
+        }
+
+
+class ScrollEngine:
+    """
+    Adaptive lazy-load scrolling.
+
+    Each End press waits only until the page grows, goes quiet, or the per-scroll
+    timeout passes, instead of sleeping a fixed 3s. ``scroll_delay_range`` is read as
+    (quiet window, max wait) per scroll, and ``max_scrolls`` bounds the loop.
+    ``should_stop`` lets the caller end the loop early, e.g. once the phrase is found;
+    ``max_scrolls`` can be lowered per render when a learned profile says so.
+    ``clip_ms`` caps every wait (milliseconds) at what the caller's render budget
+    has left, and ``checkpoint`` runs before each scroll so an exhausted budget
+    aborts the loop (by raising) instead of overrunning it by whole scrolls.
+    """
+
+    required_stable_checks = 2
+    network_grace_seconds = 0.5
+
+    def __init__(
+        self,
+        rendering: RenderingConfig,
+        max_scrolls: Optional[int] = None,
+        clip_ms: Optional[Callable[[int], int]] = None,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ):
+        self.max_scrolls = max(1, int(max_scrolls if max_scrolls is not None else rendering.max_scrolls))
+        quiet, timeout = rendering.scroll_delay_range
+        self.quiet_ms = int(float(quiet) * 1000)
+        self.timeout_ms = int(max(float(quiet), float(timeout)) * 1000)
+        self.clip_ms = clip_ms
+        self.checkpoint = checkpoint
+        self.inflight = 0
+
+    def _wait_args(self, prev_height: int, timeout_ms: int, quiet_ms: int) -> list:
+        if self.clip_ms is not None:
+            timeout_ms, quiet_ms = self.clip_ms(timeout_ms), self.clip_ms(quiet_ms)
+        return [prev_height, timeout_ms, quiet_ms]
+
+    def _on_request(self, request):
+        self.inflight += 1
+
+    def _on_request_done(self, request):
+        self.inflight = max(0, self.inflight - 1)
+
+    def _track_network(self, page):
+        self.inflight = 0
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+
+    def _untrack_network(self, page):
+        for event, handler in (
+            ("request", self._on_request),
+            ("requestfinished", self._on_request_done),
+            ("requestfailed", self._on_request_done),
+        ):
+            try:
+                page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    def _record(self, stats: ScrollStats, result: Dict[str, Any], last_height: int) -> bool:
+        """Account for one growth wait; return True if the page is stable for good."""
+        stats.waited_seconds += result['waited'] / 1000
+        if result['grew']:
+            stats.productive_scrolls += 1
+            logger.info(
+                f"Smart Interactions: scroll {stats.scrolls}/{self.max_scrolls}, "
+                f"height increased {last_height}->{result['height']}"
+            )
+            return False
+        return True
+
+    @staticmethod
+    def _should_stop(stats: ScrollStats, result: Dict[str, Any], should_stop: Optional[Callable[[], bool]]) -> bool:
+        if result.get('phrase_hit') or (should_stop is not None and should_stop()):
+            stats.stopped_on_phrase = True
+            logger.info("Smart Interactions: target phrase visible. Stopping scroll.")
+            return True
+        return False
+
+    def wait_for_growth(self, page, prev_height: int, timeout_ms: int = None) -> Dict[str, Any]:
+        result = page.evaluate(
+            WAIT_FOR_GROWTH_JS, self._wait_args(prev_height, timeout_ms or self.timeout_ms, self.quiet_ms)
+        )
+        # Requests still in flight usually mean content is about to land
+        if not result['grew'] and not result['phrase_hit'] and self.inflight > 0:
+            result = page.evaluate(
+                WAIT_FOR_GROWTH_JS,
+                self._wait_args(
+                    prev_height, int(self.network_grace_seconds * 1000), int(self.network_grace_seconds * 1000)
+                )
+            )
+        return result
+
+    async def wait_for_growth_async(self, page, prev_height: int, timeout_ms: int = None) -> Dict[str, Any]:
+        result = await page.evaluate(
+            WAIT_FOR_GROWTH_JS, self._wait_args(prev_height, timeout_ms or self.timeout_ms, self.quiet_ms)
+        )
+        if not result['grew'] and not result['phrase_hit'] and self.inflight > 0:
+            result = await page.evaluate(
+                WAIT_FOR_GROWTH_JS,
+                self._wait_args(
+                    prev_height, int(self.network_grace_seconds * 1000), int(self.network_grace_seconds * 1000)
+                )
+            )
+        return result
+
+    def scroll(self, page, should_stop: Optional[Callable[[], bool]] = None) -> ScrollStats:
+        """Keyboard-scroll to the bottom until the page stops growing."""
+        stats = ScrollStats()
+        started = time.time()
+        self._track_network(page)
+        try:
+            last_height = page.evaluate(SCROLL_HEIGHT_JS)
+            logger.info(f"Smart Interactions: initial height {last_height}, starting keyboard scroll...")
+            stable = 0
+            while stats.scrolls < self.max_scrolls:
+                if should_stop is not None and should_stop():
+                    stats.stopped_on_phrase = True
+                    break
+                if self.checkpoint is not None:
+                    self.checkpoint()
+                stats.scrolls += 1
+                page.keyboard.press("End")
+                result = self.wait_for_growth(page, last_height)
+                if self._should_stop(stats, result, should_stop):
+                    break
+                if not self._record(stats, result, last_height):
+                    stable = 0
+                    last_height = result['height']
+                    continue
+                stable += 1
+                if stable >= self.required_stable_checks:
+                    stats.stopped_on_stable = True
+                    logger.info("Smart Interactions: page fully loaded (stable height). Stopping scroll.")
+                    break
+                # Back up a bit to re-trigger intersection observers, then re-approach
+                stats.shakes += 1
+                for _ in range(3):
+                    page.keyboard.press("PageUp")
+        finally:
+            self._untrack_network(page)
+            stats.elapsed = time.time() - started
+        return stats
+
+    async def scroll_async(self, page, should_stop: Optional[Callable[[], bool]] = None) -> ScrollStats:
+        """Async mirror of ``scroll``."""
+        stats = ScrollStats()
+        started = time.time()
+        self._track_network(page)
+        try:
+            last_height = await page.evaluate(SCROLL_HEIGHT_JS)
+            logger.info(f"Smart Interactions: initial height {last_height}, starting keyboard scroll...")
+            stable = 0
+            while stats.scrolls < self.max_scrolls:
+                if should_stop is not None and should_stop():
+                    stats.stopped_on_phrase = True
+                    break
+                if self.checkpoint is not None:
+                    self.checkpoint()
+                stats.scrolls += 1
+                await page.keyboard.press("End")
+                result = await self.wait_for_growth_async(page, last_height)
+                if self._should_stop(stats, result, should_stop):
+                    break
+                if not self._record(stats, result, last_height):
+                    stable = 0
+                    last_height = result['height']
+                    continue
+                stable += 1
+                if stable >= self.required_stable_checks:
+                    stats.stopped_on_stable = True
+                    logger.info("Smart Interactions: page fully loaded (stable height). Stopping scroll.")
+                    break
+                stats.shakes += 1
+                for _ in range(3):
+                    await page.keyboard.press("PageUp")
+        finally:
+            self._untrack_network(page)
+            stats.elapsed = time.time() - started
+        return stats
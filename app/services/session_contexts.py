@@ -0,0 +1,118 @@
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple
+
+from app.core.stealth_config import SessionConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmContext:
+    """A BrowserContext kept open between checks of one domain (one monitoring session)."""
+    domain: str
+    session_id: str
+    context: Any
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    uses: int = 0
+    in_use: bool = False
+
+    def expired(self, ttl_seconds: int) -> bool:
+        return time.time() - self.created_at >= ttl_seconds
+
+
+class SessionContexts:
+    """
+    Session affinity for pooled browsers.
+
+    Each pooled browser keeps at most one warm context per domain in
+    ``PooledBrowser.contexts``, so repeat checks reuse the in-memory HTTP cache,
+    cookies and localStorage of the previous render. Contexts are retired after
+    ``session_ttl_seconds``, the least recently used ones are closed beyond
+    ``max_warm_contexts_per_browser``, and no domain holds more than
+    ``max_sessions_per_domain`` warm contexts across the pool.
+
+    This class only does the bookkeeping; callers open and close the contexts
+    (sync or async) and persist their storage state.
+    """
+
+    def __init__(self, config: SessionConfig):
+        self.config = config
+        self._lock = threading.Lock()
+        self._holders: Dict[str, "weakref.WeakSet"] = {}
+        self._reused = 0
+        self._created = 0
+
+    def _live_holders(self, domain: str) -> int:
+        holders = self._holders.get(domain)
+        if not holders:
+            return 0
+        return sum(1 for pooled in holders if not pooled.closed and domain in pooled.contexts)
+
+    def checkout(self, pooled, domain: str) -> Tuple[Optional[WarmContext], str, List[WarmContext]]:
+        """
+        Lease the warm context for ``domain`` in this browser.
+
+        Returns:
+            Tuple of (warm context or None, reason when None, contexts the caller must close)
+        """
+        if not self.config.reuse_contexts:
+            return None, "disabled", []
+        if pooled.ephemeral:
+            return None, "ephemeral", []
+
+        stale: List[WarmContext] = []
+        for key, warm in list(pooled.contexts.items()):
+            if not warm.in_use and warm.expired(self.config.session_ttl_seconds):
+                stale.append(pooled.contexts.pop(key))
+
+        warm = pooled.contexts.get(domain)
+        if warm is not None:
+            if warm.in_use:
+                return None, "busy", stale
+            warm.in_use = True
+            warm.last_used = time.time()
+            with self._lock:
+                self._reused += 1
+            return warm, "", stale
+
+        reason = "expired" if any(w.domain == domain for w in stale) else "cold"
+        with self._lock:
+            if self._live_holders(domain) >= self.config.max_sessions_per_domain:
+                return None, "domain_cap", stale
+
+        # Make room for the context the caller is about to register
+        idle = sorted((w for w in pooled.contexts.values() if not w.in_use), key=lambda w: w.last_used)
+        while idle and len(pooled.contexts) >= self.config.max_warm_contexts_per_browser:
+            stale.append(pooled.contexts.pop(idle.pop(0).domain))
+        if len(pooled.contexts) >= self.config.max_warm_contexts_per_browser:
+            return None, "browser_cap", stale
+        return None, reason, stale
+
+    def register(self, pooled, domain: str, session_id: str, context) -> WarmContext:
+        """Keep a freshly created context warm in this browser, leased to the caller."""
+        warm = WarmContext(domain=domain, session_id=session_id, context=context, in_use=True)
+        pooled.contexts[domain] = warm
+        with self._lock:
+            self._holders.setdefault(domain, weakref.WeakSet()).add(pooled)
+            self._created += 1
+        return warm
+
+    def checkin(self, warm: WarmContext):
+        warm.uses += 1
+        warm.last_used = time.time()
+        warm.in_use = False
+
+    def discard(self, pooled, warm: WarmContext):
+        """Forget a context that failed mid-check; the caller closes it."""
+        if pooled.contexts.get(warm.domain) is warm:
+            pooled.contexts.pop(warm.domain)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'reused': self._reused, 'created': self._created}
@@ -0,0 +1,176 @@
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Optional, Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode "br" responses)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+# Elements whose text never reaches the rendered page
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+# Elements without an end tag (never open a hidden subtree)
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Inline styles that hide an element and its subtree
+HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+# Markers of pages that only produce content after JavaScript runs
+JS_REQUIRED_PATTERNS = [
+    re.compile(r"<noscript[^>]*>[^<]*(enable|requires?)\s+javascript", re.I),
+    re.compile(r"<div[^>]+id=[\"'](root|app|__next|__nuxt)[\"'][^>]*>\s*</div>", re.I),
+    re.compile(r"<app-root[^>]*>\s*</app-root>", re.I),
+]
+MIN_STATIC_TEXT_LENGTH = 200
+
+
+def _is_hidden(attrs: List[tuple]) -> bool:
+    """``hidden``, ``aria-hidden="true"`` or an inline ``display:none`` / ``visibility:hidden``."""
+    for name, value in attrs:
+        if name == "hidden":
+            return True
+        if name == "aria-hidden" and (value or "").strip().lower() == "true":
+            return True
+        if name == "style" and value and HIDDEN_STYLE.search(value):
+            return True
+    return False
+
+
+class _TextExtractor(HTMLParser):
+    """
+    Collects visible-ish text from HTML, skipping scripts, styles, templates and
+    subtrees hidden by markup (collapsed panels, i18n blocks). A hidden subtree
+    ends at the matching end tag of the element that opened it.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+        self._hidden_tag: Optional[str] = None
+        self._hidden_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        if tag in VOID_TAGS:
+            return
+        if self._hidden_tag is None:
+            if _is_hidden(attrs):
+                self._hidden_tag, self._hidden_depth = tag, 1
+        elif tag == self._hidden_tag:
+            self._hidden_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth > 0:
+            self._skip_depth -= 1
+        if tag == self._hidden_tag:
+            self._hidden_depth -= 1
+            if self._hidden_depth == 0:
+                self._hidden_tag = None
+
+    def handle_data(self, data):
+        if self._skip_depth == 0 and self._hidden_tag is None and data.strip():
+            self.parts.append(data.strip())
+
+
+def extract_text(html: str) -> str:
+    """Extract page text from raw HTML without a browser."""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        logger.debug(f"HTML parse error during text extraction: {e}")
+    return " ".join(parser.parts)
+
+
+def detect_js_dependency(html: str, text: str) -> Optional[str]:
+    """Return why a page looks JavaScript-dependent, or None if static HTML is usable."""
+    if len(text) < MIN_STATIC_TEXT_LENGTH:
+        return "tiny_text"
+    for pattern in JS_REQUIRED_PATTERNS:
+        if pattern.search(html):
+            return "js_marker"
+    return None
+
+
+@dataclass
+class StaticResult:
+    """Outcome of a plain HTTP fetch."""
+    status_code: int
+    html_length: int
+    text: str
+    js_reason: Optional[str]
+    duration: float
+
+
+@dataclass
+class JsonResult:
+    """Outcome of a JSON API fetch; ``payload`` is None when the body is not JSON."""
+    status_code: int
+    body: str
+    payload: Any
+    duration: float
+
+
+class StaticFetcher:
+    """
+    Pooled HTTP client for the static tier.
+
+    One ``requests.Session`` is shared across checks so keep-alive connections to
+    watched hosts are reused; urllib3's connection pool is thread-safe.
+    """
+
+    def __init__(self, pool_maxsize: int = 20):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, url: str, headers: Dict[str, str], timeout: float) -> StaticResult:
+        start = time.time()
+        if not BROTLI_AVAILABLE:
+            headers = {**headers, "Accept-Encoding": "gzip, deflate"}
+        response = self.session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        html = response.text
+        text = extract_text(html)
+        return StaticResult(
+            status_code=response.status_code,
+            html_length=len(html),
+            text=text,
+            js_reason=detect_js_dependency(html, text),
+            duration=time.time() - start,
+        )
+
+    def fetch_json(self, url: str, headers: Dict[str, str], timeout: float) -> JsonResult:
+        start = time.time()
+        headers = {**headers, "Accept": "application/json, text/plain, */*"}
+        headers.pop("Upgrade-Insecure-Requests", None)
+        if not BROTLI_AVAILABLE:
+            headers["Accept-Encoding"] = "gzip, deflate"
+        response = self.session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+        body = response.text
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        return JsonResult(
+            status_code=response.status_code,
+            body=body,
+            payload=payload,
+            duration=time.time() - start,
+        )
+
+    def close(self):
+        self.session.close()
@@ -1,40 +1,34 @@
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from time import perf_counter
 from typing import Optional
-from uuid import uuid4
 import logging
 from zoneinfo import ZoneInfo
 import requests
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy import select
 from sqlalchemy.orm.exc import StaleDataError
 from app.db.database import SessionLocal
-from app.db.models import Watcher, CheckLog, StatusEnum
+from app.db.models import Watcher, CheckLog, StatusEnum, WatcherKind
 from app.services.emailer import send_email
 from app.core.config import get_settings
 from app.services.enhanced_monitor import EnhancedMonitor
-from app.core.stealth_config import MonitoringConfig, load_config_from_file
+from app.services.async_monitor import AsyncEnhancedMonitor
+from app.services import adaptive_interval, placement, render_budget, retry_policy
+from app.services.dispatcher import CheckDispatcher, DispatchItem, normalize_url
+from app.services.job_queue import JobQueue
+from app.services.render_pool import RenderProcessPool
+from app.services.rate_limiter import DomainRateLimiter
+from app.core.stealth_config import MonitoringConfig, RetryStrategy, load_config_from_file
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-MIN_RENDER_SECONDS = 30
-MAX_RENDER_SECONDS = 180
-
-
-@dataclass
-class RenderStats:
-    load_duration: float
-    effective_timeout: float
-
-
-class RenderTooHeavyError(Exception):
-    def __init__(self, duration: float):
-        self.duration = duration
-        super().__init__(f"render exceeded {duration:.2f}s")
-
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept-Language": "en-US,en;q=0.9",
@@ -60,11 +54,14 @@ def _format_checked_times(checked_at: datetime) -> tuple[str, str]:
 
 class WatcherScheduler:
     def __init__(self):
-        self.scheduler = BackgroundScheduler(timezone=settings.timezone)
+        self.scheduler = self._create_scheduler()
         self.render_timeouts: dict[int, float] = {}
         self.manual_checks_in_progress: set[int] = set()
+        self._watcher_domains: dict[int, str] = {}
+        self._watcher_urls: dict[int, str] = {}
+        self._watcher_phases: dict[int, tuple[int, int]] = {}
         
-        # Initialize EnhancedMonitor with settings
+        # EnhancedMonitor config with settings
         config = None
         config_path = Path("app/core/monitoring_config.yaml")
         if config_path.exists():
@@ -73,27 +70,130 @@ class WatcherScheduler:
                 logger.info(f"Loaded EnhancedMonitor config from {config_path}")
             except Exception as e:
                 logger.error(f"Failed to load config from {config_path}: {e}")
-
-        self.monitor = EnhancedMonitor(config)
+        self.config = config or MonitoringConfig()
         # Override with critical environment settings
-        self.monitor.config.rendering.max_timeout = float(settings.render_timeout)
-        self.monitor.config.debug_mode = settings.debug_dump_artifacts
-        self.monitor.config.artifact_dir = settings.debug_artifacts_dir
-        self.monitor.config.resilience.max_retries = settings.monitoring.max_retries
+        self.config.rendering.max_timeout = float(settings.render_timeout)
+        self.config.debug_mode = settings.debug_dump_artifacts
+        self.config.artifact_dir = settings.debug_artifacts_dir
+        # Failed checks are retried as delayed checks (retry_policy), so each render is a single attempt
+        self.max_retries = max(0, settings.monitoring.max_retries)
+        self.config.resilience.max_retries = 0
+
+        # Monitor, render pool and render threads are built by start_runner(), so a
+        # web process that only queues checks for workers (JOB_QUEUE) never starts them
+        self.monitor: Optional[EnhancedMonitor] = None
+        self.render_pool: Optional[RenderProcessPool] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.dispatcher = CheckDispatcher(
+            self._launch,
+            max_concurrent=self._max_concurrent_checks(),
+            domain_limit=settings.domain_concurrency,
+            domain_limits=settings.domain_concurrency_limits,
+            rate_limiter=DomainRateLimiter.from_config(self.config.stealth),
+            coalesce=settings.coalesce_renders,
+            priority_slots=settings.priority_slots,
+        )
+        self.job_queue = JobQueue(
+            lease_seconds=settings.job_lease_seconds,
+            max_attempts=settings.job_max_attempts,
+        )
+
+    def _create_scheduler(self):
+        return BackgroundScheduler(timezone=settings.timezone)
+
+    def _create_executor(self) -> Optional[ThreadPoolExecutor]:
+        return ThreadPoolExecutor(
+            max_workers=max(1, settings.scheduler_workers) + max(0, settings.priority_slots),
+            thread_name_prefix="watcher-render",
+        )
+
+    def _max_concurrent_checks(self) -> int:
+        return settings.scheduler_workers
+
+    def _launch(self, item: DispatchItem, done):
+        """Start a dispatched check on the render thread pool."""
+        future = self._executor.submit(self.run_check, item.watcher_id, item.force, item)
+        future.add_done_callback(lambda _: done())
+
+    def _create_monitor(self, config: Optional[MonitoringConfig]) -> EnhancedMonitor:
+        return EnhancedMonitor(config)
+
+    def _create_render_pool(self) -> Optional[RenderProcessPool]:
+        if settings.render_isolation != "process":
+            return None
+        return RenderProcessPool(
+            self.config,
+            size=settings.scheduler_workers + max(0, settings.priority_slots),
+            max_checks=settings.render_process_max_checks,
+            memory_limit_mb=settings.render_process_memory_mb,
+            timeout_seconds=settings.render_process_timeout_seconds,
+        )
+
+    @property
+    def _check_job(self):
+        """Callable that APScheduler runs for each check; it only queues the check."""
+        return self.enqueue_check
+
+    def start_runner(self):
+        """Start what running checks needs, without scheduling any (worker processes)."""
+        if self.monitor is not None:
+            return
+        self.monitor = self._create_monitor(self.config)
+        self.render_pool = self._create_render_pool()
+        self._executor = self._create_executor()
 
     def start(self):
+        if not settings.job_queue:
+            self.start_runner()  # with JOB_QUEUE this process only schedules; workers run the checks
         if not self.scheduler.running:
             self.scheduler.start()
 
     def shutdown(self):
+        self.dispatcher.shutdown()
         if self.scheduler.running:
             self.scheduler.shutdown()
+        if self.monitor is None:
+            return
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.render_pool is not None:
+            self.render_pool.shutdown()
+        self.monitor.browser_pool.shutdown()
+        self.monitor.cookie_store.close()
 
     def load_and_schedule(self):
         with SessionLocal() as db:
             watchers = db.execute(select(Watcher).where(Watcher.enabled == True)).scalars().all()
             for watcher in watchers:
                 self._add_or_update_job(watcher)
+        if settings.job_queue:
+            self._add_maintenance_job()
+
+    def _add_maintenance_job(self):
+        self.scheduler.add_job(
+            self._queue_maintenance,
+            "interval",
+            minutes=1,
+            id="job-queue-maintenance",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    def _queue_maintenance(self):
+        """Queue mode: drop old finished jobs and pick up interval changes that workers recorded."""
+        try:
+            self.job_queue.purge()
+            with SessionLocal() as db:
+                watchers = db.execute(
+                    select(Watcher).where(Watcher.enabled == True, Watcher.adaptive_interval == True)
+                ).scalars().all()
+                for watcher in watchers:
+                    phase = self._watcher_phases.get(watcher.id)
+                    if phase is None or phase[1] != adaptive_interval.effective_interval(watcher):
+                        self._add_or_update_job(watcher)
+        except Exception as e:
+            logger.error(f"Job queue maintenance failed: {e}")
 
     def _job_id(self, watcher_id: int) -> str:
         return f"watcher-{watcher_id}"
@@ -102,10 +202,23 @@ class WatcherScheduler:
         if not watcher.enabled:
             self.remove_job(watcher.id)
             return
+        self._watcher_domains[watcher.id] = self.dispatcher.bucket(watcher.url)
+        self._watcher_urls[watcher.id] = normalize_url(watcher.url)
+        interval = adaptive_interval.effective_interval(watcher)
+        # Watchers of one page share a phase (and so a render); others are spread apart
+        seed = placement.url_seed(self._watcher_urls[watcher.id]) if settings.coalesce_renders else watcher.id
+        self._watcher_phases[watcher.id] = (seed, interval)
+        placement_kwargs = {}
+        if settings.schedule_spread:
+            # Stable phase, so equal intervals do not fire in lockstep
+            placement_kwargs["start_date"] = placement.start_date(seed, interval)
+        if settings.schedule_jitter_seconds > 0:
+            placement_kwargs["jitter"] = settings.schedule_jitter_seconds
         self.scheduler.add_job(
-            self.run_check,
+            self._check_job,
             "interval",
-            minutes=watcher.interval_minutes,
+            minutes=interval,
+            **placement_kwargs,
             id=self._job_id(watcher.id),
             replace_existing=True,
             args=[watcher.id],
@@ -115,181 +228,623 @@ class WatcherScheduler:
         )
 
     def remove_job(self, watcher_id: int):
-        job_id = self._job_id(watcher_id)
-        try:
-            self.scheduler.remove_job(job_id)
-        except Exception:
-            pass
+        self._watcher_domains.pop(watcher_id, None)
+        self._watcher_urls.pop(watcher_id, None)
+        self._watcher_phases.pop(watcher_id, None)
+        for job_id in (self._job_id(watcher_id), self._retry_job_id(watcher_id)):
+            try:
+                self.scheduler.remove_job(job_id)
+            except Exception:
+                pass
 
     def reschedule(self, watcher: Watcher):
         self._add_or_update_job(watcher)
 
+    def load_report(self, window_minutes: int = 60) -> dict:
+        """Expected versus actual check concurrency per minute, plus dispatcher state."""
+        report = placement.load_report(list(self._watcher_phases.values()), self.dispatcher.load, window_minutes)
+        report["dispatcher"] = self.dispatcher.stats()
+        if settings.job_queue:
+            report["job_queue"] = self.job_queue.stats()
+        if self.render_pool is not None:
+            report["render_pool"] = self.render_pool.stats()
+        return report
+
     def _record_render_timeout(self, watcher_id: int, timeout: float):
         self.render_timeouts[watcher_id] = timeout
 
-    def _detect(self, watcher: Watcher) -> tuple[StatusEnum, str | None]:
+    def _render_budget(self, watcher: Watcher) -> float:
+        # The snapshot is fresh from the database (other workers may have moved it); the cache covers the rest
+        return (
+            watcher.render_budget_seconds
+            or self.render_timeouts.get(watcher.id)
+            or float(render_budget.MAX_RENDER_SECONDS)
+        )
+
+    def _observe_render(self, watchers: list[Watcher], metrics: dict):
+        """Feed a browser render's duration into the budgets of every watcher it served."""
+        stats = render_budget.render_stats(metrics)
+        if stats is None:
+            return
+        with SessionLocal() as db:
+            for snapshot in watchers:
+                watcher = db.get(Watcher, snapshot.id)
+                if watcher is None:
+                    continue
+                samples = render_budget.observe(render_budget.load_samples(watcher.render_durations), stats)
+                budget = render_budget.budget_for(samples)
+                if budget != watcher.render_budget_seconds and len(samples) >= render_budget.MIN_SAMPLES:
+                    logger.info(
+                        f"[Watcher #{watcher.id}] Render budget {watcher.render_budget_seconds or render_budget.MAX_RENDER_SECONDS:.0f}s "
+                        f"-> {budget:.0f}s (p95 {render_budget.percentile(samples):.1f}s over {len(samples)} renders)"
+                    )
+                watcher.render_durations = json.dumps(samples)
+                watcher.render_budget_seconds = budget
+                self._record_render_timeout(watcher.id, budget)
+            try:
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(f"[Watcher #{watchers[0].id}] Failed to store render budget: {e}")
+
+    def _monitor_kwargs(self, watcher: Watcher) -> dict:
+        """Build the ``monitor_url`` arguments for a watcher."""
         logger.info(f"[Watcher #{watcher.id}] Starting check for URL: {watcher.url}")
         logger.info(f"[Watcher #{watcher.id}] Searching for phrase: '{watcher.phrase}'")
-        
-        try:
-            # Use EnhancedMonitor for robust detection
-            wait_sel = settings.debug_wait_selector
-            
-            # Construct filenames for artifacts if debug is on
-            screenshot_path = None
-            html_dump_path = None
-            if settings.debug_dump_artifacts:
-                ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-                out_dir = Path(settings.debug_artifacts_dir) / f"watcher_{watcher.id}"
-                out_dir.mkdir(parents=True, exist_ok=True)
-                screenshot_path = str(out_dir / f"{ts}_screenshot.png")
-                html_dump_path = str(out_dir / f"{ts}_content.html")
-
-            # Determine exclude_selector based on URL
-            exclude_selector = None
-            if "agoda.com" in watcher.url.lower():
-                logger.info(f"[Watcher #{watcher.id}] Agoda URL detected, relying on EnhancedMonitor specialized check")
-
-
-            found, msg, metrics = self.monitor.monitor_url(
-                url=watcher.url,
-                target_phrase=watcher.phrase,
-                selector=wait_sel,
-                exclude_selector=exclude_selector,
-                screenshot_path=screenshot_path,
-                html_dump_path=html_dump_path
+
+        wait_sel = settings.debug_wait_selector
+
+        # Construct filenames for artifacts if debug is on
+        screenshot_path = None
+        html_dump_path = None
+        if settings.debug_dump_artifacts:
+            ts = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+            out_dir = Path(settings.debug_artifacts_dir) / f"watcher_{watcher.id}"
+            out_dir.mkdir(parents=True, exist_ok=True)
+            screenshot_path = str(out_dir / f"{ts}_screenshot.png")
+            html_dump_path = str(out_dir / f"{ts}_content.html")
+
+        # Determine exclude_selector based on URL
+        exclude_selector = None
+        if "agoda.com" in watcher.url.lower():
+            logger.info(f"[Watcher #{watcher.id}] Agoda URL detected, relying on EnhancedMonitor specialized check")
+
+        return {
+            "url": watcher.url,
+            "target_phrase": watcher.phrase,
+            "selector": wait_sel,
+            "exclude_selector": exclude_selector,
+            "screenshot_path": screenshot_path,
+            "html_dump_path": html_dump_path,
+            "watcher_id": watcher.id,
+        }
+
+    @staticmethod
+    def _is_json(watcher: Watcher) -> bool:
+        return watcher.kind == WatcherKind.json.value
+
+    def _json_kwargs(self, watchers: list[Watcher]) -> dict:
+        """``check_json`` arguments for one fetch serving every JSON watcher in the group."""
+        watcher = watchers[0]
+        logger.info(f"[Watcher #{watcher.id}] Starting JSON check for URL: {watcher.url}")
+        if watcher.json_condition:
+            logger.info(f"[Watcher #{watcher.id}] Evaluating condition: {watcher.json_condition}")
+        extra_phrases = list(dict.fromkeys(w.phrase for w in watchers[1:] if w.phrase != watcher.phrase))
+        return {
+            "url": watcher.url,
+            "target_phrase": watcher.phrase,
+            "condition": watcher.json_condition,
+            "extra_phrases": extra_phrases or None,
+        }
+
+    def _interpret_result(self, watcher: Watcher, found: bool, msg: str, metrics: dict) -> tuple[StatusEnum, str | None]:
+        """Map a ``monitor_url`` result onto a watcher status."""
+        self.monitor.generate_diff_report(metrics, f"{settings.debug_artifacts_dir}/reports/{watcher.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
+
+        if found:
+            logger.info(f"[Watcher #{watcher.id}] Phrase FOUND: {msg}")
+            return StatusEnum.found, None
+
+        if metrics.get('final_status') == 'failed':
+            return StatusEnum.error, msg
+
+        if metrics.get('final_status') == 'heavy':
+            return StatusEnum.heavy, msg
+
+        if metrics.get('final_status') == 'blocked':
+            return StatusEnum.blocked, msg
+
+        logger.info(f"[Watcher #{watcher.id}] Phrase NOT found: {msg}")
+        return StatusEnum.not_found, None
+
+    def _shared_kwargs(self, watchers: list[Watcher]) -> dict:
+        """``monitor_url`` arguments for one render serving every watcher in the group."""
+        kwargs = self._monitor_kwargs(watchers[0])
+        extra_phrases = list(dict.fromkeys(w.phrase for w in watchers[1:] if w.phrase != watchers[0].phrase))
+        if len(watchers) > 1:
+            logger.info(
+                f"[Watcher #{watchers[0].id}] Shared render also serves "
+                f"{', '.join(f'#{w.id}' for w in watchers[1:])}"
             )
-            
-            self.monitor.generate_diff_report(metrics, f"{settings.debug_artifacts_dir}/reports/{watcher.id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
-            
-            if found:
-                logger.info(f"[Watcher #{watcher.id}] Phrase FOUND: {msg}")
-                return StatusEnum.found, None
-            
-            if metrics.get('final_status') == 'failed':
-                return StatusEnum.error, msg
-                
-            logger.info(f"[Watcher #{watcher.id}] Phrase NOT found: {msg}")
-            return StatusEnum.not_found, None
-            
+        if extra_phrases:
+            kwargs["extra_phrases"] = extra_phrases
+        if settings.render_budget:
+            kwargs["render_budget"] = max(self._render_budget(watcher) for watcher in watchers)
+        return kwargs
+
+    def _interpret_shared(
+        self, watchers: list[Watcher], found: bool, msg: str, metrics: dict
+    ) -> list[tuple[int, StatusEnum, str | None, str | None, int | None]]:
+        """Fan one render's verdicts (and the page fingerprint) out to every watcher that shared it."""
+        primary = watchers[0]
+        status, error_message = self._interpret_result(primary, found, msg, metrics)
+        results = [(primary.id, status, error_message)]
+        shared = metrics.get('shared_matches', {})
+        for watcher in watchers[1:]:
+            match = shared.get(watcher.phrase)
+            if watcher.phrase == primary.phrase:
+                results.append((watcher.id, status, error_message))
+            elif match and match['found']:
+                logger.info(f"[Watcher #{watcher.id}] Phrase FOUND in shared render of {watcher.url}")
+                results.append((watcher.id, StatusEnum.found, None))
+            elif metrics.get('final_status') == 'failed':
+                results.append((watcher.id, StatusEnum.error, msg))
+            elif metrics.get('final_status') == 'heavy':
+                results.append((watcher.id, StatusEnum.heavy, msg))
+            elif metrics.get('final_status') == 'blocked':
+                results.append((watcher.id, StatusEnum.blocked, msg))
+            else:
+                logger.info(f"[Watcher #{watcher.id}] Phrase NOT found in shared render of {watcher.url}")
+                results.append((watcher.id, StatusEnum.not_found, None))
+        fingerprint = metrics.get('content_fingerprint')
+        content_length = retry_policy.content_length(metrics)
+        return [(watcher_id, status, error, fingerprint, content_length) for watcher_id, status, error in results]
+
+    def _detect(
+        self, watchers: list[Watcher], dispatch: Optional[DispatchItem] = None
+    ) -> list[tuple[int, StatusEnum, str | None, str | None, int | None]]:
+        try:
+            if self._is_json(watchers[0]):
+                found, msg, metrics = self.monitor.check_json(**self._json_kwargs(watchers))
+                return self._interpret_shared(watchers, found, msg, metrics)
+            # Use EnhancedMonitor for robust detection, in a child process when isolated
+            render = self.render_pool.monitor_url if self.render_pool is not None else self.monitor.monitor_url
+            found, msg, metrics = render(**self._shared_kwargs(watchers))
+            if dispatch is not None:
+                metrics['dispatch'] = dispatch.as_metrics()
+            self._observe_render(watchers, metrics)
+            return self._interpret_shared(watchers, found, msg, metrics)
         except Exception as exc:
-            logger.error(f"[Watcher #{watcher.id}] Error during check: {exc}", exc_info=True)
-            return StatusEnum.error, str(exc)[:500]
+            logger.error(f"[Watcher #{watchers[0].id}] Error during check: {exc}", exc_info=True)
+            return [(watcher.id, StatusEnum.error, str(exc)[:500], None, None) for watcher in watchers]
 
-    def run_check(self, watcher_id: int, force: bool = False):
+    def _load_watcher(self, watcher_id: int, force: bool = False) -> Optional[Watcher]:
+        """Load a detached watcher snapshot, or None if the check should be skipped."""
+        with SessionLocal() as db:
+            watcher = db.get(Watcher, watcher_id)
+            if not watcher or (not watcher.enabled and not force):
+                logger.info(f"[Watcher #{watcher_id}] Skipping check (not found or disabled)")
+                return None
+            db.expunge(watcher)
+            return watcher
+
+    def _load_batch(self, items: list[DispatchItem]) -> list[list[Watcher]]:
+        """
+        Load the watchers of a dispatched check, grouped by normalized URL (one
+        render per group). JSON watchers share a fetch only with JSON watchers
+        of the same URL and condition.
+        """
+        groups: dict[tuple, list[Watcher]] = {}
+        for item in items:
+            watcher = self._load_watcher(item.watcher_id, item.force)
+            if watcher is not None:
+                key = (normalize_url(watcher.url),)
+                if self._is_json(watcher):
+                    key += (WatcherKind.json.value, watcher.json_condition or "")
+                groups.setdefault(key, []).append(watcher)
+        return list(groups.values())
+
+    @staticmethod
+    def _batch_items(watcher_id: int, force: bool, dispatch: Optional[DispatchItem]) -> list[DispatchItem]:
+        if dispatch is None:
+            return [DispatchItem(watcher_id=watcher_id, domain="", force=force)]
+        return dispatch.batch()
+
+    def _record_result(
+        self,
+        watcher_id: int,
+        checked_at: datetime,
+        status: StatusEnum,
+        error_message: str | None,
+        fingerprint: str | None = None,
+        content_length: int | None = None,
+        attempt: int = 1,
+        retry_of: int | None = None,
+    ) -> Optional[int]:
+        """
+        Persist a check result and send the alert email if the phrase was found.
+        Returns the log id, or None if the watcher is gone.
+        """
         email_context: dict | None = None
         log_id: int | None = None
-        try:
+        with SessionLocal() as db:
+            watcher = db.get(Watcher, watcher_id)
+            if not watcher:
+                logger.info(f"[Watcher #{watcher_id}] Watcher deleted during check, dropping result")
+                return None
+            retry_note = f" (retry {attempt - 1} of log #{retry_of})" if attempt > 1 else ""
+            logger.info(f"[Watcher #{watcher.id}] Check result: {status}{retry_note}")
+
+            should_email = status == StatusEnum.found and watcher.emails
+            
+            if should_email:
+                local_ts, utc_ts = _format_checked_times(checked_at)
+                email_context = {
+                    "recipients": [e.strip() for e in watcher.emails.split(",") if e.strip()],
+                    "local_ts": local_ts,
+                    "utc_ts": utc_ts,
+                    "watcher_name": watcher.name,
+                    "watcher_url": watcher.url,
+                    "watcher_phrase": watcher.phrase,
+                    "watcher_condition": watcher.json_condition if self._is_json(watcher) else None,
+                    "watcher_id": watcher.id,
+                }
+
+            watcher.last_check_at = checked_at
+            watcher.last_status = status
+            watcher.last_error = error_message
+            interval_changed = self._observe_change(watcher, checked_at, status, fingerprint)
+
+            log_entry = CheckLog(
+                watcher_id=watcher.id,
+                checked_at=checked_at,
+                status=status,
+                error_message=error_message,
+                attempt=attempt,
+                retry_of_id=retry_of,
+                content_length=content_length,
+            )
+            db.add(log_entry)
+            try:
+                db.commit()
+                db.refresh(log_entry)  # Get the log entry ID
+                log_id = log_entry.id
+                if interval_changed and self.scheduler.running:
+                    self._add_or_update_job(watcher)
+            except StaleDataError:
+                db.rollback()
+                self.remove_job(watcher_id)
+                return None
+            except Exception:
+                db.rollback()
+                raise
+
+        # Send email notification if needed
+        if should_email and email_context and email_context.get("recipients"):
+            logger.info(
+                f"[Watcher #{watcher_id}] Sending alert emails to {len(email_context['recipients'])} recipients"
+            )
+            email_subject = f"[Watcher] {email_context['watcher_name']} - phrase found"
+            email_lines = [
+                "A watched phrase was detected.",
+                "",
+                f"Watcher : #{email_context['watcher_id']} ({email_context['watcher_name']})",
+                f"URL     : {email_context['watcher_url']}",
+                f"Phrase  : {email_context['watcher_phrase']}" if email_context['watcher_phrase'] else None,
+                f"Condition: {email_context['watcher_condition']}" if email_context['watcher_condition'] else None,
+                f"Checked : {email_context['local_ts']}",
+                f"UTC     : {email_context['utc_ts']}",
+                f"Log ID  : {log_id}" if log_id is not None else None,
+            ]
+            email_body = "\n".join(line for line in email_lines if line is not None)
+            email_sent = False
+            email_error = None
+            try:
+                send_email(email_context["recipients"], email_subject, email_body)
+                logger.info(f"[Watcher #{watcher_id}] Alert email sent successfully")
+                email_sent = True
+            except Exception as e:
+                email_error = str(e)[:500]
+                logger.error(f"[Watcher #{watcher_id}] Failed to send email: {e}")
+            
+            # Update log entry with email status
             with SessionLocal() as db:
-                watcher = db.get(Watcher, watcher_id)
-                if not watcher or (not watcher.enabled and not force):
-                    logger.info(f"[Watcher #{watcher_id}] Skipping check (not found or disabled)")
-                    return
-                now = datetime.utcnow()
-
-                status, error_message = self._detect(watcher)
-                logger.info(f"[Watcher #{watcher.id}] Check result: {status}")
-
-                should_email = status == StatusEnum.found and watcher.emails
-                
-                if should_email:
-                    local_ts, utc_ts = _format_checked_times(now)
-                    email_context = {
-                        "recipients": [e.strip() for e in watcher.emails.split(",") if e.strip()],
-                        "local_ts": local_ts,
-                        "utc_ts": utc_ts,
-                        "watcher_name": watcher.name,
-                        "watcher_url": watcher.url,
-                        "watcher_phrase": watcher.phrase,
-                        "watcher_id": watcher.id,
-                    }
-
-                watcher.last_check_at = now
-                watcher.last_status = status
-                watcher.last_error = error_message
-
-                log_entry = CheckLog(
-                    watcher_id=watcher.id,
-                    checked_at=now,
-                    status=status,
-                    error_message=error_message,
-                )
-                db.add(log_entry)
-                try:
-                    db.commit()
-                    db.refresh(log_entry)  # Get the log entry ID
-                    log_id = log_entry.id
-                except StaleDataError:
-                    db.rollback()
-                    self.remove_job(watcher_id)
-                    return
-                except Exception:
-                    db.rollback()
-                    raise
-
-            # Send email notification if needed
-            if should_email and email_context and email_context.get("recipients"):
-                logger.info(
-                    f"[Watcher #{watcher_id}] Sending alert emails to {len(email_context['recipients'])} recipients"
+                log_entry = db.get(CheckLog, log_id)
+                if log_entry:
+                    log_entry.email_sent = email_sent
+                    log_entry.email_error = email_error
+                    try:
+                        db.commit()
+                    except Exception as e:
+                        logger.error(f"[Watcher #{watcher_id}] Failed to update email status in log: {e}")
+                        db.rollback()
+        return log_id
+
+    def _previous_length(self, watcher_id: int, log_id: int) -> Optional[int]:
+        """Page text length of the watcher's last check before ``log_id`` that recorded one."""
+        with SessionLocal() as db:
+            return db.execute(
+                select(CheckLog.content_length)
+                .where(
+                    CheckLog.watcher_id == watcher_id,
+                    CheckLog.id < log_id,
+                    CheckLog.content_length.is_not(None),
                 )
-                email_subject = f"[Watcher] {email_context['watcher_name']} - phrase found"
-                email_lines = [
-                    "A watched phrase was detected.",
-                    "",
-                    f"Watcher : #{email_context['watcher_id']} ({email_context['watcher_name']})",
-                    f"URL     : {email_context['watcher_url']}",
-                    f"Phrase  : {email_context['watcher_phrase']}",
-                    f"Checked : {email_context['local_ts']}",
-                    f"UTC     : {email_context['utc_ts']}",
-                    f"Log ID  : {log_id}" if log_id is not None else None,
-                ]
-                email_body = "\n".join(line for line in email_lines if line is not None)
-                email_sent = False
-                email_error = None
-                try:
-                    send_email(email_context["recipients"], email_subject, email_body)
-                    logger.info(f"[Watcher #{watcher_id}] Alert email sent successfully")
-                    email_sent = True
-                except Exception as e:
-                    email_error = str(e)[:500]
-                    logger.error(f"[Watcher #{watcher_id}] Failed to send email: {e}")
-                
-                # Update log entry with email status
-                with SessionLocal() as db:
-                    log_entry = db.get(CheckLog, log_id)
-                    if log_entry:
-                        log_entry.email_sent = email_sent
-                        log_entry.email_error = email_error
-                        try:
-                            db.commit()
-                        except Exception as e:
-                            logger.error(f"[Watcher #{watcher_id}] Failed to update email status in log: {e}")
-                            db.rollback()
+                .order_by(CheckLog.id.desc())
+                .limit(1)
+            ).scalar()
+
+    def _maybe_retry(
+        self, item: DispatchItem, status: StatusEnum, log_id: Optional[int], content_length: Optional[int]
+    ):
+        """
+        Schedule another attempt of a failed (or, size-based, truncated) check
+        after the resilience config's backoff, as a delayed check rather than a
+        sleep inside the render, so the render slot is free in the meantime.
+        """
+        if log_id is None or item.attempt > self.max_retries:
+            return
+        resilience = self.config.resilience
+        previous_length = None
+        if status == StatusEnum.not_found and retry_policy.strategy(resilience) == RetryStrategy.SIZE_BASED:
+            previous_length = self._previous_length(item.watcher_id, log_id)
+        if not retry_policy.should_retry(resilience, status.value, content_length, previous_length):
+            return
+        delay = retry_policy.retry_delay(resilience, item.attempt)
+        logger.info(
+            f"[Watcher #{item.watcher_id}] Check {status.value}, retry {item.attempt}/{self.max_retries} "
+            f"in {delay:.1f}s"
+        )
+        self._schedule_retry(item.watcher_id, item.force, item.attempt + 1, log_id, delay)
+
+    def _schedule_retry(self, watcher_id: int, force: bool, attempt: int, retry_of: int, delay: float):
+        if settings.job_queue:
+            self.job_queue.enqueue(watcher_id, force=force, delay=delay, attempt=attempt, retry_of=retry_of)
+        else:
+            self._add_retry_job(watcher_id, force, attempt, retry_of, delay)
+
+    def _retry_job_id(self, watcher_id: int) -> str:
+        return f"retry-{watcher_id}"
+
+    def _add_retry_job(self, watcher_id: int, force: bool, attempt: int, retry_of: int, delay: float):
+        self.scheduler.add_job(
+            self.dispatch_check,
+            "date",
+            run_date=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            id=self._retry_job_id(watcher_id),
+            replace_existing=True,
+            kwargs={"watcher_id": watcher_id, "force": force, "attempt": attempt, "retry_of": retry_of},
+            misfire_grace_time=60,
+        )
+
+    def _observe_change(self, watcher: Watcher, checked_at: datetime, status: StatusEnum, fingerprint: str | None) -> bool:
+        """
+        Record the check in the watcher's fingerprint history and, in adaptive mode,
+        move its effective interval. Returns True when the job needs rescheduling.
+        """
+        if status in (StatusEnum.error, StatusEnum.heavy, StatusEnum.blocked):
+            return False  # failures, aborted and refused renders say nothing about how often the page changes
+        history, changed = adaptive_interval.observe(
+            adaptive_interval.load_history(watcher.change_history), checked_at, status.value, fingerprint
+        )
+        watcher.change_history = json.dumps(history)
+        if fingerprint:
+            watcher.content_fingerprint = fingerprint
+        if not watcher.adaptive_interval:
+            return False
+        current = adaptive_interval.effective_interval(watcher)
+        interval = adaptive_interval.next_interval(watcher, history, changed)
+        watcher.effective_interval_minutes = interval
+        if interval != current:
+            logger.info(
+                f"[Watcher #{watcher.id}] Adaptive interval {current} -> {interval} min "
+                f"({'changed' if changed else 'stable'}, change rate {adaptive_interval.change_rate(history)})"
+            )
+        return interval != current
+
+    def _finish_manual_check(self, watcher_id: int, force: bool):
+        if force and watcher_id in self.manual_checks_in_progress:
+            self.manual_checks_in_progress.discard(watcher_id)
+            logger.info(f"[Watcher #{watcher_id}] Manual check completed, cleared from in-progress")
+
+    def run_check(self, watcher_id: int, force: bool = False, dispatch: Optional[DispatchItem] = None):
+        items = self._batch_items(watcher_id, force, dispatch)
+        members = {item.watcher_id: item for item in items}
+        try:
+            for watchers in self._load_batch(items):
+                now = datetime.utcnow()
+                for checked_id, status, error_message, fingerprint, length in self._detect(watchers, dispatch):
+                    member = members[checked_id]
+                    log_id = self._record_result(
+                        checked_id, now, status, error_message, fingerprint, length, member.attempt, member.retry_of
+                    )
+                    self._maybe_retry(member, status, log_id, length)
         finally:
-            if force and watcher_id in self.manual_checks_in_progress:
-                self.manual_checks_in_progress.discard(watcher_id)
-                logger.info(f"[Watcher #{watcher_id}] Manual check completed, cleared from in-progress")
+            for item in items:
+                self._finish_manual_check(item.watcher_id, item.force)
+
+    def _watcher_target(self, watcher_id: int) -> Optional[tuple[str, str]]:
+        """Concurrency bucket and normalized URL of a watcher."""
+        if watcher_id in self._watcher_domains and watcher_id in self._watcher_urls:
+            return self._watcher_domains[watcher_id], self._watcher_urls[watcher_id]
+        with SessionLocal() as db:
+            watcher = db.get(Watcher, watcher_id)
+            if watcher is None:
+                return None
+            return self.dispatcher.bucket(watcher.url), normalize_url(watcher.url)
+
+    def enqueue_check(self, watcher_id: int, force: bool = False, priority: bool = False) -> bool:
+        """Queue a check: in the database for workers (``JOB_QUEUE``), else on the local dispatcher."""
+        if settings.job_queue:
+            return self.job_queue.enqueue(watcher_id, force=force)
+        return self.dispatch_check(watcher_id, force, priority)
+
+    def dispatch_check(
+        self,
+        watcher_id: int,
+        force: bool = False,
+        priority: bool = False,
+        attempt: int = 1,
+        retry_of: Optional[int] = None,
+    ) -> bool:
+        """Hand a check to the dispatcher, which runs it once a render slot frees up."""
+        target = self._watcher_target(watcher_id)
+        if target is None:
+            logger.info(f"[Watcher #{watcher_id}] Skipping check (not found)")
+            return False
+        domain, url_key = target
+        submitted = self.dispatcher.submit(
+            watcher_id, domain, force=force, url_key=url_key, priority=priority, attempt=attempt, retry_of=retry_of
+        )
+        if not submitted and attempt > 1:
+            logger.warning(f"[Watcher #{watcher_id}] Retry {attempt - 1} of log #{retry_of} dropped by the dispatcher")
+        return submitted
+
+    def check_position(self, watcher_id: int) -> Optional[dict]:
+        """Queue position and estimated start of a watcher's pending check (None if there is none)."""
+        if settings.job_queue:
+            return self.job_queue.position(watcher_id)
+        return self.dispatcher.position(watcher_id)
 
     def manual_check(self, watcher_id: int) -> bool:
+        if settings.job_queue:
+            logger.info("[Watcher #%s] Queuing manual check for a worker", watcher_id)
+            return self.enqueue_check(watcher_id, force=True, priority=True)
         if watcher_id in self.manual_checks_in_progress:
             logger.warning("[Watcher #%s] Manual check already in progress, ignoring request", watcher_id)
             return False
         
         self.manual_checks_in_progress.add(watcher_id)
-        run_date = datetime.now(self.scheduler.timezone)
-        job_id = f"manual-watcher-{watcher_id}-{uuid4().hex[:8]}"
-        logger.info("[Watcher #%s] Queuing manual check as job %s", watcher_id, job_id)
-        self.scheduler.add_job(
-            self.run_check,
-            trigger="date",
-            run_date=run_date,
-            args=[watcher_id],
-            kwargs={"force": True},
-            id=job_id,
-            replace_existing=False,
-            misfire_grace_time=MAX_RENDER_SECONDS,
-        )
+        logger.info("[Watcher #%s] Queuing manual check", watcher_id)
+        if not self.enqueue_check(watcher_id, force=True, priority=True):
+            self.manual_checks_in_progress.discard(watcher_id)
+            return False
         return True
 
 
-scheduler = WatcherScheduler()
\ No newline at end of file
+class AsyncWatcherScheduler(WatcherScheduler):
+    """
+    Scheduler variant that drives ``AsyncEnhancedMonitor`` from an asyncio loop.
+
+    APScheduler's ``AsyncIOScheduler`` runs on a dedicated event-loop thread, so
+    hundreds of renders can be in flight without one OS thread per check. DB and
+    email work stays synchronous and is pushed to the loop's default executor.
+    """
+
+    def _create_scheduler(self):
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self.loop.run_forever, name="watcher-async-loop", daemon=True)
+        return AsyncIOScheduler(event_loop=self.loop, timezone=settings.timezone)
+
+    def _create_monitor(self, config: Optional[MonitoringConfig]) -> EnhancedMonitor:
+        return AsyncEnhancedMonitor(
+            config, max_concurrency=settings.render_concurrency + max(0, settings.priority_slots)
+        )
+
+    def _create_executor(self) -> Optional[ThreadPoolExecutor]:
+        return None  # checks run as tasks on the event loop
+
+    def _create_render_pool(self) -> Optional[RenderProcessPool]:
+        if settings.render_isolation == "process":
+            logger.warning("RENDER_ISOLATION=process needs RENDER_ENGINE=sync; rendering on the event loop")
+        return None
+
+    def _max_concurrent_checks(self) -> int:
+        return settings.render_concurrency
+
+    def _launch(self, item: DispatchItem, done):
+        """Start a dispatched check as a task on the scheduler's event loop."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.run_check_async(item.watcher_id, item.force, item), self.loop
+        )
+        future.add_done_callback(lambda _: done())
+
+    def _call_in_loop(self, func, *args):
+        """Run ``func`` on the loop thread (AsyncIOScheduler is not thread-safe)."""
+        if not self._loop_thread.is_alive():
+            return func(*args)
+        return asyncio.run_coroutine_threadsafe(self._call_async(func, *args), self.loop).result()
+
+    async def _call_async(self, func, *args):
+        return func(*args)
+
+    def _start_loop(self):
+        if not self._loop_thread.is_alive():
+            self._loop_thread.start()
+
+    def start_runner(self):
+        self._start_loop()
+        super().start_runner()
+
+    def start(self):
+        self._start_loop()  # the scheduler runs on the loop even when workers run the checks
+        self._call_in_loop(super().start)
+
+    def shutdown(self):
+        self.dispatcher.shutdown()
+        if not self._loop_thread.is_alive():
+            return
+        if self.scheduler.running:
+            self._call_in_loop(self.scheduler.shutdown)
+        if self.monitor is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self.monitor.browser_pool.shutdown(), self.loop).result(timeout=30)
+            except Exception as e:
+                logger.warning(f"Failed to shut down async browser pool: {e}")
+            self.monitor.cookie_store.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _add_or_update_job(self, watcher: Watcher):
+        self._call_in_loop(super()._add_or_update_job, watcher)
+
+    def remove_job(self, watcher_id: int):
+        self._call_in_loop(super().remove_job, watcher_id)
+
+    def _add_maintenance_job(self):
+        self._call_in_loop(super()._add_maintenance_job)
+
+    def _add_retry_job(self, watcher_id: int, force: bool, attempt: int, retry_of: int, delay: float):
+        self._call_in_loop(super()._add_retry_job, watcher_id, force, attempt, retry_of, delay)
+
+    async def _detect_async(
+        self, watchers: list[Watcher], dispatch: Optional[DispatchItem] = None
+    ) -> list[tuple[int, StatusEnum, str | None, str | None, int | None]]:
+        try:
+            if self._is_json(watchers[0]):
+                found, msg, metrics = await asyncio.to_thread(self.monitor.check_json, **self._json_kwargs(watchers))
+                return await asyncio.to_thread(self._interpret_shared, watchers, found, msg, metrics)
+            found, msg, metrics = await self.monitor.monitor_url(**self._shared_kwargs(watchers))
+            if dispatch is not None:
+                metrics['dispatch'] = dispatch.as_metrics()
+            await asyncio.to_thread(self._observe_render, watchers, metrics)
+            return await asyncio.to_thread(self._interpret_shared, watchers, found, msg, metrics)
+        except Exception as exc:
+            logger.error(f"[Watcher #{watchers[0].id}] Error during check: {exc}", exc_info=True)
+            return [(watcher.id, StatusEnum.error, str(exc)[:500], None, None) for watcher in watchers]
+
+    async def run_check_async(self, watcher_id: int, force: bool = False, dispatch: Optional[DispatchItem] = None):
+        items = self._batch_items(watcher_id, force, dispatch)
+        members = {item.watcher_id: item for item in items}
+        try:
+            for watchers in await asyncio.to_thread(self._load_batch, items):
+                now = datetime.utcnow()
+                for checked_id, status, error_message, fingerprint, length in await self._detect_async(watchers, dispatch):
+                    member = members[checked_id]
+                    log_id = await asyncio.to_thread(
+                        self._record_result,
+                        checked_id, now, status, error_message, fingerprint, length, member.attempt, member.retry_of,
+                    )
+                    await asyncio.to_thread(self._maybe_retry, member, status, log_id, length)
+        finally:
+            for item in items:
+                self._finish_manual_check(item.watcher_id, item.force)
+
+
+def create_scheduler() -> WatcherScheduler:
+    """Build the scheduler for the configured rendering engine."""
+    if settings.render_engine == "async":
+        return AsyncWatcherScheduler()
+    return WatcherScheduler()
+
+
+scheduler = create_scheduler()
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Check worker: ``python -m app.worker``.
+
+Claims due checks from the database job queue (``JOB_QUEUE=true``) and runs
+them through the same dispatcher, monitor and result recording as the
+in-process scheduler. Run as many workers as the hardware allows, on one box or
+on several sharing ``DATABASE_URL``.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from app.core.config import get_settings
+from app.services.dispatcher import DispatchItem
+from app.services.job_queue import JobQueue
+
+if TYPE_CHECKING:
+    from app.services.watcher_service import WatcherScheduler
+
+logger = logging.getLogger("app.worker")
+settings = get_settings()
+
+
+class CheckWorker:
+    """Feeds claimed jobs to a scheduler's dispatcher and keeps their leases alive."""
+
+    def __init__(self, runner: "WatcherScheduler", queue: JobQueue, poll_seconds: float, worker_id: str | None = None):
+        self.runner = runner
+        self.queue = queue
+        self.poll_seconds = max(0.1, poll_seconds)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._jobs: dict[int, int] = {}  # watcher id -> claimed job id
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._renewed_at = time.monotonic()
+        runner.dispatcher.on_finished = self._finished
+
+    def _finished(self, item: DispatchItem):
+        with self._lock:
+            job_ids = [self._jobs.pop(m.watcher_id) for m in item.batch() if m.watcher_id in self._jobs]
+        for job_id in job_ids:
+            self.queue.complete(self.worker_id, job_id)
+        self._wake.set()  # a slot freed up, claim again right away
+
+    def _in_flight(self) -> list[int]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _renew_leases(self):
+        if time.monotonic() - self._renewed_at >= self.queue.lease_seconds / 3:
+            self.queue.renew(self.worker_id, self._in_flight())
+            self._renewed_at = time.monotonic()
+
+    def claim_and_dispatch(self) -> int:
+        """
+        Claim as many jobs as there are free render slots and hand them to the
+        dispatcher. Manual jobs may also fill the dispatcher's priority slots.
+        """
+        dispatcher = self.runner.dispatcher
+        with self._lock:
+            free = dispatcher.max_concurrent - len(self._jobs)
+        claimed = self.queue.claim(self.worker_id, free + dispatcher.priority_slots, priority=True)
+        claimed += self.queue.claim(self.worker_id, free - len(claimed), priority=False)
+        for job in claimed:
+            with self._lock:
+                duplicate = job.watcher_id in self._jobs
+                if not duplicate:
+                    self._jobs[job.watcher_id] = job.id
+            if duplicate:
+                self.queue.complete(self.worker_id, job.id, error="check already running in this worker")
+                continue
+            if not self.runner.dispatch_check(
+                job.watcher_id, job.force, priority=job.force, attempt=job.attempt, retry_of=job.retry_of
+            ):
+                with self._lock:
+                    self._jobs.pop(job.watcher_id, None)
+                self.queue.complete(self.worker_id, job.id, error="watcher not found or already running")
+        return len(claimed)
+
+    def run(self):
+        self.runner.start_runner()
+        logger.info(
+            f"Worker {self.worker_id} started (max {self.runner.dispatcher.max_concurrent} concurrent checks)"
+        )
+        while not self._stopping.is_set():
+            claimed = 0
+            try:
+                self._renew_leases()
+                claimed = self.claim_and_dispatch()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} failed to poll the job queue: {e}")
+            if not claimed:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+        in_flight = self._in_flight()
+        if in_flight:
+            logger.info(f"Worker {self.worker_id} releasing {len(in_flight)} unfinished job(s)")
+            self.queue.release(self.worker_id, in_flight)
+        self.runner.shutdown()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Run watcher checks from the database job queue.")
+    parser.add_argument("--poll-seconds", type=float, default=settings.worker_poll_seconds)
+    parser.add_argument("--worker-id", default=None, help="lease owner name (default: host:pid)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if not settings.job_queue:
+        logger.warning("JOB_QUEUE is off: the web process runs checks itself and enqueues none for workers")
+
+    # Imported here, not at module level: render child processes (RENDER_ISOLATION=process)
+    # re-import this module and must not build a scheduler of their own
+    from app.db.database import Base, engine
+    from app.services.watcher_service import scheduler
+
+    Base.metadata.create_all(bind=engine)
+    worker = CheckWorker(scheduler, scheduler.job_queue, args.poll_seconds, args.worker_id)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: worker.stop())
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""add adaptive interval tracking to watchers
+
+Revision ID: 20261016_0001
+Revises: 20251202_0002
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0001'
+down_revision = '20251202_0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('watchers') as batch_op:
+        batch_op.add_column(sa.Column('adaptive_interval', sa.Boolean(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('min_interval_minutes', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('max_interval_minutes', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('effective_interval_minutes', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('content_fingerprint', sa.String(64), nullable=True))
+        batch_op.add_column(sa.Column('change_history', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('watchers') as batch_op:
+        batch_op.drop_column('change_history')
+        batch_op.drop_column('content_fingerprint')
+        batch_op.drop_column('effective_interval_minutes')
+        batch_op.drop_column('max_interval_minutes')
+        batch_op.drop_column('min_interval_minutes')
+        batch_op.drop_column('adaptive_interval')
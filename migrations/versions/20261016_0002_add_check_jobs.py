@@ -0,0 +1,44 @@
+"""add check job queue
+
+Revision ID: 20261016_0002
+Revises: 20261016_0001
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0002'
+down_revision = '20261016_0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'check_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('watcher_id', sa.Integer(), sa.ForeignKey('watchers.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('force', sa.Boolean(), nullable=False, server_default='0'),
+        sa.Column('status', sa.String(16), nullable=False, server_default='queued'),
+        sa.Column('enqueued_at', sa.DateTime(), nullable=False),
+        sa.Column('run_after', sa.DateTime(), nullable=False),
+        sa.Column('lease_owner', sa.String(255), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_check_jobs_id', 'check_jobs', ['id'])
+    op.create_index('ix_check_jobs_watcher_id', 'check_jobs', ['watcher_id'])
+    op.create_index('ix_check_jobs_status_run_after', 'check_jobs', ['status', 'run_after'])
+
+
+def downgrade():
+    op.drop_index('ix_check_jobs_status_run_after', table_name='check_jobs')
+    op.drop_index('ix_check_jobs_watcher_id', table_name='check_jobs')
+    op.drop_index('ix_check_jobs_id', table_name='check_jobs')
+    op.drop_table('check_jobs')
@@ -0,0 +1,28 @@
+"""add learned render budget
+
+Revision ID: 20261016_0003
+Revises: 20261016_0002
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0003'
+down_revision = '20261016_0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('watchers') as batch_op:
+        batch_op.add_column(sa.Column('render_budget_seconds', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('render_durations', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('watchers') as batch_op:
+        batch_op.drop_column('render_durations')
+        batch_op.drop_column('render_budget_seconds')
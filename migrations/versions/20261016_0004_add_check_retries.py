@@ -0,0 +1,36 @@
+"""add retry lineage to check logs and jobs
+
+Revision ID: 20261016_0004
+Revises: 20261016_0003
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0004'
+down_revision = '20261016_0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('logs') as batch_op:
+        batch_op.add_column(sa.Column('attempt', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('retry_of_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('content_length', sa.Integer(), nullable=True))
+    with op.batch_alter_table('check_jobs') as batch_op:
+        batch_op.add_column(sa.Column('check_attempt', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('retry_of_log_id', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('check_jobs') as batch_op:
+        batch_op.drop_column('retry_of_log_id')
+        batch_op.drop_column('check_attempt')
+    with op.batch_alter_table('logs') as batch_op:
+        batch_op.drop_column('content_length')
+        batch_op.drop_column('retry_of_id')
+        batch_op.drop_column('attempt')
@@ -0,0 +1,29 @@
+"""add blocked check status
+
+Revision ID: 20261016_0005
+Revises: 20261016_0004
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0005'
+down_revision = '20261016_0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only PostgreSQL stores the enum as a native type; elsewhere it is a plain string column
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE statusenum ADD VALUE IF NOT EXISTS 'heavy'")
+            op.execute("ALTER TYPE statusenum ADD VALUE IF NOT EXISTS 'blocked'")
+
+
+def downgrade():
+    # Enum values cannot be dropped in place; fold blocked results into errors
+    op.execute("UPDATE logs SET status = 'error' WHERE status = 'blocked'")
+    op.execute("UPDATE watchers SET last_status = 'error' WHERE last_status = 'blocked'")
@@ -0,0 +1,28 @@
+"""add JSON watcher kind
+
+Revision ID: 20261016_0006
+Revises: 20261016_0005
+Create Date: 2026-10-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261016_0006'
+down_revision = '20261016_0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('watchers') as batch_op:
+        batch_op.add_column(sa.Column('kind', sa.String(length=16), nullable=False, server_default='page'))
+        batch_op.add_column(sa.Column('json_condition', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('watchers') as batch_op:
+        batch_op.drop_column('json_condition')
+        batch_op.drop_column('kind')